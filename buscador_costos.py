@@ -0,0 +1,228 @@
+from __future__ import annotations
+import heapq
+import time
+from array import array
+from collections import deque
+
+from generador_mapa import clone_matrix, TERRAIN_COST
+
+# ------------------------------------------------------------
+# Camino de costo mínimo con terreno ponderado
+# ------------------------------------------------------------
+#   Entrar a una celda cuesta TERRAIN_COST[celda] (arena 2, agua 4,
+#   pantano 8...); '#' no se puede pisar; la celda de inicio no se cobra.
+#   Se busca el tesoro de MENOR costo total y se devuelve el camino.
+#
+#   Según los costos del mapa se elige la cola:
+#     - todos 1              → BFS con deque (igual que sin pesos)
+#     - enteros <= BUCKET_MAX → Dial: cola circular de buckets, O(1) por op.
+#     - otro caso            → heap binario; A* (Manhattan * costo mínimo)
+#                               si hay pocos tesoros, Dijkstra si no.
+#   Con stats (instrumentacion.SolverStats) cada nodo extraído de la cola
+#   pasa por stats.visit(pasos): cuenta nodos y dispara on_progress, que es
+#   por donde la UI muestra avance y cancela (lanzando desde el callback).
+#   `pasos` es la profundidad real (celdas desde el inicio en el árbol de
+#   caminos), no el costo: así max_depth significa lo mismo que en
+#   search_treasure. Con BFS coincide con la distancia; Dial y heap la
+#   llevan aparte solo si hay stats.
+
+WALL      = "#"
+TREASURE  = "T"
+PATH_MARK = "*"
+
+BUCKET_MAX     = 16
+ASTAR_MAX_META = 64
+
+
+def _cost_grid(mapa, costs):
+    """Costo de entrada por celda (plano, x*cols + y; 0 = muro), el texto plano y (cmin, cmax)."""
+    texto = "".join("".join(row) for row in mapa).encode("latin-1", "replace")
+    tabla = bytearray(range(256))          # se reemplaza cada carácter presente
+    cmin, cmax = 255, 1
+    for b in set(texto):
+        ch = chr(b)
+        c = 0 if ch == WALL else costs.get(ch, 1)
+        if not isinstance(c, int) or not 0 <= c <= 255 or (c == 0 and ch != WALL):
+            raise ValueError(f"costo inválido para {ch!r}: {c!r} (entero 1..255)")
+        tabla[b] = c
+        if c:
+            cmin, cmax = min(cmin, c), max(cmax, c)
+    return bytearray(texto.translate(tabla)), texto, min(cmin, cmax), cmax
+
+
+def _pasos(rows, cols, s):
+    """Profundidad por celda (celdas desde el inicio, el inicio cuenta 1), para stats."""
+    pasos = array("i", bytes(4 * rows * cols))
+    pasos[s] = 1
+    return pasos
+
+
+def _bfs(grid, goal, rows, cols, s, parent, visit=None):
+    dist = {s: 0}
+    q = deque([s])
+    while q:
+        c = q.popleft()
+        if visit is not None:
+            visit(dist[c] + 1)              # sin pesos la distancia es la profundidad
+        if goal[c]:
+            return c, dist[c]
+        d = dist[c] + 1
+        y = c % cols
+        for n, ok in ((c - cols, c >= cols), (c + cols, c < (rows - 1) * cols),
+                      (c - 1, y > 0), (c + 1, y < cols - 1)):
+            if ok and grid[n] and n not in dist:
+                dist[n] = d
+                parent[n] = c
+                q.append(n)
+    return -1, None
+
+
+def _dial(grid, goal, rows, cols, s, parent, cmax, visit=None):
+    """Dijkstra con cola de buckets circular (costos enteros 1..cmax)."""
+    INF = 1 << 60
+    dist = {s: 0}
+    nb = cmax + 1
+    buckets = [[] for _ in range(nb)]
+    buckets[0].append(s)
+    pasos = _pasos(rows, cols, s) if visit is not None else None
+    pendientes = 1
+    d = 0
+    while pendientes:
+        b = buckets[d % nb]
+        while not b:
+            d += 1
+            b = buckets[d % nb]
+        c = b.pop()
+        pendientes -= 1
+        if dist[c] != d:
+            continue                     # entrada vieja (ya se mejoró)
+        if visit is not None:
+            visit(pasos[c])
+        if goal[c]:
+            return c, d
+        y = c % cols
+        for n, ok in ((c - cols, c >= cols), (c + cols, c < (rows - 1) * cols),
+                      (c - 1, y > 0), (c + 1, y < cols - 1)):
+            if ok and grid[n]:
+                nd = d + grid[n]
+                if nd < dist.get(n, INF):
+                    dist[n] = nd
+                    parent[n] = c
+                    if visit is not None:
+                        pasos[n] = pasos[c] + 1
+                    buckets[nd % nb].append(n)
+                    pendientes += 1
+    return -1, None
+
+
+def _heap(grid, goal, rows, cols, s, parent, metas, cmin, visit=None):
+    """A* con heap binario (h=0 → Dijkstra si hay muchos tesoros)."""
+    INF = 1 << 60
+    if metas and len(metas) <= ASTAR_MAX_META:
+        def h(c):
+            x, y = divmod(c, cols)
+            return cmin * min(abs(x - tx) + abs(y - ty) for tx, ty in metas)
+    else:
+        h = lambda c: 0
+    dist = {s: 0}
+    pasos = _pasos(rows, cols, s) if visit is not None else None
+    heap = [(h(s), 0, s)]
+    while heap:
+        _, d, c = heapq.heappop(heap)
+        if d != dist[c]:
+            continue
+        if visit is not None:
+            visit(pasos[c])
+        if goal[c]:
+            return c, d
+        y = c % cols
+        for n, ok in ((c - cols, c >= cols), (c + cols, c < (rows - 1) * cols),
+                      (c - 1, y > 0), (c + 1, y < cols - 1)):
+            if ok and grid[n]:
+                nd = d + grid[n]
+                if nd < dist.get(n, INF):
+                    dist[n] = nd
+                    parent[n] = c
+                    if visit is not None:
+                        pasos[n] = pasos[c] + 1
+                    heapq.heappush(heap, (nd + h(n), nd, n))
+    return -1, None
+
+
+def min_cost_path(mapa, sx, sy, costs=TERRAIN_COST, metodo=None, stats=None):
+    """
+    Camino de costo mínimo desde (sx, sy) al tesoro más barato.
+    Devuelve (costo, [(x, y), ...]) o (None, []) si no hay.
+    metodo: None (automático), "bfs", "dial" o "heap".
+    stats (opcional): SolverStats para contar nodos / progreso / cancelar.
+    """
+    if stats is None:
+        return _min_cost_path(mapa, sx, sy, costs, metodo, None)
+    t0 = time.perf_counter()
+    try:
+        return _min_cost_path(mapa, sx, sy, costs, metodo, stats.visit)
+    finally:
+        stats.elapsed += time.perf_counter() - t0
+
+
+def _min_cost_path(mapa, sx, sy, costs, metodo, visit):
+    rows, cols = len(mapa), len(mapa[0]) if mapa else 0
+    if not (0 <= sx < rows and 0 <= sy < cols) or mapa[sx][sy] == WALL:
+        return None, []
+    grid, texto, cmin, cmax = _cost_grid(mapa, costs)
+    goal = bytearray(rows * cols)
+    metas = []
+    t = TREASURE.encode("latin-1")
+    k = texto.find(t)
+    while k >= 0:
+        goal[k] = 1
+        metas.append(divmod(k, cols))
+        k = texto.find(t, k + 1)
+    if not metas:
+        return None, []
+
+    if metodo is None:
+        metodo = "bfs" if cmax == 1 else ("dial" if cmax <= BUCKET_MAX else "heap")
+    s = sx * cols + sy
+    parent = array("i", [-1]) * (rows * cols)
+    if metodo == "bfs":
+        if cmax != 1:
+            raise ValueError("BFS solo sirve con todos los costos en 1")
+        fin, costo = _bfs(grid, goal, rows, cols, s, parent, visit)
+    elif metodo == "dial":
+        fin, costo = _dial(grid, goal, rows, cols, s, parent, cmax, visit)
+    elif metodo == "heap":
+        fin, costo = _heap(grid, goal, rows, cols, s, parent, metas, cmin, visit)
+    else:
+        raise ValueError(f"metodo desconocido: {metodo!r}")
+    if fin < 0:
+        return None, []
+
+    camino = []
+    c = fin
+    while c != s:
+        camino.append(divmod(c, cols))
+        c = parent[c]
+    camino.append((sx, sy))
+    camino.reverse()
+    return costo, camino
+
+
+def search_treasure_cost(mapa, sx, sy, costs=TERRAIN_COST, stats=None):
+    """Como search_treasure pero con costos: (found, result, costo)."""
+    costo, camino = min_cost_path(mapa, sx, sy, costs, stats=stats)
+    result = clone_matrix(mapa)
+    for x, y in camino:
+        result[x][y] = PATH_MARK
+    return costo is not None, result, costo
+
+
+def is_weighted(mapa, costs=TERRAIN_COST):
+    """True si el mapa tiene alguna celda que cuesta más de 1."""
+    presentes = set().union(*map(set, mapa)) if mapa else set()
+    return any(costs.get(ch, 1) > 1 for ch in presentes if ch != WALL)
+
+
+def path_cost(mapa, camino, costs=TERRAIN_COST):
+    """Costo de recorrer `camino` (sin cobrar la primera celda)."""
+    return sum(costs.get(mapa[x][y], 1) for x, y in camino[1:])
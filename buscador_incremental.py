@@ -0,0 +1,286 @@
+from __future__ import annotations
+import heapq
+
+from generador_mapa import clone_matrix, in_bounds
+
+Matrix = list[list[str]]
+
+WALL      = "#"
+TREASURE  = "T"
+PATH_MARK = "*"
+
+INF = float("inf")
+
+# Nodo virtual "meta": cada tesoro se conecta a él con costo 1,
+# así buscamos el tesoro más cercano con una sola meta.
+# (costo 1 y no 0: con 0 la key del tesoro empata con la de la meta y
+#  LPA* puede cortar antes de reparar el tesoro)
+_META = -1
+
+_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1))   # arriba, abajo, izquierda, derecha
+
+# Con más tesoros que esto la heurística usa la caja que los envuelve
+# (O(1) por celda) en vez del mínimo exacto sobre todos.
+_H_EXACTO = 16
+
+
+# ------------------------------------------------------------
+# Solver incremental (Lifelong Planning A*)
+# ------------------------------------------------------------
+class SolverIncremental:
+    """
+    Solver persistente que repara el camino tras editar celdas (LPA*).
+
+    Uso típico desde un editor:
+        solver = SolverIncremental(mapa, sx, sy)
+        found, result = solver.solve()
+        solver.set_cell(x, y, "#")          # notifica el cambio
+        found, result = solver.solve()      # solo re-expande lo afectado
+
+    El costo de re-resolver depende del tamaño de la edición, no del mapa.
+    El mapa se guarda por referencia: las ediciones deben pasar por
+    set_cell / notify_cell para que el solver se entere.
+    """
+
+    def __init__(self, mapa, start_x, start_y):
+        self.mapa = mapa
+        self.start = (start_x, start_y)
+        self.reset()
+
+    # ---------- Estado ----------
+    def reset(self, mapa=None):
+        """Descarta todo lo aprendido (p.ej. si se reemplaza el mapa entero)."""
+        if mapa is not None:
+            self.mapa = mapa
+        self.rows, self.cols = len(self.mapa), len(self.mapa[0])
+        self._g: dict[int, float] = {}
+        self._rhs: dict[int, float] = {}
+        self._open: dict[int, tuple] = {}                     # nodo -> key vigente
+        self._heap: list[tuple[tuple, int]] = []
+        self._treasures = {
+            i * self.cols + j
+            for i, row in enumerate(self.mapa)
+            for j, ch in enumerate(row) if ch == TREASURE
+        }
+        self._hcache: dict[int, int] = {}
+        self._caja = None                                      # (x0, x1, y0, y1) de los tesoros
+        self.expanded = 0                                      # nodos expandidos (último solve)
+
+        s = self._start_id()
+        if s is not None:
+            self._rhs[s] = 0
+            self._push(s)
+
+    def set_start(self, start_x, start_y):
+        """Cambiar el inicio invalida las distancias: se reinicia."""
+        self.start = (start_x, start_y)
+        self.reset()
+
+    def set_cell(self, x, y, ch):
+        """Escribe ch en (x,y) y repara el estado incremental."""
+        if not in_bounds(self.mapa, x, y) or self.mapa[x][y] == ch:
+            return
+        self.mapa[x][y] = ch
+        self.notify_cell(x, y)
+
+    def notify_cell(self, x, y):
+        """Avisa que (x,y) cambió (cuando el mapa se editó por fuera)."""
+        if not in_bounds(self.mapa, x, y):
+            return
+        u = x * self.cols + y
+        had_treasure = u in self._treasures
+        if self.mapa[x][y] == TREASURE:
+            self._treasures.add(u)
+        else:
+            self._treasures.discard(u)
+        if had_treasure != (u in self._treasures):
+            self._hcache.clear()
+            self._caja = None
+            self._rekey_open()                  # la heurística depende de los tesoros
+            self._update_vertex(_META)
+
+        if (x, y) == self.start:
+            # el inicio pasó a ser muro (o dejó de serlo): empezar de cero
+            self.reset()
+            return
+
+        self._update_vertex(u)
+        for dx, dy in _DIRS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.rows and 0 <= ny < self.cols:
+                self._update_vertex(nx * self.cols + ny)
+
+    # ---------- Resolver ----------
+    def solve(self):
+        """Devuelve (found, result) con el mismo formato que search_treasure."""
+        result = clone_matrix(self.mapa)
+        path = self.path()
+        for x, y in path:
+            result[x][y] = PATH_MARK
+        return bool(path), result
+
+    def path(self):
+        """Camino mínimo inicio → tesoro como lista [(x,y), ...] (vacía si no hay)."""
+        self._compute_shortest_path()
+        if self._g.get(_META, INF) == INF:
+            return []
+        # Tesoro con menor g
+        g = self._g
+        cur = min(self._treasures, key=lambda t: g.get(t, INF))
+        out = [divmod(cur, self.cols)]
+        s = self._start_id()
+        while cur != s:
+            # Predecesor con menor g (retroceso por el gradiente de distancias)
+            best, best_g = None, INF
+            for v, c in self._preds(cur):
+                gv = g.get(v, INF) + c
+                if gv < best_g:
+                    best, best_g = v, gv
+            if best is None or len(out) > self.rows * self.cols:
+                return []   # no debería pasar con g consistentes
+            cur = best
+            out.append(divmod(cur, self.cols))
+        out.reverse()
+        return out
+
+    # ---------- Internos LPA* ----------
+    def _start_id(self):
+        sx, sy = self.start
+        if not in_bounds(self.mapa, sx, sy) or self.mapa[sx][sy] == WALL:
+            return None
+        return sx * self.cols + sy
+
+    def _expands(self, u):
+        """True si desde u se puede avanzar a sus vecinos (no muro ni tesoro)."""
+        ch = self.mapa[u // self.cols][u % self.cols]
+        return ch != WALL and ch != TREASURE
+
+    def _h(self, u):
+        # Distancia al tesoro más cercano + 1 (la arista tesoro → meta):
+        # sin ese +1 todas las celdas con f igual al camino quedan por
+        # debajo de la key de la meta y se expanden.
+        h = self._hcache.get(u)
+        if h is not None:
+            return h
+        ts = self._treasures
+        if u == _META or not ts:
+            return 0
+        cols = self.cols
+        x, y = divmod(u, cols)
+        if len(ts) <= _H_EXACTO:
+            h = min(abs(x - t // cols) + abs(y - t % cols) for t in ts) + 1
+        else:
+            # Distancia a la caja de los tesoros: sigue siendo admisible
+            # y consistente, pero no recorre todos los tesoros.
+            if self._caja is None:
+                xs = [t // cols for t in ts]
+                ys = [t % cols for t in ts]
+                self._caja = (min(xs), max(xs), min(ys), max(ys))
+            x0, x1, y0, y1 = self._caja
+            h = max(x0 - x, 0, x - x1) + max(y0 - y, 0, y - y1) + 1
+        self._hcache[u] = h
+        return h
+
+    def _key(self, u):
+        # Empates en f: primero los sub-consistentes (g < rhs), que pueden
+        # estar sosteniendo un g viejo de la meta; después el de mayor g,
+        # que está más cerca del tesoro (con menor g el primer solve en
+        # un mapa abierto se vuelve un BFS de todas las celdas con igual f).
+        g, rhs = self._g.get(u, INF), self._rhs.get(u, INF)
+        if g < rhs:
+            return (g + self._h(u), 0, g)
+        return (rhs + self._h(u), 1, -rhs)
+
+    def _push(self, u):
+        k = self._key(u)
+        self._open[u] = k
+        heapq.heappush(self._heap, (k, u))
+
+    def _rekey_open(self):
+        self._heap = []
+        for u in self._open:
+            k = self._key(u)
+            self._open[u] = k
+            self._heap.append((k, u))
+        heapq.heapify(self._heap)
+
+    def _top(self):
+        # Descarta entradas obsoletas (borrado perezoso)
+        heap, open_ = self._heap, self._open
+        while heap:
+            k, u = heap[0]
+            if open_.get(u) == k:
+                return k, u
+            heapq.heappop(heap)
+        return (INF, 1, -INF), None
+
+    def _preds(self, u):
+        """Predecesores de u con el costo de la arista (siempre 1)."""
+        if u == _META:
+            for t in self._treasures:
+                yield t, 1
+            return
+        x, y = divmod(u, self.cols)
+        if self.mapa[x][y] == WALL:
+            return
+        for dx, dy in _DIRS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.rows and 0 <= ny < self.cols:
+                v = nx * self.cols + ny
+                if self._expands(v):
+                    yield v, 1
+
+    def _succs(self, u):
+        x, y = divmod(u, self.cols)
+        ch = self.mapa[x][y]
+        if ch == TREASURE:
+            yield _META
+            return
+        if ch == WALL:
+            return
+        for dx, dy in _DIRS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.rows and 0 <= ny < self.cols and self.mapa[nx][ny] != WALL:
+                yield nx * self.cols + ny
+
+    def _update_vertex(self, u):
+        if u != self._start_id():
+            g = self._g
+            best = INF
+            for v, c in self._preds(u):
+                gv = g.get(v, INF) + c
+                if gv < best:
+                    best = gv
+            if best == INF:
+                self._rhs.pop(u, None)
+            else:
+                self._rhs[u] = best
+        self._open.pop(u, None)
+        if self._g.get(u, INF) != self._rhs.get(u, INF):
+            self._push(u)
+
+    def _compute_shortest_path(self):
+        g, rhs = self._g, self._rhs
+        expanded = 0
+        while True:
+            k, u = self._top()
+            if u is None:
+                break
+            if not (k < self._key(_META) or rhs.get(_META, INF) != g.get(_META, INF)):
+                break
+            heapq.heappop(self._heap)
+            del self._open[u]
+            expanded += 1
+            if u == _META:
+                g[u] = rhs.get(u, INF)
+                continue
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for s in self._succs(u):
+                    self._update_vertex(s)
+            else:
+                g.pop(u, None)
+                self._update_vertex(u)
+                for s in self._succs(u):
+                    self._update_vertex(s)
+        self.expanded = expanded
@@ -0,0 +1,357 @@
+from __future__ import annotations
+import hashlib
+import heapq
+import json
+import os
+from array import array
+from collections import deque
+
+from generador_mapa import clone_matrix, load_map
+
+# ------------------------------------------------------------
+# Búsqueda jerárquica (HPA*) para mapas enormes
+# ------------------------------------------------------------
+#   1) El mapa se parte en clusters de K x K celdas.
+#   2) En cada borde entre clusters vecinos se buscan tramos abiertos de
+#      ambos lados ("entradas"); cada entrada aporta un par de nodos
+#      abstractos unidos con costo 1 (tramos largos: dos pares, uno en
+#      cada extremo).
+#   3) Dentro de cada cluster se unen sus nodos (y los tesoros, que
+#      también son nodos) con la distancia BFS local.
+#   Esto se calcula UNA vez por mapa y se puede guardar al lado del .txt.
+#
+#   Consulta: BFS local desde el inicio hasta los nodos de su cluster,
+#   Dijkstra/A* en el grafo abstracto hasta el primer tesoro, y refinado
+#   del camino abstracto con BFS dentro de cada cluster.
+#   El camino es casi óptimo (no siempre el mínimo exacto), como en HPA*.
+
+WALL      = "#"
+TREASURE  = "T"
+PATH_MARK = "*"
+
+CLUSTER        = 32
+ENTRADA_LARGA  = 6          # tramos de este largo o más → dos transiciones
+ASTAR_MAX_META = 64         # con pocos tesoros se usa A* (Manhattan); si no, Dijkstra
+HPA_EXT        = ".hpa"
+_MAGIC         = b"HPA1\n"
+
+_B_WALL, _B_TREASURE = ord(WALL), ord(TREASURE)
+
+
+def _flat(mapa):
+    return bytearray("".join("".join(row) for row in mapa).encode("latin-1"))
+
+def _map_digest(grid, rows, cols):
+    # las dimensiones entran al hash: 4x6 y 6x4 con las mismas celdas no coinciden
+    return hashlib.sha1(f"{rows}x{cols}\n".encode("ascii") + grid).hexdigest()
+
+
+class AbstraccionHPA:
+    """Grafo abstracto de un mapa (ver comentario del módulo)."""
+
+    def __init__(self, mapa, cluster=CLUSTER):
+        self.mapa    = mapa
+        self.rows    = len(mapa)
+        self.cols    = len(mapa[0]) if mapa else 0
+        self.cluster = cluster
+        self.grid    = _flat(mapa)
+        self.digest  = _map_digest(self.grid, self.rows, self.cols)
+        self.nodes   = array("q")          # índice de nodo -> celda (x*cols + y)
+        self.goal    = bytearray()         # 1 si el nodo es un tesoro
+        self.adj     = []                  # índice de nodo -> [(vecino, costo), ...]
+        self._node_of = {}                 # celda -> índice de nodo
+        self._metas_xy = None              # (x, y) de los tesoros, para la heurística
+
+    # ---------- Construcción ----------
+    @classmethod
+    def build(cls, mapa, cluster=CLUSTER):
+        self = cls(mapa, cluster)
+        self._build_entradas()
+        for k, b in enumerate(self.grid):
+            if b == _B_TREASURE:
+                self._node(k, goal=True)
+        self._build_intra()
+        return self
+
+    def _node(self, cell, goal=False):
+        n = self._node_of.get(cell)
+        if n is None:
+            n = len(self.nodes)
+            self._node_of[cell] = n
+            self.nodes.append(cell)
+            self.goal.append(1 if goal else 0)
+            self.adj.append([])
+        elif goal:
+            self.goal[n] = 1
+        return n
+
+    def _link(self, a, b, cost):
+        self.adj[a].append((b, cost))
+        self.adj[b].append((a, cost))
+
+    def _build_entradas(self):
+        rows, cols, K, g = self.rows, self.cols, self.cluster, self.grid
+
+        def tramos(pares):
+            """pares: [(celda_a, celda_b), ...] en orden; une tramos abiertos."""
+            run = []
+            for a, b in pares + [(None, None)]:
+                if a is not None and g[a] != _B_WALL and g[b] != _B_WALL:
+                    run.append((a, b))
+                    continue
+                if run:
+                    if len(run) >= ENTRADA_LARGA:
+                        elegidos = (run[0], run[-1])
+                    else:
+                        elegidos = (run[len(run) // 2],)
+                    for ca, cb in elegidos:
+                        self._link(self._node(ca), self._node(cb), 1)
+                    run = []
+
+        # Bordes horizontales (entre fila x-1 y x)
+        for x in range(K, rows, K):
+            for y0 in range(0, cols, K):
+                tramos([((x - 1) * cols + y, x * cols + y) for y in range(y0, min(y0 + K, cols))])
+        # Bordes verticales (entre columna y-1 e y)
+        for y in range(K, cols, K):
+            for x0 in range(0, rows, K):
+                tramos([(x * cols + y - 1, x * cols + y) for x in range(x0, min(x0 + K, rows))])
+
+    def _cluster_of(self, cell):
+        x, y = divmod(cell, self.cols)
+        return x // self.cluster, y // self.cluster
+
+    def _bounds(self, ci, cj):
+        K = self.cluster
+        return ci * K, cj * K, min((ci + 1) * K, self.rows), min((cj + 1) * K, self.cols)
+
+    def _build_intra(self):
+        por_cluster = {}
+        for n, cell in enumerate(self.nodes):
+            por_cluster.setdefault(self._cluster_of(cell), []).append(n)
+        for (ci, cj), ns in por_cluster.items():
+            if len(ns) < 2:
+                continue
+            bounds = self._bounds(ci, cj)
+            for i, n in enumerate(ns):
+                dist = self._bfs_local(self.nodes[n], bounds)
+                for m in ns[i + 1:]:
+                    d = dist.get(self.nodes[m])
+                    if d is not None:
+                        self._link(n, m, d)
+
+    # ---------- BFS dentro de un cluster ----------
+    def _bfs_local(self, src, bounds, want_parent=False, stop=None):
+        """Distancias desde src sin salir de bounds=(x0, y0, x1, y1); corta al llegar a `stop`."""
+        x0, y0, x1, y1 = bounds
+        cols, g = self.cols, self.grid
+        dist = {src: 0}
+        parent = {src: -1} if want_parent else None
+        q = deque([src])
+        while q:
+            c = q.popleft()
+            if c == stop:
+                break
+            d = dist[c] + 1
+            x, y = divmod(c, cols)
+            # Un tesoro es meta: no se pasa "a través" de él
+            if g[c] == _B_TREASURE and c != src:
+                continue
+            for n, ok in ((c - cols, x > x0), (c + cols, x < x1 - 1),
+                          (c - 1, y > y0), (c + 1, y < y1 - 1)):
+                if ok and n not in dist and g[n] != _B_WALL:
+                    dist[n] = d
+                    if want_parent:
+                        parent[n] = c
+                    q.append(n)
+        return (dist, parent) if want_parent else dist
+
+    def _local_path(self, a, b):
+        """Camino de celdas a → b (ambas en el mismo cluster), sin incluir a."""
+        bounds = self._bounds(*self._cluster_of(a))
+        _, parent = self._bfs_local(a, bounds, want_parent=True, stop=b)
+        if b not in parent:
+            return None
+        out = []
+        while b != a:
+            out.append(b)
+            b = parent[b]
+        out.reverse()
+        return out
+
+    # ---------- Consulta ----------
+    def _metas(self):
+        if self._metas_xy is None:
+            self._metas_xy = [divmod(self.nodes[n], self.cols)
+                              for n in range(len(self.nodes)) if self.goal[n]]
+        return self._metas_xy
+
+    def path(self, sx, sy):
+        """Camino inicio → tesoro más cercano (aprox.) como [(x, y), ...]; [] si no hay."""
+        if not (0 <= sx < self.rows and 0 <= sy < self.cols):
+            return []
+        cols, g = self.cols, self.grid
+        s = sx * cols + sy
+        if g[s] == _B_WALL:
+            return []
+        if g[s] == _B_TREASURE:
+            return [(sx, sy)]
+        if not self._metas():
+            return []                    # mapa sin tesoros
+
+        # Conexión del inicio con los nodos de su cluster
+        bounds = self._bounds(*self._cluster_of(s))
+        local = self._bfs_local(s, bounds)
+        START = -1
+        dist = {START: 0}
+        prev = {START: None}
+        heap = []
+        for cell, d in local.items():
+            n = self._node_of.get(cell)
+            if n is not None and d < dist.get(n, float("inf")):
+                dist[n] = d
+                prev[n] = START
+                heap.append((d, n))
+
+        # Heurística: Manhattan al tesoro más cercano (admisible: cada arista
+        # abstracta cuesta al menos la distancia real en la grilla)
+        metas = self._metas()
+        if len(metas) > ASTAR_MAX_META:
+            h = lambda n: 0
+        else:
+            def h(n):
+                x, y = divmod(self.nodes[n], cols)
+                return min(abs(x - tx) + abs(y - ty) for tx, ty in metas)
+        heap = [(d + h(n), d, n) for d, n in heap]
+        heapq.heapify(heap)
+
+        goal_node = None
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if d > dist.get(u, float("inf")):
+                continue
+            if self.goal[u]:
+                goal_node = u
+                break
+            for v, c in self.adj[u]:
+                nd = d + c
+                if nd < dist.get(v, float("inf")):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd + h(v), nd, v))
+        if goal_node is None:
+            return []
+
+        # Camino abstracto y refinado
+        abstracto = []
+        u = goal_node
+        while u != START:
+            abstracto.append(u)
+            u = prev[u]
+        abstracto.reverse()
+
+        celdas = [s]
+        cur = s
+        for n in abstracto:
+            nxt = self.nodes[n]
+            if self._cluster_of(cur) == self._cluster_of(nxt):
+                tramo = self._local_path(cur, nxt)
+                if tramo is None:
+                    return []            # no debería pasar: la arista salió de este BFS
+                celdas.extend(tramo)
+            else:
+                celdas.append(nxt)       # arista entre clusters: celdas vecinas
+            cur = nxt
+        return [divmod(c, cols) for c in celdas]
+
+    def solve(self, sx, sy):
+        """Mismo formato que search_treasure: (found, result)."""
+        camino = self.path(sx, sy)
+        result = clone_matrix(self.mapa)
+        for x, y in camino:
+            result[x][y] = PATH_MARK
+        return bool(camino), result
+
+    # ---------- Disco ----------
+    def save(self, path):
+        """Guarda el grafo abstracto (binario compacto) para no recalcularlo."""
+        edges = array("q")
+        for a, vecinos in enumerate(self.adj):
+            for b, c in vecinos:
+                if a < b:
+                    edges.extend((a, b, c))
+        header = {
+            "rows": self.rows, "cols": self.cols, "cluster": self.cluster,
+            "digest": self.digest, "nodes": len(self.nodes), "edges": len(edges) // 3,
+        }
+        with open(path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(self.nodes.tobytes())
+            f.write(bytes(self.goal))
+            f.write(edges.tobytes())
+        return path
+
+    @classmethod
+    def load(cls, path, mapa):
+        """Carga una abstracción guardada; ValueError si no corresponde a `mapa`."""
+        self = cls(mapa)
+        with open(path, "rb") as f:
+            if f.readline() != _MAGIC:
+                raise ValueError("no es un archivo HPA")
+            header = json.loads(f.readline())
+            if (header["rows"], header["cols"]) != (self.rows, self.cols):
+                raise ValueError(f"la abstracción es de un mapa {header['rows']}x{header['cols']}, "
+                                 f"no {self.rows}x{self.cols}")
+            if header["digest"] != self.digest:
+                raise ValueError("la abstracción es de otro mapa (o el mapa cambió)")
+            self.cluster = header["cluster"]
+            n, e = header["nodes"], header["edges"]
+            self.nodes = array("q")
+            self.nodes.frombytes(f.read(n * self.nodes.itemsize))
+            self.goal = bytearray(f.read(n))
+            edges = array("q")
+            edges.frombytes(f.read(3 * e * edges.itemsize))
+        self._node_of = {cell: i for i, cell in enumerate(self.nodes)}
+        self.adj = [[] for _ in range(n)]
+        for k in range(0, len(edges), 3):
+            self._link(edges[k], edges[k + 1], edges[k + 2])
+        return self
+
+
+def hpa_path_for(map_path):
+    """'MAPS/MAP01.txt' → 'MAPS/MAP01.hpa'"""
+    return os.path.splitext(map_path)[0] + HPA_EXT
+
+def load_or_build_hpa(map_path, mapa, cluster=CLUSTER):
+    """Usa la abstracción guardada junto al mapa; si falta o no coincide, la recalcula y guarda."""
+    hpa = hpa_path_for(map_path)
+    if os.path.exists(hpa):
+        try:
+            abst = AbstraccionHPA.load(hpa, mapa)
+            if abst.cluster == cluster:
+                return abst
+        except (ValueError, KeyError, OSError):
+            pass
+    abst = AbstraccionHPA.build(mapa, cluster)
+    abst.save(hpa)
+    return abst
+
+
+if __name__ == "__main__":
+    import argparse, time
+    ap = argparse.ArgumentParser(description="Precalcula (o usa) la abstracción HPA* de un mapa y resuelve.")
+    ap.add_argument("mapa")
+    ap.add_argument("inicio", nargs="?", default=None, help="x,y (opcional)")
+    ap.add_argument("-k", "--cluster", type=int, default=CLUSTER)
+    args = ap.parse_args()
+
+    m = load_map(args.mapa)
+    t0 = time.perf_counter()
+    abst = load_or_build_hpa(args.mapa, m, args.cluster)
+    print(f"{len(abst.nodes)} nodos abstractos ({time.perf_counter() - t0:.3f}s) → {hpa_path_for(args.mapa)}")
+    if args.inicio:
+        sx, sy = (int(v) for v in args.inicio.split(","))
+        t0 = time.perf_counter()
+        camino = abst.path(sx, sy)
+        print(f"found={bool(camino)} largo={max(len(camino) - 1, 0)} ({(time.perf_counter() - t0) * 1000:.2f} ms)")
@@ -0,0 +1,328 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import time
+from array import array
+
+from generador_mapa import clone_matrix
+
+WALL      = "#"
+TREASURE  = "T"
+PATH_MARK = "*"
+
+CKPT_EXT  = ".ckpt"
+TRAZA_EXT = ".traza"                 # la traza va aparte: <checkpoint>.traza
+
+CHECKPOINT_EVERY_S      = 5.0        # mínimo entre checkpoints
+CHECKPOINT_MAX_OVERHEAD = 0.05       # fracción del tiempo que puede irse en escribirlos
+CHECKPOINT_MAX_BYTES    = 256 << 20  # tope de .ckpt + .traza (None = sin tope)
+_CHECK_CADA = 1024                   # pasos entre consultas al reloj
+
+_MAGIC = b"CKP1\n"
+_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1))   # mismo orden que search_with_steps
+
+
+# ------------------------------------------------------------
+# Búsqueda con checkpoints (se puede cortar y reanudar)
+# ------------------------------------------------------------
+#   Es el backtracking de search_with_steps (mismo orden de visita, mismos
+#   pasos) pero iterativo, con todo el estado en arrays planos:
+#     pila / prox  → frontera: celdas del camino actual y la próxima
+#                    dirección a probar en cada una
+#     visitado     → bitset de rows*cols bits
+#     traza        → celdas en orden de visita (los pasos de la animación)
+#   Cada `every_s` segundos se vuelca a un archivo (escritura atómica:
+#   .tmp + os.replace). Si escribir tarda, se espacia más: el tiempo en
+#   checkpoints queda por debajo de max_overhead. Frontera y bitset van
+#   en el .ckpt; la traza, completa, en <checkpoint>.traza, donde cada
+#   checkpoint solo agrega los pasos nuevos (la cabecera del .ckpt dice
+#   cuántos valen: lo que sobre de un corte a mitad de escritura se ignora).
+#   Si un checkpoint pasaría de max_bytes (.ckpt + .traza) no se escribe:
+#   queda el último que entró, que sigue siendo válido para reanudar
+#   (`omitidos` cuenta los que se saltearon).
+#   Al cortarse con una excepción (cancelar, Ctrl+C) se intenta un último
+#   checkpoint antes de propagarla; si ese falla, se propaga igual la
+#   original. Al terminar se borran los archivos.
+#
+#   python buscador_reanudable.py MAPS/MAP01.txt 0 0 --cada 10
+
+def map_digest(mapa):
+    return hashlib.sha1("\n".join("".join(row) for row in mapa).encode("utf-8")).hexdigest()
+
+def checkpoint_path_for(map_name, folder):
+    """'MAP01.txt' → 'folder/MAP01.ckpt' (junto a las trazas de MAPS_Animate)"""
+    base = os.path.splitext(os.path.basename(map_name))[0]
+    return os.path.join(folder, base + CKPT_EXT)
+
+def remove_checkpoint(path):
+    """Borra el checkpoint y su traza (si existen)."""
+    for p in (path, path + TRAZA_EXT, path + ".tmp"):
+        if os.path.exists(p):
+            os.remove(p)
+
+def _leer_cabecera(f):
+    if f.readline() != _MAGIC:
+        raise ValueError("no es un checkpoint de búsqueda")
+    return json.loads(f.readline())
+
+def drop_stale_checkpoint(path, mapa):
+    """
+    Borra el checkpoint `path` si ya no sirve para `mapa` (el mapa cambió
+    o el archivo está roto). Devuelve True si lo borró.
+    """
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, "rb") as f:
+            vigente = _leer_cabecera(f).get("digest") == map_digest(mapa)
+    except (ValueError, OSError):
+        vigente = False
+    if not vigente:
+        remove_checkpoint(path)
+    return not vigente
+
+def prune_checkpoints(folder):
+    """Borra en `folder` las trazas y .tmp huérfanos (sin su .ckpt al lado)."""
+    if not os.path.isdir(folder):
+        return
+    for name in os.listdir(folder):
+        for ext in (TRAZA_EXT, ".tmp"):
+            if name.endswith(CKPT_EXT + ext):
+                ckpt = os.path.join(folder, name[:-len(ext)])
+                if not os.path.exists(ckpt):
+                    os.remove(os.path.join(folder, name))
+
+
+class BusquedaReanudable:
+    """
+    DFS iterativa desde (x, y) hasta un tesoro, con estado serializable.
+
+    Uso:
+        b = BusquedaReanudable(mapa, x, y)          # o BusquedaReanudable.load(path, mapa)
+        found = b.run(checkpoint=path)              # corta/reanuda sin perder lo hecho
+        b.pasos(), b.result()
+
+    `texto`: el mapa ya aplanado (bytes, fila tras fila, como lo arma
+    __init__); si se resuelve muchas veces el mismo mapa, se pasa el mismo
+    y no se vuelve a armar por búsqueda.
+    """
+
+    def __init__(self, mapa, x, y, texto=None):
+        self.mapa  = mapa
+        self.rows  = len(mapa)
+        self.cols  = len(mapa[0]) if self.rows else 0
+        self.start = (x, y)
+        if texto is None:
+            texto = "".join("".join(row) for row in mapa).encode("latin-1", "replace")
+        self.texto = texto
+        self._digest = None
+        self.visitado = bytearray((self.rows * self.cols + 7) // 8)
+        self.pila  = array("i")
+        self.prox  = bytearray()
+        self.traza = array("i")
+        self.found = None                    # None = sin terminar
+        self._en_disco = (None, 0)           # (checkpoint, pasos de la traza ya escritos)
+        self.checkpoints = 0
+        self.omitidos = 0                    # checkpoints salteados por max_bytes
+
+    @property
+    def digest(self):
+        """map_digest del mapa; se calcula recién al guardar/cargar un checkpoint."""
+        if self._digest is None:
+            self._digest = map_digest(self.mapa)
+        return self._digest
+
+    # ---------- Búsqueda ----------
+    def _visitar(self, c, stats):
+        self.visitado[c >> 3] |= 1 << (c & 7)
+        self.pila.append(c)
+        self.prox.append(0)
+        self.traza.append(c)
+        # antes de avisar a stats: un Cancelado acá no debe perder el tesoro
+        if self.texto[c] == ord(TREASURE):
+            self.found = True
+        if stats is not None:
+            stats.depth += 1
+            stats.visit(stats.depth)
+
+    def step(self, stats=None):
+        """Visita la próxima celda: devuelve (x, y), o None si la búsqueda terminó."""
+        if self.found is not None:
+            return None
+        rows, cols = self.rows, self.cols
+        pila, prox = self.pila, self.prox
+        if not self.traza:                                   # primera llamada
+            x, y = self.start
+            if not (0 <= x < rows and 0 <= y < cols) or self.texto[x * cols + y] == ord(WALL):
+                self.found = False
+                return None
+            self._visitar(x * cols + y, stats)
+            return (x, y)
+        vis, texto, muro = self.visitado, self.texto, ord(WALL)
+        while pila:
+            c = pila[-1]
+            d = prox[-1]
+            if d == 4:                                       # sin salida: retroceder
+                pila.pop(); prox.pop()
+                if stats is not None:
+                    stats.backtracks += 1
+                    stats.depth -= 1
+                continue
+            prox[-1] = d + 1
+            x, y = divmod(c, cols)
+            nx, ny = x + _DIRS[d][0], y + _DIRS[d][1]
+            if 0 <= nx < rows and 0 <= ny < cols:
+                n = nx * cols + ny
+                if texto[n] != muro and not vis[n >> 3] >> (n & 7) & 1:
+                    self._visitar(n, stats)
+                    return (nx, ny)
+        self.found = False
+        return None
+
+    def run(self, checkpoint=None, every_s=CHECKPOINT_EVERY_S, max_overhead=CHECKPOINT_MAX_OVERHEAD,
+            max_bytes=CHECKPOINT_MAX_BYTES, stats=None, on_step=None):
+        """
+        Corre hasta terminar; devuelve found. Con `checkpoint` guarda el
+        estado periódicamente y, al terminar bien, borra los archivos.
+        """
+        t0 = time.perf_counter()
+        proximo = t0 + every_s
+        n = 0
+        try:
+            while (p := self.step(stats)) is not None:
+                if on_step is not None:
+                    on_step(p)
+                n += 1
+                if checkpoint and n % _CHECK_CADA == 0 and time.perf_counter() >= proximo:
+                    t = time.perf_counter()
+                    self.save(checkpoint, max_bytes)
+                    dt = time.perf_counter() - t
+                    proximo = time.perf_counter() + max(every_s, dt / max_overhead)
+        except BaseException:
+            if checkpoint:                  # con found puesto, reanudar lo devuelve sin buscar
+                try:
+                    self.save(checkpoint, max_bytes)
+                except Exception:           # disco lleno, permisos...: que no tape la original
+                    pass
+            raise
+        finally:
+            if stats is not None:
+                stats.elapsed += time.perf_counter() - t0
+        if checkpoint:
+            remove_checkpoint(checkpoint)
+        return self.found
+
+    # ---------- Resultado ----------
+    def pasos(self):
+        """[(x, y), ...] en orden de visita."""
+        cols = self.cols
+        return [divmod(c, cols) for c in self.traza]
+
+    def result(self):
+        """Copia del mapa con '*' en el camino inicio → tesoro (la pila)."""
+        res = clone_matrix(self.mapa)
+        if self.found:
+            for c in self.pila:
+                x, y = divmod(c, self.cols)
+                res[x][y] = PATH_MARK
+        return res
+
+    # ---------- Checkpoint ----------
+    def tamano_checkpoint(self):
+        """Bytes que ocuparían .ckpt + .traza si se guardara ahora (sin la cabecera)."""
+        return (len(self.pila) * (self.pila.itemsize + 1) + len(self.visitado)
+                + len(self.traza) * self.traza.itemsize)
+
+    def save(self, path, max_bytes=None):
+        """
+        Escribe el estado (atómico) y agrega a path + TRAZA_EXT los pasos
+        nuevos. Si pasaría de `max_bytes` no escribe nada y devuelve None.
+        """
+        if max_bytes is not None and self.tamano_checkpoint() > max_bytes:
+            self.omitidos += 1
+            return None
+        traza, n = self.traza, len(self.traza)
+        ya = self._en_disco[1] if self._en_disco[0] == path else 0
+        tpath = path + TRAZA_EXT
+        if not os.path.exists(tpath) or os.path.getsize(tpath) < ya * traza.itemsize:
+            ya = 0                                  # la borraron o recortaron de afuera
+        with open(tpath, "r+b" if ya else "wb") as f:
+            f.seek(ya * traza.itemsize)
+            f.truncate()                            # restos de un corte a mitad de escritura
+            f.write(traza[ya:].tobytes())
+        header = {
+            "rows": self.rows, "cols": self.cols, "start": list(self.start), "digest": self.digest,
+            "found": self.found, "pila": len(self.pila), "traza": n,
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(self.pila.tobytes())
+            f.write(self.prox)
+            f.write(self.visitado)
+        os.replace(tmp, path)
+        self._en_disco = (path, n)
+        self.checkpoints += 1
+        return path
+
+    @classmethod
+    def load(cls, path, mapa):
+        """Reanuda desde un checkpoint; ValueError si es de otro mapa."""
+        with open(path, "rb") as f:
+            header = _leer_cabecera(f)
+            self = cls(mapa, *header["start"])
+            if header["digest"] != self.digest:
+                raise ValueError("el checkpoint es de otro mapa (o el mapa cambió)")
+            n = header["pila"]
+            self.pila.frombytes(f.read(n * self.pila.itemsize))
+            self.prox = bytearray(f.read(n))
+            self.visitado = bytearray(f.read(len(self.visitado)))
+            self.found = header.get("found")
+        with open(path + TRAZA_EXT, "rb") as f:
+            self.traza.frombytes(f.read(header["traza"] * self.traza.itemsize))
+        if len(self.pila) != n or len(self.prox) != n or len(self.traza) != header["traza"]:
+            raise ValueError("checkpoint incompleto")
+        self._en_disco = (path, len(self.traza))
+        return self
+
+
+def search_resumable(mapa, x, y, checkpoint, stats=None, **kw):
+    """
+    Como search_with_steps completo pero reanudable: si `checkpoint`
+    existe y es de este mapa e inicio, sigue desde ahí.
+    Devuelve (found, result, pasos). kw: every_s, max_overhead, max_bytes.
+    """
+    busqueda = None
+    if os.path.exists(checkpoint):
+        try:
+            busqueda = BusquedaReanudable.load(checkpoint, mapa)
+            if busqueda.start != (x, y):
+                busqueda = None
+        except (ValueError, KeyError, OSError):
+            busqueda = None
+    if busqueda is None:
+        busqueda = BusquedaReanudable(mapa, x, y)
+    found = busqueda.run(checkpoint, stats=stats, **kw)
+    return found, busqueda.result(), busqueda.pasos()
+
+
+if __name__ == "__main__":
+    import argparse
+    from generador_mapa import load_map
+    ap = argparse.ArgumentParser(description="Búsqueda con checkpoints (se reanuda sola).")
+    ap.add_argument("mapa")
+    ap.add_argument("x", type=int)
+    ap.add_argument("y", type=int)
+    ap.add_argument("--checkpoint", default=None, help="por defecto, junto al mapa con extensión .ckpt")
+    ap.add_argument("--cada", type=float, default=CHECKPOINT_EVERY_S, help="segundos entre checkpoints")
+    ap.add_argument("--max-bytes", type=int, default=CHECKPOINT_MAX_BYTES,
+                    help="tope de .ckpt + .traza; más grande no se guarda")
+    args = ap.parse_args()
+
+    ckpt = args.checkpoint or checkpoint_path_for(args.mapa, os.path.dirname(os.path.abspath(args.mapa)))
+    t = time.perf_counter()
+    found, _, pasos = search_resumable(load_map(args.mapa), args.x, args.y, ckpt,
+                                       every_s=args.cada, max_bytes=args.max_bytes)
+    print(f"found={found} pasos={len(pasos)} {time.perf_counter() - t:.2f} s")
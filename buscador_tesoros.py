@@ -1,15 +1,9 @@
 from __future__ import annotations
-from typing import List, Tuple, Generator
+import time
 
-try:
-    from generador_mapa import clone_matrix, load_map , in_bounds 
-except ImportError:
-    clone_matrix = lambda m: [row[:] for row in m]  # fallback simple
-    def load_map(path: str):
-        with open(path, "r", encoding="utf-8") as f:
-            return [list(line.strip()) for line in f]
+from generador_mapa import clone_matrix, in_bounds
 
-Matrix = List[List[str]]
+Matrix = list[list[str]]
 
 WALL      = "#"
 EMPTY     = "."
@@ -18,17 +12,26 @@ PATH_MARK = "*"
 
 # Funcion principal 
 
-def search_treasure(mapa, start_x, start_y):
+def search_treasure(mapa, start_x, start_y, stats=None):
+    """
+    stats (opcional): instrumentacion.SolverStats para contar nodos,
+    retrocesos, aciertos de memo y profundidad. Sin stats no hay costo extra.
+    """
     rows, cols = len(mapa), len(mapa[0])
     isVisited = [[False]*cols for _ in range(rows)]                         #-->> 	marca celdas ya exploradas
     memo      = [[False]*cols for _ in range(rows)]                         #-->>   “memorización” / caching:
     result    = clone_matrix(mapa)
 
-    found = _resolver_backtracking(mapa, start_x, start_y, isVisited, memo, result)
+    if stats is None:
+        return _resolver_backtracking(mapa, start_x, start_y, isVisited, memo, result), result
+    t0 = time.perf_counter()
+    found = _resolver_backtracking(mapa, start_x, start_y, isVisited, memo, result, stats)
+    stats.elapsed += time.perf_counter() - t0
     return found, result
 
 
-def _resolver_backtracking(matrix, x, y, vis, memo, res) :
+def _resolver_backtracking(matrix, x, y, vis, memo, res, stats=None, depth=1) :
+    # Con stats se anotan contadores; sin stats cada chequeo es un "is None" (costo ~nulo)
     rows, cols = len(matrix), len(matrix[0])
 
     # Fuera de rango
@@ -41,8 +44,13 @@ def _resolver_backtracking(matrix, x, y, vis, memo, res) :
 
     # Ya sabemos que no hay solución desde aquí
     if memo[x][y]:
+        if stats is not None:
+            stats.memo_hits += 1
         return False
 
+    if stats is not None:
+        stats.visit(depth)
+
     # Tesoro encontrado
     if matrix[x][y] == TREASURE:
         res[x][y] = PATH_MARK
@@ -52,14 +60,17 @@ def _resolver_backtracking(matrix, x, y, vis, memo, res) :
     vis[x][y] = True
 
     # Explorar 4 direcciones
-    if (_resolver_backtracking(matrix, x-1, y, vis, memo, res) or  # -->> arriba
-        _resolver_backtracking(matrix, x+1, y, vis, memo, res) or  # -->> abajo
-        _resolver_backtracking(matrix, x, y-1, vis, memo, res) or  # -->> izquierda
-        _resolver_backtracking(matrix, x, y+1, vis, memo, res)):   # -->> derecha
+    d = depth + 1
+    if (_resolver_backtracking(matrix, x-1, y, vis, memo, res, stats, d) or  # -->> arriba
+        _resolver_backtracking(matrix, x+1, y, vis, memo, res, stats, d) or  # -->> abajo
+        _resolver_backtracking(matrix, x, y-1, vis, memo, res, stats, d) or  # -->> izquierda
+        _resolver_backtracking(matrix, x, y+1, vis, memo, res, stats, d)):   # -->> derecha
         res[x][y] = PATH_MARK
         return True
 
     # No hay solución desde aquí
+    if stats is not None:
+        stats.backtracks += 1
     memo[x][y] = True
     return False
 
@@ -67,28 +78,37 @@ def _resolver_backtracking(matrix, x, y, vis, memo, res) :
 # ------------------------------------------------------------
 # Versión para animación: genera pasos
 # ------------------------------------------------------------
-def search_with_steps(mapa, x, y):
+def search_with_steps(mapa, x, y, stats=None):
+    """stats (opcional): instrumentacion.SolverStats, como en search_treasure."""
     rows, cols = len(mapa), len(mapa[0])
     visited = [[False]*cols for _ in range(rows)]
 
+    # backtrack devuelve (vía `yield from`) True si llegó al tesoro,
+    # así cada ancestro marca su celda con '*' al volver
     def backtrack(cx, cy):
-        if not in_bounds(mapa, cx, cy): return
-        if mapa[cx][cy] == "#" or visited[cx][cy]: return
+        if not in_bounds(mapa, cx, cy): return False
+        if mapa[cx][cy] == "#" or visited[cx][cy]: return False
         visited[cx][cy] = True
+        if stats is not None:
+            stats.depth += 1
+            stats.visit(stats.depth)
         yield (cx, cy, [row[:] for row in mapa])
 
         if mapa[cx][cy] == "T":
             mapa[cx][cy] = "*"
             yield True
-            return
+            return True
 
         for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
-            for step in backtrack(cx + dx, cy + dy):
-                yield step
-                if step is True:
-                    mapa[cx][cy] = "*"
-                    yield (cx, cy, [row[:] for row in mapa])
-                    return
+            if (yield from backtrack(cx + dx, cy + dy)):
+                mapa[cx][cy] = "*"
+                yield (cx, cy, [row[:] for row in mapa])
+                return True
+
+        if stats is not None:
+            stats.backtracks += 1
+            stats.depth -= 1
+        return False
 
     yield from backtrack(x, y)
 
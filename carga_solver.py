@@ -0,0 +1,124 @@
+from __future__ import annotations
+import asyncio
+import json
+import random
+import time
+
+from generador_mapa import random_map
+from servidor_solver import HOST, PORT, LINEA_MAX
+
+# ------------------------------------------------------------
+# Generador de carga para servidor_solver
+# ------------------------------------------------------------
+#   Abre `conexiones` clientes concurrentes; cada uno manda `peticiones`
+#   solves (de a `en_vuelo` a la vez) y mide la latencia de cada uno.
+#   Al final imprime p50 / p99 y el throughput total.
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por rango más cercano; valores ya ordenados."""
+    if not valores:
+        return 0.0
+    k = max(0, min(len(valores) - 1, int(round(p / 100.0 * len(valores) + 0.5)) - 1))
+    return valores[k]
+
+
+async def _cliente(abrir, mapas, peticiones, en_vuelo, latencias, rng, usar_hash):
+    reader, writer = await abrir()
+    esperando = {}                     # id -> tiempo de envío
+    esperando_mapa = {}                # id -> índice de mapa
+    hashes = {}                        # índice de mapa -> hash conocido
+    libres = asyncio.Semaphore(en_vuelo)
+    hecho = asyncio.Event()
+    recibidas = 0
+
+    async def leer():
+        nonlocal recibidas
+        while recibidas < peticiones:
+            line = await reader.readline()
+            if not line:
+                break
+            msg = json.loads(line)
+            if "evento" in msg:
+                continue
+            rid = msg["id"]
+            latencias.append(time.perf_counter() - esperando.pop(rid))
+            i = esperando_mapa.pop(rid)
+            if msg.get("ok") and usar_hash:
+                hashes[i] = msg["hash"]
+            recibidas += 1
+            libres.release()
+        hecho.set()
+
+    lector = asyncio.ensure_future(leer())
+    for rid in range(peticiones):
+        await libres.acquire()
+        i = rng.randrange(len(mapas))
+        texto, rows, cols = mapas[i]
+        req = {"id": rid, "inicio": [rng.randrange(rows), rng.randrange(cols)]}
+        if usar_hash and i in hashes:
+            req["hash"] = hashes[i]
+        else:
+            req["mapa"] = texto
+        esperando[rid] = time.perf_counter()
+        esperando_mapa[rid] = i
+        writer.write((json.dumps(req) + "\n").encode("utf-8"))
+        await writer.drain()
+    await hecho.wait()
+    await lector
+    writer.close()
+
+
+async def correr_carga(conexiones=8, peticiones=200, en_vuelo=4, n_mapas=4,
+                       rows=25, cols=25, densidad=0.2, unix=None,
+                       host=HOST, port=PORT, usar_hash=True, seed=0):
+    rng = random.Random(seed)
+    random.seed(seed)
+    mapas = []
+    for _ in range(n_mapas):
+        m = random_map(rows, cols, densidad, True)
+        mapas.append(("\n".join("".join(r) for r in m), rows, cols))
+
+    if unix:
+        abrir = lambda: asyncio.open_unix_connection(unix, limit=LINEA_MAX)
+    else:
+        abrir = lambda: asyncio.open_connection(host, port, limit=LINEA_MAX)
+
+    latencias = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*[
+        _cliente(abrir, mapas, peticiones, en_vuelo, latencias,
+                 random.Random(rng.random()), usar_hash)
+        for _ in range(conexiones)
+    ])
+    total = time.perf_counter() - t0
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "segundos":   total,
+        "req_s":      len(latencias) / total if total else 0.0,
+        "p50_ms":     percentil(latencias, 50) * 1000,
+        "p99_ms":     percentil(latencias, 99) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Mide latencia y throughput de servidor_solver.")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--unix", default=None)
+    ap.add_argument("-c", "--conexiones", type=int, default=8)
+    ap.add_argument("-n", "--peticiones", type=int, default=200, help="por conexión")
+    ap.add_argument("--en-vuelo", type=int, default=4, help="peticiones simultáneas por conexión")
+    ap.add_argument("--mapas", type=int, default=4, help="mapas distintos a rotar")
+    ap.add_argument("--tam", type=int, default=25)
+    ap.add_argument("--densidad", type=float, default=0.2)
+    ap.add_argument("--sin-hash", action="store_true", help="mandar siempre el mapa completo")
+    args = ap.parse_args()
+
+    r = asyncio.run(correr_carga(args.conexiones, args.peticiones, args.en_vuelo, args.mapas,
+                                 args.tam, args.tam, args.densidad, args.unix,
+                                 args.host, args.port, not args.sin_hash))
+    print(f"{r['peticiones']} peticiones en {r['segundos']:.2f}s → {r['req_s']:.0f} req/s | "
+          f"p50 {r['p50_ms']:.2f} ms | p99 {r['p99_ms']:.2f} ms")
@@ -0,0 +1,237 @@
+from __future__ import annotations
+from array import array
+from collections import deque
+
+from generador_mapa import in_bounds
+
+WALL     = "#"
+TREASURE = "T"
+
+# Con más nodos muertos que esto (por celda) se reconstruye todo
+NODOS_POR_CELDA_MAX = 4
+# Una edición en bloque que toca más de 1/REBUILD_DIV del mapa se
+# resuelve reconstruyendo (más barato que notificar celda por celda)
+REBUILD_DIV = 8
+
+
+# ------------------------------------------------------------
+# Conectividad incremental (¿se llega a un tesoro?)
+# ------------------------------------------------------------
+#   Componentes de celdas libres con union-find; cada raíz cuenta los
+#   tesoros de su componente, así "¿hay tesoro alcanzable desde (x,y)?"
+#   es un find + una lectura.
+#     - abrir una celda (muro → libre): nodo nuevo y union con los vecinos
+#     - cerrar una celda (libre → muro): union-find no sabe borrar, así que
+#       se lanzan BFS intercaladas desde los vecinos libres; si se tocan, no
+#       hubo corte. La que se agota primero es una componente separada y
+#       SOLO sus celdas reciben un nodo nuevo: el costo es el del lado chico.
+#   Las celdas re-etiquetadas dejan nodos muertos en el union-find; cuando
+#   son demasiados se reconstruye desde el mapa.
+
+class ConectividadIncremental:
+    """
+    Responde si desde una celda se alcanza algún tesoro, tras cada edición.
+
+    Uso desde el editor:
+        con = ConectividadIncremental(mapa)
+        set_cell(mapa, x, y, "#"); con.notify_cell(x, y)
+        con.alcanzable(sx, sy)              # True / False
+
+    Igual que SolverIncremental, el mapa se guarda por referencia y cada
+    edición se avisa con notify_cell / notify_rect (o set_cell de acá).
+    Si se reemplaza el mapa entero, reset(nuevo_mapa).
+    """
+
+    def __init__(self, mapa):
+        self.mapa = mapa
+        self.reset()
+
+    # ---------- Estado ----------
+    def reset(self, mapa=None):
+        """Reconstruye las componentes desde cero (O(celdas))."""
+        if mapa is not None:
+            self.mapa = mapa
+        rows = self.rows = len(self.mapa)
+        cols = self.cols = len(self.mapa[0]) if rows else 0
+        self._nodo = array("i", [-1]) * (rows * cols)   # celda -> nodo (-1 = muro)
+        self._es_tesoro = bytearray(rows * cols)
+        self._padre: list[int] = []
+        self._tam: list[int] = []
+        self._tes: list[int] = []                        # tesoros por raíz
+        self.relabels = 0                                # celdas re-etiquetadas (último cierre)
+        nodo = self._nodo
+        for x, row in enumerate(self.mapa):
+            base = x * cols
+            for y, ch in enumerate(row):
+                if ch == WALL:
+                    continue
+                c = base + y
+                self._nuevo_nodo(c, ch == TREASURE)
+                if y > 0 and nodo[c - 1] >= 0:
+                    self._union(c, c - 1)
+                if x > 0 and nodo[c - cols] >= 0:
+                    self._union(c, c - cols)
+
+    def _nuevo_nodo(self, c, tesoro):
+        i = len(self._padre)
+        self._padre.append(i)
+        self._tam.append(1)
+        self._tes.append(1 if tesoro else 0)
+        self._nodo[c] = i
+        self._es_tesoro[c] = tesoro
+
+    def _find(self, i):
+        padre = self._padre
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]                   # path halving
+            i = padre[i]
+        return i
+
+    def _union(self, a, b):
+        ra, rb = self._find(self._nodo[a]), self._find(self._nodo[b])
+        if ra == rb:
+            return
+        if self._tam[ra] < self._tam[rb]:
+            ra, rb = rb, ra
+        self._padre[rb] = ra
+        self._tam[ra] += self._tam[rb]
+        self._tes[ra] += self._tes[rb]
+
+    def _vecinos(self, c):
+        cols = self.cols
+        y = c % cols
+        if c >= cols:                   yield c - cols
+        if c < (self.rows - 1) * cols:  yield c + cols
+        if y > 0:                       yield c - 1
+        if y < cols - 1:                yield c + 1
+
+    # ---------- Ediciones ----------
+    def set_cell(self, x, y, ch):
+        """Escribe ch en (x,y) y actualiza las componentes."""
+        if in_bounds(self.mapa, x, y) and self.mapa[x][y] != ch:
+            self.mapa[x][y] = ch
+            self.notify_cell(x, y)
+
+    def notify_cell(self, x, y):
+        """Avisar que (x,y) cambió en el mapa (se compara con lo conocido)."""
+        if not in_bounds(self.mapa, x, y):
+            return
+        c = x * self.cols + y
+        ch = self.mapa[x][y]
+        libre, tesoro = ch != WALL, ch == TREASURE
+        if self._nodo[c] < 0:
+            if libre:
+                self._abrir(c, tesoro)
+        elif not libre:
+            self._cerrar(c)
+        elif tesoro != bool(self._es_tesoro[c]):
+            self._tes[self._find(self._nodo[c])] += 1 if tesoro else -1
+            self._es_tesoro[c] = tesoro
+
+    def notify_rect(self, x1, y1, x2, y2):
+        """Avisar un rectángulo editado (paint_segment, fill_rect...)."""
+        x1, x2 = max(0, min(x1, x2)), min(self.rows - 1, max(x1, x2))
+        y1, y2 = max(0, min(y1, y2)), min(self.cols - 1, max(y1, y2))
+        if x1 > x2 or y1 > y2:
+            return
+        if (x2 - x1 + 1) * (y2 - y1 + 1) * REBUILD_DIV > self.rows * self.cols:
+            self.reset()
+            return
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                self.notify_cell(x, y)
+
+    def _abrir(self, c, tesoro):
+        self._nuevo_nodo(c, tesoro)
+        for n in self._vecinos(c):
+            if self._nodo[n] >= 0:
+                self._union(c, n)
+
+    def _cerrar(self, c):
+        raiz = self._find(self._nodo[c])
+        if self._es_tesoro[c]:
+            self._tes[raiz] -= 1
+            self._es_tesoro[c] = 0
+        self._nodo[c] = -1
+        self.relabels = 0
+        vecinos = [n for n in self._vecinos(c) if self._nodo[n] >= 0]
+        if len(vecinos) >= 2:
+            self._separar(vecinos, raiz)
+        if len(self._padre) > NODOS_POR_CELDA_MAX * len(self._nodo) + 64:
+            self.reset()
+
+    def _separar(self, vecinos, raiz):
+        """
+        BFS intercaladas (una celda por turno) desde cada vecino del muro
+        nuevo. Las búsquedas que se encuentran se agrupan; un grupo que se
+        agota sin tocar a los demás quedó aislado y recibe su propio nodo.
+        Termina cuando queda un solo grupo abierto (ese conserva `raiz`).
+        """
+        nodo = self._nodo
+        k = len(vecinos)
+        grupo = list(range(k))                 # union-find chiquito entre búsquedas
+        def g(i):
+            while grupo[i] != i:
+                i = grupo[i]
+            return i
+        dueno = {v: i for i, v in enumerate(vecinos)}
+        colas = [deque([v]) for v in vecinos]
+        abiertos = set(range(k))
+
+        while len(abiertos) > 1:
+            for i in range(k):
+                gi = g(i)
+                if gi not in abiertos or not colas[i]:
+                    continue
+                c = colas[i].popleft()
+                for n in self._vecinos(c):
+                    if nodo[n] < 0:
+                        continue
+                    j = dueno.get(n)
+                    if j is None:
+                        dueno[n] = i
+                        colas[i].append(n)
+                    elif g(j) != gi:               # se tocaron: misma componente
+                        abiertos.discard(g(j))
+                        grupo[g(j)] = gi
+            for gi in list(abiertos):
+                if len(abiertos) == 1:
+                    break
+                if any(colas[i] for i in range(k) if g(i) == gi):
+                    continue
+                region = [c for c, i in dueno.items() if g(i) == gi]
+                self._re_etiquetar(region, raiz)
+                abiertos.discard(gi)
+
+    def _re_etiquetar(self, region, raiz):
+        """Mueve `region` (una componente ya separada) a un nodo propio."""
+        i = len(self._padre)
+        tes = sum(self._es_tesoro[c] for c in region)
+        self._padre.append(i)
+        self._tam.append(len(region))
+        self._tes.append(tes)
+        self._tes[raiz] -= tes
+        for c in region:
+            self._nodo[c] = i
+        self.relabels += len(region)
+
+    # ---------- Consultas ----------
+    def _raiz(self, x, y):
+        if not in_bounds(self.mapa, x, y):
+            return None
+        i = self._nodo[x * self.cols + y]
+        return None if i < 0 else self._find(i)
+
+    def alcanzable(self, x, y):
+        """True si desde (x,y) se llega a algún tesoro."""
+        return self.tesoros_alcanzables(x, y) > 0
+
+    def tesoros_alcanzables(self, x, y):
+        """Cantidad de tesoros en la componente de (x,y) (0 si es muro)."""
+        r = self._raiz(x, y)
+        return 0 if r is None else self._tes[r]
+
+    def conectados(self, a, b):
+        """True si las celdas a=(x,y) y b=(x,y) están en la misma componente."""
+        ra = self._raiz(*a)
+        return ra is not None and ra == self._raiz(*b)
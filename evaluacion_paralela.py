@@ -0,0 +1,147 @@
+from __future__ import annotations
+import os
+from array import array
+
+from generador_mapa import load_map
+from buscador_tesoros import WALL
+from buscador_reanudable import BusquedaReanudable
+
+# ------------------------------------------------------------
+# Evaluación multi-inicio en paralelo (análisis de dificultad)
+# ------------------------------------------------------------
+#   Se resuelve el mismo mapa desde muchos inicios repartiendo el trabajo
+#   en un pool de procesos. El mapa y la lista de inicios viajan UNA vez
+#   por memoria compartida; cada tarea solo recibe un rango (lo, hi).
+#
+#   Resultado: array('l') plano con 3 valores por inicio, en el mismo
+#   orden que `inicios`:
+#       res[3*i]     → 1 si encontró tesoro, 0 si no
+#       res[3*i + 1] → largo del camino (celdas marcadas, incluye tesoro)
+#       res[3*i + 2] → nodos visitados por el backtracking
+#
+#   Los workers usan la búsqueda iterativa (BusquedaReanudable: mismo
+#   orden y mismos números que search_treasure) para no depender del
+#   límite de recursión: un mapa grande no puede tirar un worker por
+#   desbordar la pila de C. Si igual muere uno, ProcessPoolExecutor lo
+#   informa con BrokenProcessPool en vez de colgarse.
+#   El mapa aplanado (los bytes de la memoria compartida) se le pasa a
+#   cada búsqueda como `texto`: por inicio solo se arma el estado de la
+#   búsqueda, no se vuelve a recorrer el mapa.
+
+CAMPOS = 3
+
+# Estado por proceso worker (se llena en _init_worker)
+_W_MAPA   = None
+_W_TEXTO  = None
+_W_COLS   = 0
+_W_STARTS = None
+
+
+def open_cells(mapa):
+    """Todas las celdas que no son muro, como lista de (x, y)."""
+    return [(i, j) for i, row in enumerate(mapa) for j, ch in enumerate(row) if ch != WALL]
+
+
+def _aplanar(mapa):
+    return "".join("".join(row) for row in mapa).encode("latin-1", "replace")
+
+
+def _evaluar_uno(mapa, x, y, texto):
+    busqueda = BusquedaReanudable(mapa, x, y, texto)
+    found = busqueda.run()
+    # la pila final es el camino inicio → tesoro; la traza, las celdas visitadas
+    return (1 if found else 0), (len(busqueda.pila) if found else 0), len(busqueda.traza)
+
+
+def _init_worker(shm_mapa, shm_starts, rows, cols, n_starts):
+    """Se conecta a la memoria compartida y arma el mapa una sola vez."""
+    global _W_MAPA, _W_TEXTO, _W_COLS, _W_STARTS
+    from multiprocessing import shared_memory
+    sm = shared_memory.SharedMemory(name=shm_mapa)
+    ss = shared_memory.SharedMemory(name=shm_starts)
+    raw = bytes(sm.buf[:rows * cols])
+    _W_MAPA = [list(raw[i*cols:(i+1)*cols].decode("latin-1")) for i in range(rows)]
+    _W_TEXTO = raw
+    _W_COLS = cols
+    _W_STARTS = array("i", bytes(ss.buf[:n_starts * 4]))
+    sm.close(); ss.close()
+
+
+def _evaluar_rango(rango):
+    lo, hi = rango
+    out = array("l")
+    cols = _W_COLS
+    for k in range(lo, hi):
+        x, y = divmod(_W_STARTS[k], cols)
+        out.extend(_evaluar_uno(_W_MAPA, x, y, _W_TEXTO))
+    return lo, out
+
+
+def evaluar_inicios(mapa, inicios=None, procesos=None, chunk=32):
+    """
+    Resuelve `mapa` desde cada inicio de `inicios` (por defecto: todas
+    las celdas abiertas) usando `procesos` workers (por defecto: CPUs).
+    Devuelve el array('l') descrito arriba.
+    """
+    if inicios is None:
+        inicios = open_cells(mapa)
+    inicios = list(inicios)
+    n = len(inicios)
+    rows, cols = len(mapa), len(mapa[0])
+    res = array("l", bytes(array("l").itemsize * CAMPOS * n))
+    if n == 0:
+        return res
+
+    procesos = procesos or os.cpu_count() or 1
+    flat = _aplanar(mapa)
+    if procesos == 1 or n <= chunk:
+        for i, (x, y) in enumerate(inicios):
+            res[CAMPOS*i:CAMPOS*(i+1)] = array("l", _evaluar_uno(mapa, x, y, flat))
+        return res
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from multiprocessing import shared_memory
+    starts = array("i", (x * cols + y for x, y in inicios))
+    sm = shared_memory.SharedMemory(create=True, size=max(len(flat), 1))
+    ss = shared_memory.SharedMemory(create=True, size=max(len(starts) * 4, 1))
+    try:
+        sm.buf[:len(flat)] = flat
+        ss.buf[:len(starts) * 4] = starts.tobytes()
+        rangos = [(lo, min(lo + chunk, n)) for lo in range(0, n, chunk)]
+        with ProcessPoolExecutor(procesos, initializer=_init_worker,
+                                 initargs=(sm.name, ss.name, rows, cols, n)) as pool:
+            for fut in as_completed([pool.submit(_evaluar_rango, r) for r in rangos]):
+                lo, out = fut.result()          # BrokenProcessPool si murió un worker
+                res[CAMPOS*lo:CAMPOS*lo + len(out)] = out
+    finally:
+        sm.close(); sm.unlink()
+        ss.close(); ss.unlink()
+    return res
+
+
+def resumen(res):
+    """Estadísticas rápidas del array de evaluar_inicios."""
+    n = len(res) // CAMPOS
+    encontrados = sum(res[0::CAMPOS])
+    largos = [l for f, l in zip(res[0::CAMPOS], res[1::CAMPOS]) if f]
+    return {
+        "inicios":      n,
+        "encontrados":  encontrados,
+        "largo_medio":  (sum(largos) / len(largos)) if largos else 0.0,
+        "nodos_total":  sum(res[2::CAMPOS]),
+    }
+
+
+if __name__ == "__main__":
+    import argparse, time
+    ap = argparse.ArgumentParser(description="Evalúa un mapa desde todas sus celdas abiertas.")
+    ap.add_argument("mapa")
+    ap.add_argument("-j", "--procesos", type=int, default=None)
+    ap.add_argument("--chunk", type=int, default=32)
+    args = ap.parse_args()
+
+    m = load_map(args.mapa)
+    t0 = time.perf_counter()
+    r = evaluar_inicios(m, procesos=args.procesos, chunk=args.chunk)
+    dt = time.perf_counter() - t0
+    print(resumen(r), f"{dt:.3f}s")
@@ -0,0 +1,520 @@
+from __future__ import annotations
+import heapq
+import os
+import random
+import sys
+import time
+from collections import deque
+
+from generador_mapa import clone_matrix, paint_segment, random_map, save_map, terrain_map, TERRAIN_COST
+from buscador_tesoros import search_treasure, search_with_steps
+from buscador_incremental import SolverIncremental
+from buscador_jerarquico import AbstraccionHPA
+from buscador_costos import min_cost_path, path_cost
+from buscador_reanudable import BusquedaReanudable
+from conectividad import ConectividadIncremental
+
+# ------------------------------------------------------------
+# Fuzz diferencial de los solvers
+# ------------------------------------------------------------
+#   Genera miles de mapas con random_map (semilla reproducible, tamaños y
+#   densidades variados), corre cada motor y verifica:
+#     - found igual al de search_treasure (la referencia)
+#     - el camino devuelto es válido: empieza en el inicio, pasos de a una
+#       celda, no pisa muros y termina en un tesoro
+#     - los motores "óptimos" devuelven un camino de largo mínimo (BFS)
+#     - los motores de costo (con terreno en parte de los mapas) devuelven
+#       un camino del costo mínimo (Dijkstra de referencia) y reportan bien
+#       su costo, con cada cola (auto, dial, heap)
+#   Registra el tiempo por motor. Cada falla se achica (quitar filas/
+#   columnas, muros y tesoros mientras siga fallando) y se guarda el mapa
+#   mínimo en FALLOS_DIR.
+#
+#   Con --ediciones K corre en cambio los motores incrementales
+#   (SolverIncremental y ConectividadIncremental): a cada mapa le aplica K
+#   ediciones al azar (set_cell, paint_segment, mover el inicio) sobre el
+#   MISMO objeto y después de cada una lo compara con BFS desde cero.
+#
+#   python fuzz_solvers.py -n 2000 --seed 1 --max-tam 40
+#   python fuzz_solvers.py -n 500 --ediciones 40
+
+FALLOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fuzz_fallos")
+
+
+# ---------- Motores ----------
+#   Cada motor: f(mapa, sx, sy) -> (found, camino | None, resultado | None)
+#   camino = [(x, y), ...] desde el inicio; resultado = matriz con '*'.
+
+def _motor_backtracking(mapa, sx, sy):
+    found, res = search_treasure(mapa, sx, sy)
+    return found, None, res
+
+def _motor_pasos(mapa, sx, sy):
+    copia = clone_matrix(mapa)
+    found = False
+    for step in search_with_steps(copia, sx, sy):
+        if step is True:
+            found = True
+    return found, None, copia
+
+def _motor_reanudable(mapa, sx, sy):
+    busqueda = BusquedaReanudable(mapa, sx, sy)
+    return bool(busqueda.run()), None, busqueda.result()
+
+def _motor_incremental(mapa, sx, sy):
+    camino = SolverIncremental(mapa, sx, sy).path()
+    return bool(camino), camino, None
+
+def _motor_hpa(mapa, sx, sy, cluster=8):
+    camino = AbstraccionHPA.build(mapa, cluster).path(sx, sy)
+    return bool(camino), camino, None
+
+def _motor_costos(mapa, sx, sy, metodo=None):
+    costo, camino = min_cost_path(mapa, sx, sy, metodo=metodo)
+    if costo is not None and costo != path_cost(mapa, camino):
+        raise AssertionError(f"costo reportado {costo}, el camino cuesta {path_cost(mapa, camino)}")
+    return costo is not None, camino, None
+
+def _motor_costos_dial(mapa, sx, sy):
+    return _motor_costos(mapa, sx, sy, "dial")
+
+def _motor_costos_heap(mapa, sx, sy):
+    return _motor_costos(mapa, sx, sy, "heap")
+
+MOTORES = {
+    "backtracking": _motor_backtracking,
+    "pasos":        _motor_pasos,
+    "reanudable":   _motor_reanudable,
+    "incremental":  _motor_incremental,
+    "hpa":          _motor_hpa,
+    "costos":       _motor_costos,
+    "costos_dial":  _motor_costos_dial,
+    "costos_heap":  _motor_costos_heap,
+}
+# Motores que prometen camino mínimo (se compara el largo con BFS)
+OPTIMOS = {"incremental"}
+# Motores de costo mínimo (se compara el costo con Dijkstra)
+COSTOS = {"costos", "costos_dial", "costos_heap"}
+# Fracción de mapas generados con terrain_map (arena/agua/pantano)
+TERRENO_FRAC = 0.35
+
+
+# ---------- Verificaciones ----------
+def bfs_dist(mapa, sx, sy):
+    """Pasos hasta el tesoro más cercano (None si no hay)."""
+    rows, cols = len(mapa), len(mapa[0])
+    if mapa[sx][sy] == "#":
+        return None
+    dist = {(sx, sy): 0}
+    q = deque([(sx, sy)])
+    while q:
+        x, y = q.popleft()
+        if mapa[x][y] == "T":
+            return dist[(x, y)]
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < rows and 0 <= ny < cols and mapa[nx][ny] != "#" and (nx, ny) not in dist:
+                dist[(nx, ny)] = dist[(x, y)] + 1
+                q.append((nx, ny))
+    return None
+
+def costo_minimo(mapa, sx, sy, costs=TERRAIN_COST):
+    """Dijkstra de referencia (simple, sin trucos): costo al tesoro más barato o None."""
+    rows, cols = len(mapa), len(mapa[0])
+    if mapa[sx][sy] == "#":
+        return None
+    dist = {(sx, sy): 0}
+    heap = [(0, sx, sy)]
+    while heap:
+        d, x, y = heapq.heappop(heap)
+        if d != dist[(x, y)]:
+            continue
+        if mapa[x][y] == "T":
+            return d
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < rows and 0 <= ny < cols and mapa[nx][ny] != "#":
+                nd = d + costs.get(mapa[nx][ny], 1)
+                if nd < dist.get((nx, ny), nd + 1):
+                    dist[(nx, ny)] = nd
+                    heapq.heappush(heap, (nd, nx, ny))
+    return None
+
+def _check_camino(mapa, sx, sy, camino):
+    if camino[0] != (sx, sy):
+        return f"el camino empieza en {camino[0]}, no en {(sx, sy)}"
+    for (ax, ay), (bx, by) in zip(camino, camino[1:]):
+        if abs(ax - bx) + abs(ay - by) != 1:
+            return f"salto {(ax, ay)} -> {(bx, by)}"
+    for x, y in camino:
+        if not (0 <= x < len(mapa) and 0 <= y < len(mapa[0])) or mapa[x][y] == "#":
+            return f"pisa muro o sale del mapa en {(x, y)}"
+    x, y = camino[-1]
+    if mapa[x][y] != "T":
+        return f"termina en {(x, y)} que no es tesoro"
+    return None
+
+def _check_resultado(mapa, sx, sy, res):
+    """Matriz con '*': las marcas deben formar una región conexa inicio–tesoro sin muros."""
+    marcas = {(x, y) for x, row in enumerate(res) for y, ch in enumerate(row) if ch == "*"}
+    for x, y in marcas:
+        if mapa[x][y] == "#":
+            return f"marca '*' sobre muro en {(x, y)}"
+    if (sx, sy) not in marcas:
+        return "el inicio no quedó marcado"
+    vistos = {(sx, sy)}
+    q = deque([(sx, sy)])
+    tesoro = False
+    while q:
+        x, y = q.popleft()
+        tesoro = tesoro or mapa[x][y] == "T"
+        for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if n in marcas and n not in vistos:
+                vistos.add(n)
+                q.append(n)
+    if not tesoro:
+        return "las marcas no conectan el inicio con un tesoro"
+    return None
+
+def verificar(nombre, mapa, sx, sy, ref_found, ref_dist, ref_costo=None):
+    """Corre un motor y devuelve (segundos, mensaje_de_falla | None)."""
+    t0 = time.perf_counter()
+    try:
+        found, camino, res = MOTORES[nombre](mapa, sx, sy)
+    except Exception as e:
+        return time.perf_counter() - t0, f"excepción {type(e).__name__}: {e}"
+    dt = time.perf_counter() - t0
+    if found != ref_found:
+        return dt, f"found={found}, referencia={ref_found}"
+    if not found:
+        return dt, None
+    if camino is not None:
+        err = _check_camino(mapa, sx, sy, camino)
+        if err:
+            return dt, err
+        if nombre in OPTIMOS and len(camino) - 1 != ref_dist:
+            return dt, f"largo {len(camino) - 1}, mínimo {ref_dist}"
+        if nombre in COSTOS and path_cost(mapa, camino) != ref_costo:
+            return dt, f"costo {path_cost(mapa, camino)}, mínimo {ref_costo}"
+    if res is not None:
+        err = _check_resultado(mapa, sx, sy, res)
+        if err:
+            return dt, err
+    return dt, None
+
+def _falla(nombre, mapa, sx, sy):
+    """Mensaje de falla del motor en este caso (None si pasa)."""
+    ref_found = search_treasure(mapa, sx, sy)[0]
+    return verificar(nombre, mapa, sx, sy, ref_found, bfs_dist(mapa, sx, sy), costo_minimo(mapa, sx, sy))[1]
+
+
+# ---------- Achicar reproductores ----------
+def achicar(nombre, mapa, sx, sy):
+    """
+    Reduce (mapa, inicio) mientras el motor siga fallando:
+    recorta filas/columnas de los bordes, abre muros y quita tesoros.
+    """
+    mapa = clone_matrix(mapa)
+    cambio = True
+    while cambio:
+        cambio = False
+        # 1) Recortar bordes (sin sacar el inicio)
+        for lado in ("arriba", "abajo", "izq", "der"):
+            while True:
+                rows, cols = len(mapa), len(mapa[0])
+                if lado == "arriba" and sx > 0:
+                    cand, nsx, nsy = [r[:] for r in mapa[1:]], sx - 1, sy
+                elif lado == "abajo" and sx < rows - 1:
+                    cand, nsx, nsy = [r[:] for r in mapa[:-1]], sx, sy
+                elif lado == "izq" and sy > 0:
+                    cand, nsx, nsy = [r[1:] for r in mapa], sx, sy - 1
+                elif lado == "der" and sy < cols - 1:
+                    cand, nsx, nsy = [r[:-1] for r in mapa], sx, sy
+                else:
+                    break
+                if _falla(nombre, cand, nsx, nsy) is None:
+                    break
+                mapa, sx, sy, cambio = cand, nsx, nsy, True
+        # 2) Simplificar celdas: muro / terreno / tesoro sobrante → libre
+        for x in range(len(mapa)):
+            for y in range(len(mapa[0])):
+                ch = mapa[x][y]
+                if ch == ".":
+                    continue
+                mapa[x][y] = "."
+                if _falla(nombre, mapa, sx, sy) is None:
+                    mapa[x][y] = ch
+                else:
+                    cambio = True
+    return mapa, sx, sy
+
+
+# ---------- Corrida ----------
+def _mapa_aleatorio(rng, max_tam):
+    """(mapa, sx, sy, info) con tamaño, densidad y terreno al azar."""
+    rows, cols = rng.randint(1, max_tam), rng.randint(1, max_tam)
+    densidad = rng.choice((0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6))
+    map_seed = rng.randrange(1 << 30)
+    terreno = rng.choice((0.1, 0.25, 0.5)) if rng.random() < TERRENO_FRAC else 0.0
+    if terreno:
+        mapa = terrain_map(rows, cols, map_seed, terreno)
+    else:
+        mapa = random_map(rows, cols, densidad, rng.random() < 0.9, map_seed)
+    sx, sy = rng.randrange(rows), rng.randrange(cols)
+    info = {"map_seed": map_seed, "tam": (rows, cols), "densidad": densidad, "densidad_terreno": terreno}
+    return mapa, sx, sy, info
+
+def correr(n=1000, seed=0, max_tam=40, motores=None, shrink=True, salida=FALLOS_DIR, log=print):
+    """Devuelve {"casos", "fallas": [...], "tiempos": {motor: (total_s, casos)}}."""
+    motores = list(motores or MOTORES)
+    rng = random.Random(seed)
+    tiempos = {m: [0.0, 0] for m in motores}
+    fallas = []
+    limite = max_tam * max_tam + 200                 # los solvers recursivos
+    if sys.getrecursionlimit() < limite:
+        sys.setrecursionlimit(limite)
+
+    for caso in range(n):
+        mapa, sx, sy, info = _mapa_aleatorio(rng, max_tam)
+
+        ref_found = search_treasure(mapa, sx, sy)[0]
+        ref_dist = bfs_dist(mapa, sx, sy)
+        ref_costo = costo_minimo(mapa, sx, sy)
+        for nombre in motores:
+            dt, err = verificar(nombre, mapa, sx, sy, ref_found, ref_dist, ref_costo)
+            tiempos[nombre][0] += dt
+            tiempos[nombre][1] += 1
+            if err is None:
+                continue
+            falla = {"caso": caso, "motor": nombre, "error": err, **info, "inicio": (sx, sy)}
+            if shrink:
+                chico, csx, csy = achicar(nombre, mapa, sx, sy)
+                falla["minimo"] = ["".join(r) for r in chico]
+                falla["inicio_minimo"] = (csx, csy)
+                falla["error_minimo"] = _falla(nombre, chico, csx, csy)
+                if salida:
+                    path = os.path.join(salida, f"fallo_{nombre}_{caso}_x{csx}_y{csy}.txt")
+                    save_map(path, chico)
+                    falla["archivo"] = path
+            fallas.append(falla)
+            log(f"[{caso}] {nombre}: {err}")
+            for fila in falla.get("minimo", ()):
+                log("    " + fila)
+    return {"casos": n, "fallas": fallas, "tiempos": {m: tuple(v) for m, v in tiempos.items()}}
+
+
+# ---------- Secuencias de ediciones ----------
+#   Una edición es una tupla:
+#     ("celda", x, y, ch)              set_cell del motor
+#     ("segmento", x1, y1, x2, y2, ch) paint_segment sobre el mapa + aviso
+#     ("inicio", x, y)                 mover el inicio (set_start)
+#   Las consultas se comparan con BFS sobre el mapa ya editado.
+
+INCREMENTALES = ("incremental", "conectividad")
+
+def _ediciones_aleatorias(rng, rows, cols, k):
+    eds = []
+    for _ in range(k):
+        r = rng.random()
+        x, y = rng.randrange(rows), rng.randrange(cols)
+        if r < 0.2:
+            ch = rng.choice("#.")
+            if rng.random() < 0.5:
+                eds.append(("segmento", x, y, x, rng.randrange(cols), ch))
+            else:
+                eds.append(("segmento", x, y, rng.randrange(rows), y, ch))
+        elif r < 0.25:
+            eds.append(("inicio", x, y))
+        else:
+            eds.append(("celda", x, y, rng.choice("##..T:")))
+    return eds
+
+def _nuevo_incremental(motor, mapa, sx, sy):
+    if motor == "incremental":
+        return SolverIncremental(mapa, sx, sy)
+    return ConectividadIncremental(mapa)
+
+def _aplicar(motor, obj, mapa, ed):
+    tipo = ed[0]
+    if tipo == "celda":
+        obj.set_cell(*ed[1:])
+    elif tipo == "segmento":
+        _, x1, y1, x2, y2, ch = ed
+        paint_segment(mapa, x1, y1, x2, y2, ch)
+        if motor == "conectividad":
+            obj.notify_rect(x1, y1, x2, y2)
+        else:
+            for x in range(min(x1, x2), max(x1, x2) + 1):
+                for y in range(min(y1, y2), max(y1, y2) + 1):
+                    obj.notify_cell(x, y)
+    elif motor == "incremental":
+        obj.set_start(ed[1], ed[2])
+
+def _componentes(mapa):
+    """Etiqueta las celdas libres por componente: (celda -> id, tesoros por id)."""
+    rows, cols = len(mapa), len(mapa[0])
+    comp, tesoros = {}, []
+    for x0 in range(rows):
+        for y0 in range(cols):
+            if mapa[x0][y0] == "#" or (x0, y0) in comp:
+                continue
+            i = len(tesoros)
+            comp[(x0, y0)] = i
+            q, t = deque([(x0, y0)]), 0
+            while q:
+                x, y = q.popleft()
+                t += mapa[x][y] == "T"
+                for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                    if 0 <= n[0] < rows and 0 <= n[1] < cols and mapa[n[0]][n[1]] != "#" and n not in comp:
+                        comp[n] = i
+                        q.append(n)
+            tesoros.append(t)
+    return comp, tesoros
+
+def _check_incremental(motor, obj, mapa, sx, sy):
+    """Mensaje de falla del estado actual del motor (None si coincide con BFS)."""
+    if motor == "incremental":
+        d = bfs_dist(mapa, sx, sy)
+        camino = obj.path()
+        if not camino:
+            return None if d is None else f"sin camino, BFS llega en {d}"
+        if d is None:
+            return "devuelve camino pero BFS no llega a un tesoro"
+        err = _check_camino(mapa, sx, sy, camino)
+        if err:
+            return err
+        return None if len(camino) - 1 == d else f"largo {len(camino) - 1}, mínimo {d}"
+    # conectividad: cada celda libre cuenta los tesoros de su componente y
+    # las componentes distintas no aparecen conectadas
+    comp, tesoros = _componentes(mapa)
+    repres = {}
+    for celda, i in comp.items():
+        got = obj.tesoros_alcanzables(*celda)
+        if got != tesoros[i]:
+            return f"tesoros_alcanzables{celda}={got}, BFS cuenta {tesoros[i]}"
+        r = repres.setdefault(i, celda)
+        if not obj.conectados(celda, r):
+            return f"{celda} y {r} son la misma componente pero no aparecen conectados"
+    repres = list(repres.values())
+    for a, b in zip(repres, repres[1:]):
+        if obj.conectados(a, b):
+            return f"{a} y {b} aparecen conectados pero están separados"
+    return None
+
+def _falla_ediciones(motor, mapa, sx, sy, ediciones):
+    """
+    Repite la secuencia sobre una copia del mapa. Devuelve (i, mensaje) de
+    la primera falla (i = ediciones aplicadas hasta ahí) o None si pasa.
+    """
+    mapa = clone_matrix(mapa)
+    i = 0
+    try:
+        obj = _nuevo_incremental(motor, mapa, sx, sy)
+        err = _check_incremental(motor, obj, mapa, sx, sy)
+        for i, ed in enumerate(ediciones, 1):
+            if err:
+                return i - 1, err
+            if ed[0] == "inicio":
+                sx, sy = ed[1], ed[2]
+            _aplicar(motor, obj, mapa, ed)
+            err = _check_incremental(motor, obj, mapa, sx, sy)
+    except Exception as e:
+        return i, f"excepción {type(e).__name__}: {e}"
+    return (i, err) if err else None
+
+def achicar_ediciones(motor, mapa, sx, sy, ediciones):
+    """
+    Reduce (mapa, ediciones) mientras siga fallando: corta la secuencia en
+    la edición que falla, quita ediciones y simplifica celdas del mapa.
+    """
+    mapa = clone_matrix(mapa)
+    i, _ = _falla_ediciones(motor, mapa, sx, sy, ediciones)
+    ediciones = list(ediciones[:i])
+    cambio = True
+    while cambio:
+        cambio = False
+        # 1) Quitar ediciones (de atrás para adelante)
+        for k in range(len(ediciones) - 1, -1, -1):
+            cand = ediciones[:k] + ediciones[k + 1:]
+            if _falla_ediciones(motor, mapa, sx, sy, cand) is not None:
+                ediciones, cambio = cand, True
+        # 2) Simplificar celdas del mapa inicial → libre
+        for x in range(len(mapa)):
+            for y in range(len(mapa[0])):
+                ch = mapa[x][y]
+                if ch == ".":
+                    continue
+                mapa[x][y] = "."
+                if _falla_ediciones(motor, mapa, sx, sy, ediciones) is None:
+                    mapa[x][y] = ch
+                else:
+                    cambio = True
+    return mapa, ediciones
+
+def correr_ediciones(n=500, seed=0, max_tam=40, ediciones=30, motores=None, shrink=True,
+                     salida=FALLOS_DIR, log=print):
+    """Como correr(), pero con secuencias de ediciones sobre los motores incrementales."""
+    motores = list(motores or INCREMENTALES)
+    rng = random.Random(seed)
+    tiempos = {m: [0.0, 0] for m in motores}
+    fallas = []
+
+    for caso in range(n):
+        mapa, sx, sy, info = _mapa_aleatorio(rng, max_tam)
+        eds = _ediciones_aleatorias(rng, len(mapa), len(mapa[0]), ediciones)
+        for nombre in motores:
+            t0 = time.perf_counter()
+            res = _falla_ediciones(nombre, mapa, sx, sy, eds)
+            tiempos[nombre][0] += time.perf_counter() - t0
+            tiempos[nombre][1] += 1
+            if res is None:
+                continue
+            i, err = res
+            falla = {"caso": caso, "motor": nombre, "error": err, "edicion": i, **info,
+                     "inicio": (sx, sy), "ediciones": eds[:i]}
+            if shrink:
+                chico, ceds = achicar_ediciones(nombre, mapa, sx, sy, eds)
+                falla["minimo"] = ["".join(r) for r in chico]
+                falla["ediciones_minimas"] = ceds
+                falla["error_minimo"] = _falla_ediciones(nombre, chico, sx, sy, ceds)[1]
+                if salida:
+                    path = os.path.join(salida, f"fallo_ed_{nombre}_{caso}_x{sx}_y{sy}.txt")
+                    save_map(path, chico)
+                    falla["archivo"] = path
+            fallas.append(falla)
+            log(f"[{caso}] {nombre} tras {i} ediciones: {err}")
+            for fila in falla.get("minimo", ()):
+                log("    " + fila)
+            for ed in falla.get("ediciones_minimas", ()):
+                log(f"    {ed}")
+    return {"casos": n, "fallas": fallas, "tiempos": {m: tuple(v) for m, v in tiempos.items()}}
+
+
+def imprimir_tiempos(reporte, log=print):
+    log(f"{'motor':<14}{'total s':>10}{'media ms':>10}")
+    for nombre, (total, casos) in sorted(reporte["tiempos"].items(), key=lambda kv: kv[1][0]):
+        log(f"{nombre:<14}{total:10.3f}{(total / casos * 1000 if casos else 0):10.3f}")
+
+
+if __name__ == "__main__":
+    import argparse, json
+    ap = argparse.ArgumentParser(description="Fuzz diferencial de los solvers.")
+    ap.add_argument("-n", type=int, default=1000, help="cantidad de mapas")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-tam", type=int, default=40)
+    ap.add_argument("--motores", default=None, help="lista separada por comas (por defecto todos)")
+    ap.add_argument("--sin-achicar", action="store_true")
+    ap.add_argument("--ediciones", type=int, default=0,
+                    help="modo incremental: ediciones al azar por mapa (0 = desactivado)")
+    ap.add_argument("--json", default=None, help="guardar el reporte (tiempos y fallas) en este archivo")
+    args = ap.parse_args()
+
+    motores = args.motores.split(",") if args.motores else None
+    if args.ediciones:
+        rep = correr_ediciones(args.n, args.seed, args.max_tam, args.ediciones, motores, not args.sin_achicar)
+    else:
+        rep = correr(args.n, args.seed, args.max_tam, motores, not args.sin_achicar)
+    imprimir_tiempos(rep)
+    print(f"{rep['casos']} mapas, {len(rep['fallas'])} fallas")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rep, f, indent=1)
+    sys.exit(1 if rep["fallas"] else 0)
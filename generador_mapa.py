@@ -1,10 +1,12 @@
 from __future__ import annotations
+import bisect
 import os
 import random
-from typing import List
+from array import array
+from itertools import chain
 
 # ---------- Tipos ----------
-Matrix = List[List[str]]
+Matrix = list[list[str]]
 
 # ---------- Creacion y utilidades de matriz ----------
 def new_matrix(rows, cols, fill = ".") :
@@ -31,6 +33,17 @@ def load_map(path):
     with open(path, "r", encoding="utf-8") as f:
         return [list(line.rstrip("\n")) for line in f]
 
+def load_map_info(path):
+    """Lee un mapa y lo analiza en la misma pasada. Devuelve (mapa, MapInfo)."""
+    info = MapInfo()
+    mapa = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            fila = list(line.rstrip("\n"))
+            info._add_row(fila, len(mapa))
+            mapa.append(fila)
+    return mapa, info
+
 def save_map(path, mapa) :
     """Guarda la matriz en un .txt, una fila por línea."""
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -45,6 +58,122 @@ def list_maps(dir_path, ext= ".txt") :
     return [f for f in os.listdir(dir_path) if f.endswith(ext)]
 
 
+class MapIndex:
+    """
+    Índice cacheado de una carpeta de mapas (ordenado por nombre).
+    refresh() solo hace un stat de la carpeta: si su mtime no cambió
+    (no se agregaron/borraron/renombraron archivos) no se vuelve a listar.
+    Cuando la propia app guarda un archivo, added() lo inserta sin re-escanear.
+    """
+    def __init__(self, dir_path, ext=".txt"):
+        self.dir_path = dir_path
+        self.ext      = ext
+        self.files    = []
+        self._mtime   = None       # st_mtime_ns de la carpeta en el último escaneo
+        self.refresh()
+
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.dir_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def refresh(self):
+        """Re-escanea solo si la carpeta cambió. Devuelve True si la lista cambió."""
+        mtime = self._dir_mtime()
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        nuevos = []
+        if mtime is not None:
+            with os.scandir(self.dir_path) as it:
+                nuevos = sorted(e.name for e in it if e.name.endswith(self.ext))
+        if nuevos == self.files:
+            return False
+        self.files = nuevos
+        return True
+
+    def added(self, name):
+        """Registra un archivo recién guardado por nosotros (evita el re-escaneo)."""
+        if not name.endswith(self.ext):
+            return
+        i = bisect.bisect_left(self.files, name)
+        if i == len(self.files) or self.files[i] != name:
+            self.files.insert(i, name)
+        self._mtime = self._dir_mtime()
+
+
+# ---------- Validación y estadísticas ----------
+class MapInfo:
+    """
+    Resumen de un mapa calculado en una sola pasada (ver analyze_map).
+
+    rows, cols       → filas y ancho de la primera fila
+    ragged           → True si alguna fila tiene otro ancho
+    bad_rows         → índices de las filas con ancho distinto
+    walls, empty, treasures, path, other → conteo por tipo de celda
+    terrain          → {carácter: celdas} del terreno con costo > 1 (parte de other)
+    treasure_coords  → [(x, y), ...] de cada 'T'
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.cols = 0
+        self.ragged = False
+        self.bad_rows = []
+        self.walls = self.empty = self.treasures = self.path = self.other = 0
+        self.terrain = {}
+        self.treasure_coords = []
+
+    def _add_row(self, fila, i):
+        if i == 0:
+            self.cols = len(fila)
+        elif len(fila) != self.cols:
+            self.ragged = True
+            self.bad_rows.append(i)
+        self.rows += 1
+        # count() recorre la fila en C; Python solo itera por fila
+        w, e, t, p = fila.count("#"), fila.count("."), fila.count("T"), fila.count("*")
+        self.walls += w; self.empty += e; self.treasures += t; self.path += p
+        otros = len(fila) - w - e - t - p
+        self.other += otros
+        if otros:                                    # solo filas con algo fuera de "#.T*"
+            for ch, costo in TERRAIN_COST.items():
+                if costo > 1 and (n := fila.count(ch)):
+                    self.terrain[ch] = self.terrain.get(ch, 0) + n
+        if t:
+            self.treasure_coords.extend((i, j) for j, ch in enumerate(fila) if ch == "T")
+
+    @property
+    def weighted(self):
+        """True si hay celdas de terreno (costo > 1): se resuelve por costo mínimo."""
+        return bool(self.terrain)
+
+    @property
+    def valid(self):
+        """Rectangular y no vacío: lo que asumen los solvers."""
+        return self.rows > 0 and self.cols > 0 and not self.ragged
+
+    def error(self):
+        """Mensaje de por qué no es válido (None si lo es)."""
+        if self.rows == 0 or self.cols == 0:
+            return "mapa vacío"
+        if self.ragged:
+            return f"filas de distinto ancho (esperado {self.cols}): {self.bad_rows[:5]}"
+        return None
+
+    def __repr__(self):
+        return (f"MapInfo({self.rows}x{self.cols}, ragged={self.ragged}, walls={self.walls}, "
+                f"empty={self.empty}, treasures={self.treasures}, path={self.path})")
+
+def analyze_map(mapa):
+    """Dimensiones, consistencia de filas y conteos del mapa en una pasada."""
+    info = MapInfo()
+    for i, fila in enumerate(mapa):
+        info._add_row(fila, i)
+    return info
+
+
 # ---------- Edición de la matriz ----------
 def in_bounds(matrix, x, y):
     return 0 <= x < len(matrix) and 0 <= y < len(matrix[0])
@@ -58,31 +187,326 @@ def set_cell(matrix, x, y, ch):
 #   segmento horizonatal o vertical                                                 
 def paint_segment(matrix, x1, y1, x2, y2, ch="#"):
     if x1 == x2:  # vertical (mismo x → columnas cambian)
-        paso = 1 if y2 >= y1 else -1
-        for y in range(y1, y2 + paso, paso):
-            if in_bounds(matrix, x1, y):
-                matrix[x1][y] = ch
+        fill_rect(matrix, x1, min(y1, y2), x1, max(y1, y2), ch)
     elif y1 == y2:  # horizontal (mismo y → filas cambian)
-        paso = 1 if x2 >= x1 else -1
-        for x in range(x1, x2 + paso, paso):
-            if in_bounds(matrix, x, y1):
-                matrix[x][y1] = ch
+        fill_rect(matrix, min(x1, x2), y1, max(x1, x2), y1, ch)
     else:
         raise ValueError("Solo se permiten segmentos rectos (H o V)")
 
 
+# ---------- Edición en bloque ----------
+#   Recortan al rango UNA vez y escriben por filas con asignación de slices,
+#   así el costo es O(celdas editadas) sin chequear in_bounds por celda.
+
+def _clip_rect(matrix, x1, y1, x2, y2):
+    """Recorta el rectángulo (x1,y1)-(x2,y2) inclusivo al mapa. None si queda vacío."""
+    if not matrix:
+        return None
+    x1, x2 = max(min(x1, x2), 0), min(max(x1, x2), len(matrix) - 1)
+    y1, y2 = max(min(y1, y2), 0), min(max(y1, y2), len(matrix[0]) - 1)
+    if x1 > x2 or y1 > y2:
+        return None
+    return x1, y1, x2, y2
+
+def fill_rect(matrix, x1, y1, x2, y2, ch="#"):
+    """Rellena el rectángulo de esquinas (x1,y1) y (x2,y2), inclusivo."""
+    r = _clip_rect(matrix, x1, y1, x2, y2)
+    if r is None:
+        return
+    x1, y1, x2, y2 = r
+    fila = [ch] * (y2 - y1 + 1)
+    for x in range(x1, x2 + 1):
+        matrix[x][y1:y2 + 1] = fila
+
+def outline_rect(matrix, x1, y1, x2, y2, ch="#"):
+    """Dibuja solo el borde del rectángulo (x1,y1)-(x2,y2), inclusivo."""
+    if not matrix:
+        return
+    x1, x2 = min(x1, x2), max(x1, x2)
+    y1, y2 = min(y1, y2), max(y1, y2)
+    fill_rect(matrix, x1, y1, x1, y2, ch)            # borde superior
+    fill_rect(matrix, x2, y1, x2, y2, ch)            # borde inferior
+    if x2 - x1 < 2:
+        return
+    rows, cols = len(matrix), len(matrix[0])
+    for y in (y1, y2):                               # bordes laterales
+        if 0 <= y < cols:
+            for x in range(max(x1 + 1, 0), min(x2, rows)):
+                matrix[x][y] = ch
+
+def _primer(pred, lo, hi):
+    """Primer i en [lo, hi] con pred(i) verdadero (pred monótono); hi + 1 si no hay."""
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if pred(mid):
+            hi = mid - 1
+        else:
+            lo = mid + 1
+    return lo
+
+def paint_line(matrix, x1, y1, x2, y2, ch="#"):
+    """Línea arbitraria entre (x1,y1) y (x2,y2), inclusiva (8-conexa, como Bresenham)."""
+    if not matrix:
+        return
+    if x1 == x2 or y1 == y2:
+        fill_rect(matrix, x1, y1, x2, y2, ch)
+        return
+    rows, cols = len(matrix), len(matrix[0])
+    dx, dy = x2 - x1, y2 - y1
+    n = max(abs(dx), abs(dy))                  # pasos sobre el eje mayor
+
+    # celda i (0..n) = inicio + round(i * d / n) en cada eje: monótona en i,
+    # así el tramo dentro del mapa es un rango [lo, hi] que se busca una vez
+    def coord(a, d, i):
+        return a + (2 * i * d + n) // (2 * n)
+
+    lo, hi = 0, n
+    for a, d, lim in ((x1, dx, rows), (y1, dy, cols)):
+        if d > 0:
+            lo = max(lo, _primer(lambda i: coord(a, d, i) >= 0, 0, n))
+            hi = min(hi, _primer(lambda i: coord(a, d, i) >= lim, 0, n) - 1)
+        else:
+            lo = max(lo, _primer(lambda i: coord(a, d, i) < lim, 0, n))
+            hi = min(hi, _primer(lambda i: coord(a, d, i) < 0, 0, n) - 1)
+    for i in range(lo, hi + 1):
+        matrix[coord(x1, dx, i)][coord(y1, dy, i)] = ch
+
+def apply_edits(matrix, edits):
+    """
+    Aplica una lista de ediciones [(x, y, ch), ...] de una vez.
+    Las que caen fuera del mapa se ignoran. Devuelve cuántas se aplicaron.
+    """
+    rows = len(matrix)
+    if not rows:
+        return 0
+    cols = len(matrix[0])
+    aplicadas = 0
+    for x, y, ch in edits:
+        if 0 <= x < rows and 0 <= y < cols:
+            matrix[x][y] = ch
+            aplicadas += 1
+    return aplicadas
+
+
 
 # ---------- Generación aleatoria ----------
-def random_map(rows, cols, density= 0.15, ensure_treasure = True):
-    
+def random_map(rows, cols, density= 0.15, ensure_treasure = True, seed=None):
+    """Ruido uniforme. Con seed usa su propio generador (reproducible)."""
+    rng = random if seed is None else random.Random(seed)
     random_map = new_matrix(rows, cols, ".")
     for i in range(rows):
         for j in range(cols):
-            random_map[i][j] = "#" if random.random() < density else "."
+            random_map[i][j] = "#" if rng.random() < density else "."
     if ensure_treasure:
-        tx, ty = random.randrange(rows), random.randrange(cols)
+        tx, ty = rng.randrange(rows), rng.randrange(cols)
         random_map[tx][ty] = "T"
     return random_map
 
 
+# ---------- Laberintos y cuevas ----------
+#   Trabajan sobre un bytearray plano (rows*cols) y recién al final se
+#   convierten a Matrix, fila por fila. Las celdas del laberinto están en
+#   coordenadas pares; con tamaño par la última fila/columna queda de muro.
+
+_B_WALL, _B_EMPTY = ord("#"), ord(".")
+
+def _bytes_to_matrix(grid, rows, cols):
+    return [list(grid[i*cols:(i+1)*cols].decode("ascii")) for i in range(rows)]
+
+def _place_treasure(grid, rows, cols, rng):
+    """Pone una T en una celda abierta al azar (o en la primera abierta)."""
+    for _ in range(64):
+        k = rng.randrange(rows * cols)
+        if grid[k] == _B_EMPTY:
+            grid[k] = ord("T")
+            return
+    k = grid.find(_B_EMPTY)
+    if k >= 0:
+        grid[k] = ord("T")
+
+def maze_backtracker(rows, cols, seed=None, ensure_treasure=True):
+    """
+    Laberinto perfecto por backtracking recursivo (con pila explícita).
+    Se carva sobre una grilla con un borde extra de centinelas (0 ≠ '#'):
+    un vecino fuera del laberinto se ve como "ya visitado", sin chequear
+    rangos; la celda visitada es la que ya no es '#'. Celda (i, j) →
+    posición (2i+2, 2j+2); el muro entre dos celdas es el punto medio.
+    """
+    rng = random.Random(seed)
+    ch, cw = (rows + 1) // 2, (cols + 1) // 2          # celdas del laberinto
+    if ch == 0 or cw == 0:
+        return _bytes_to_matrix(bytearray(b"#") * (rows * cols), rows, cols)
+    W, H = 2*cw + 3, 2*ch + 3
+    g = bytearray(b"#") * (W * H)
+    g[:W] = bytes(W); g[-W:] = bytes(W)                 # bordes centinela
+    g[0::W] = bytes(H); g[W - 1::W] = bytes(H)
+    p = (2*rng.randrange(ch) + 2) * W + 2*rng.randrange(cw) + 2
+    g[p] = _B_EMPTY
+    W2 = 2 * W
+    stack = [p]
+    push, pop, rnd = stack.append, stack.pop, rng.random
+    while stack:
+        p = stack[-1]
+        vecinos = []
+        if g[p - W2] == _B_WALL: vecinos.append(p - W2)
+        if g[p + W2] == _B_WALL: vecinos.append(p + W2)
+        if g[p - 2] == _B_WALL:  vecinos.append(p - 2)
+        if g[p + 2] == _B_WALL:  vecinos.append(p + 2)
+        if not vecinos:
+            pop()
+            continue
+        n = vecinos[int(rnd() * len(vecinos))]
+        g[(p + n) >> 1] = _B_EMPTY                      # muro entre ambas celdas
+        g[n] = _B_EMPTY
+        push(n)
+    grid = bytearray().join(g[(r + 2)*W + 2:(r + 2)*W + 2 + cols] for r in range(rows))
+    if ensure_treasure:
+        _place_treasure(grid, rows, cols, rng)
+    return _bytes_to_matrix(grid, rows, cols)
+
+def maze_kruskal(rows, cols, seed=None, ensure_treasure=True):
+    """
+    Laberinto perfecto por Kruskal aleatorio (union-find con rango y
+    path halving, en arrays planos).
+    Cada arista es la posición de su muro en una grilla de ancho par W:
+    impar → muro horizontal entre (p-1, p+1), par → vertical entre
+    (p-W, p+W); la celda en la posición q tiene id q >> 1. El orden al
+    azar sale de una clave de 16 bits por arista (randbytes, en C) y un
+    reparto en 65536 baldes: sin shuffle elemento a elemento.
+    """
+    rng = random.Random(seed)
+    ch, cw = (rows + 1) // 2, (cols + 1) // 2
+    if ch == 0 or cw == 0:
+        return _bytes_to_matrix(bytearray(b"#") * (rows * cols), rows, cols)
+    W = cols + (cols & 1)                               # ancho par (se recorta al final)
+    grid = bytearray(b"#") * (rows * W)
+    for i in range(ch):
+        grid[2*i*W:2*i*W + 2*cw:2] = b"." * cw
+
+    aristas = [range(2*i*W + 1, 2*i*W + 2*cw - 1, 2) for i in range(ch)]                   # horizontales
+    aristas += [range((2*i + 1)*W, (2*i + 1)*W + 2*cw, 2) for i in range(ch - 1)]        # verticales
+    claves = array("H", rng.randbytes(2 * (ch*(cw - 1) + (ch - 1)*cw)))
+    baldes = [array("i") for _ in range(1 << 16)]
+    for w, k in zip(chain.from_iterable(aristas), claves):
+        baldes[k].append(w)
+
+    parent = array("i", range(ch * W))                 # id de celda = posición >> 1
+    rango = bytearray(len(parent))
+    restantes = ch * cw - 1
+    for w in chain.from_iterable(baldes):
+        if not restantes:
+            break
+        if w & 1:
+            a = w >> 1; b = a + 1
+        else:
+            a = (w - W) >> 1; b = a + W
+        while (p := parent[a]) != a:                    # find con "path halving"
+            g = parent[p]; parent[a] = g; a = g
+        while (p := parent[b]) != b:
+            g = parent[p]; parent[b] = g; b = g
+        if a == b:
+            continue
+        ra, rb = rango[a], rango[b]
+        if ra < rb:
+            parent[a] = b
+        else:
+            parent[b] = a
+            if ra == rb:
+                rango[a] = ra + 1
+        grid[w] = _B_EMPTY
+        restantes -= 1
+    if W != cols:
+        grid = bytearray().join(grid[r*W:r*W + cols] for r in range(rows))
+    if ensure_treasure:
+        _place_treasure(grid, rows, cols, rng)
+    return _bytes_to_matrix(grid, rows, cols)
+
+def cave_map(rows, cols, density=0.45, steps=4, seed=None, ensure_treasure=True):
+    """
+    Cuevas por autómata celular (regla 4-5: muro si hay >= 5 muros en el 3x3).
+    Cada fila es un entero usado como máscara de bits, así cada paso del
+    autómata procesa filas enteras con operaciones de bits en C.
+    """
+    rng = random.Random(seed)
+    full = (1 << cols) - 1
+    umbral = min(max(int(density * 256), 0), 256)
+    # byte aleatorio < umbral → muro ('1'); se lee al revés para que bit j = columna j
+    tabla = bytes(ord("1") if b < umbral else ord("0") for b in range(256))
+    masks = [int(rng.randbytes(cols).translate(tabla)[::-1] or b"0", 2) for _ in range(rows)]
+
+    for _ in range(steps):
+        nuevo = []
+        for i in range(rows):
+            arriba = masks[i - 1] if i > 0 else full       # fuera del mapa = muro
+            abajo  = masks[i + 1] if i < rows - 1 else full
+            # 9 planos: cada fila vecina, corrida a izquierda y derecha
+            c0 = c1 = c2 = c3 = 0
+            for m in (arriba, masks[i], abajo):
+                izq = ((m << 1) | 1) & full
+                der = (m >> 1) | (1 << (cols - 1)) if cols else 0
+                for plano in (izq, m, der):
+                    # sumador bit a bit: (c3 c2 c1 c0) += plano
+                    carry = c0 & plano; c0 ^= plano
+                    t = c1 & carry;     c1 ^= carry; carry = t
+                    t = c2 & carry;     c2 ^= carry; carry = t
+                    c3 |= carry
+            nuevo.append((c3 | (c2 & (c1 | c0))) & full)    # cuenta >= 5
+        masks = nuevo
+
+    trad = str.maketrans("01", ".#")
+    mapa = [list(format(m, "b").zfill(cols)[::-1].translate(trad)) if cols else [] for m in masks]
+    if ensure_treasure and rows and cols:
+        for _ in range(64):
+            tx, ty = rng.randrange(rows), rng.randrange(cols)
+            if mapa[tx][ty] == ".":
+                break
+        else:
+            # casi todo muro: primera celda abierta, o cualquiera si no hay
+            tx, ty = next(((i, j) for i, row in enumerate(mapa)
+                           for j, ch in enumerate(row) if ch == "."), (tx, ty))
+        mapa[tx][ty] = "T"
+    return mapa
+
+
+# ---------- Terreno con costo ----------
+#   Celdas transitables que cuestan más de 1 al entrar (ver buscador_costos).
+#   Para los solvers sin costos (backtracking, LPA*, HPA*) son celdas libres.
+SAND, WATER, SWAMP = ":", "~", "%"
+TERRAIN_COST = {".": 1, "T": 1, "*": 1, "@": 1, SAND: 2, WATER: 4, SWAMP: 8}
+
+def add_terrain(matrix, density=0.25, blob=12, seed=None, kinds=(SAND, WATER, SWAMP)):
+    """Pinta manchas de terreno (caminatas al azar de `blob` pasos) sobre celdas '.'."""
+    rng = random.Random(seed)
+    rows, cols = len(matrix), len(matrix[0]) if matrix else 0
+    if rows == 0 or cols == 0:
+        return matrix
+    objetivo = int(rows * cols * density)
+    pintadas = intentos = 0
+    while pintadas < objetivo and intentos < 4 * objetivo + 16:
+        intentos += 1
+        ch = rng.choice(kinds)
+        x, y = rng.randrange(rows), rng.randrange(cols)
+        for _ in range(blob):
+            if matrix[x][y] == ".":
+                matrix[x][y] = ch
+                pintadas += 1
+            dx, dy = rng.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))
+            x = min(max(x + dx, 0), rows - 1)
+            y = min(max(y + dy, 0), cols - 1)
+    return matrix
+
+def terrain_map(rows, cols, seed=None, density=0.25):
+    """Ruido con pocos muros + manchas de arena, agua y pantano."""
+    rng = random.Random(seed)
+    mapa = random_map(rows, cols, 0.12, True, rng.random())
+    return add_terrain(mapa, density, seed=rng.random())
+
 
+# Generadores por nombre (UI y benchmarks): f(rows, cols, seed=None) -> Matrix
+MAP_GENERATORS = {
+    "ruido":       lambda rows, cols, seed=None: random_map(rows, cols, 0.15, True, seed),
+    "backtracker": maze_backtracker,
+    "kruskal":     maze_kruskal,
+    "cueva":       cave_map,
+    "terreno":     terrain_map,
+}
@@ -0,0 +1,277 @@
+from __future__ import annotations
+import json
+import os
+import struct
+import sys
+import time
+
+import pygame
+
+# ------------------------------------------------------------
+# Grabación y reproducción de sesiones de UI
+# ------------------------------------------------------------
+#   Grabar:      TREASURE_RECORD=sesion.tsr python main.py
+#   Reproducir:  python grabacion_ui.py sesion.tsr [--json reporte.json]
+#
+#   El grabador se engancha en LoopPacer (visualizador): cada frame que
+#   trae eventos de entrada se guarda con su tiempo (ms desde el inicio) y
+#   si la pantalla estaba "ocupada" (animando / esperando un solve).
+#
+#   El reproductor corre headless (SDL dummy), con STEP_DELAY = 0 y sin
+#   limitar a FPS. Para que sea determinista:
+#     - un frame grabado en reposo se entrega recién cuando la pantalla
+#       vuelve al reposo (termina la animación o el solve);
+#     - uno grabado con la pantalla ocupada (p.ej. "Cancelar") se entrega
+#       en el frame siguiente, sin esperar;
+#     - el doble click usa el reloj de la grabación (event_ticks);
+#     - el botón Random toma sus semillas de la "seed" de la cabecera.
+#   Reproduce sobre la carpeta MAPS actual: tiene que tener los mismos
+#   mapas que cuando se grabó.
+#
+#   Formato (binario, little endian):
+#     MAGIC + una línea JSON {"pantalla", "ancho", "alto", "seed"}
+#     por frame:  <IBH  t_ms, flags (bit 0 = ocupado), n_eventos
+#     por evento: <B código + datos según el tipo (ver _CODIGOS)
+
+MAGIC = b"TSR1\n"
+
+_FRAME = struct.Struct("<IBH")
+_TECLA = struct.Struct("<iH")            # key, mod
+_MOVIM = struct.Struct("<hhhhB")         # pos, rel, botones (bits)
+_BOTON = struct.Struct("<hhB")           # pos, botón
+_RUEDA = struct.Struct("<hh")            # x, y
+
+# código en el archivo -> tipo de evento (los números de pygame pueden cambiar)
+_CODIGOS = {
+    1: pygame.QUIT,
+    2: pygame.KEYDOWN,
+    3: pygame.KEYUP,
+    4: pygame.MOUSEMOTION,
+    5: pygame.MOUSEBUTTONDOWN,
+    6: pygame.MOUSEBUTTONUP,
+    7: pygame.MOUSEWHEEL,
+    8: pygame.WINDOWFOCUSLOST,
+    9: pygame.WINDOWFOCUSGAINED,
+    10: pygame.WINDOWMINIMIZED,
+    11: pygame.WINDOWRESTORED,
+    12: pygame.WINDOWEXPOSED,
+}
+_TIPOS = {tipo: cod for cod, tipo in _CODIGOS.items()}
+
+# tope de frames "en espera" entre dos frames grabados (solve colgado...)
+MAX_ESPERA = 200_000
+
+
+# ---------- Codificación de eventos ----------
+def _encode(e):
+    cod = _TIPOS.get(e.type)
+    if cod is None:
+        return None                                  # no es entrada: no se graba
+    t = e.type
+    if t in (pygame.KEYDOWN, pygame.KEYUP):
+        datos = _TECLA.pack(e.key, e.mod & 0xFFFF)
+        if t == pygame.KEYDOWN:
+            txt = getattr(e, "unicode", "").encode("utf-8")[:255]
+            datos += bytes((len(txt),)) + txt
+    elif t == pygame.MOUSEMOTION:
+        bits = sum(1 << i for i, b in enumerate(e.buttons[:8]) if b)
+        datos = _MOVIM.pack(*e.pos, *e.rel, bits)
+    elif t in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        datos = _BOTON.pack(*e.pos, e.button)
+    elif t == pygame.MOUSEWHEEL:
+        datos = _RUEDA.pack(e.x, e.y)
+    else:
+        datos = b""
+    return bytes((cod,)) + datos
+
+
+def _decode(buf, k):
+    """Evento que empieza en buf[k]: (pygame.event.Event, k siguiente)."""
+    t = _CODIGOS[buf[k]]
+    k += 1
+    if t in (pygame.KEYDOWN, pygame.KEYUP):
+        key, mod = _TECLA.unpack_from(buf, k)
+        k += _TECLA.size
+        attrs = {"key": key, "mod": mod, "scancode": 0}
+        if t == pygame.KEYDOWN:
+            n = buf[k]
+            attrs["unicode"] = buf[k + 1:k + 1 + n].decode("utf-8")
+            k += 1 + n
+    elif t == pygame.MOUSEMOTION:
+        x, y, rx, ry, bits = _MOVIM.unpack_from(buf, k)
+        k += _MOVIM.size
+        attrs = {"pos": (x, y), "rel": (rx, ry), "buttons": tuple(bool(bits >> i & 1) for i in range(3))}
+    elif t in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        x, y, b = _BOTON.unpack_from(buf, k)
+        k += _BOTON.size
+        attrs = {"pos": (x, y), "button": b}
+    elif t == pygame.MOUSEWHEEL:
+        x, y = _RUEDA.unpack_from(buf, k)
+        k += _RUEDA.size
+        attrs = {"x": x, "y": y, "flipped": False}
+    else:
+        attrs = {}
+    return pygame.event.Event(t, attrs), k
+
+
+# ---------- Grabador ----------
+class Grabador:
+    """
+    Escribe los frames con eventos de entrada a medida que llegan
+    (flush por frame: una sesión que termina con sys.exit no se pierde).
+    """
+
+    def __init__(self, path, pantalla="menu"):
+        import visualizador as V
+        self.f  = open(path, "wb")
+        self.t0 = pygame.time.get_ticks()
+        self.frames = 0
+        self.seed = int.from_bytes(os.urandom(4), "little") >> 2
+        V.seed_generadores(self.seed)
+        cab = {"pantalla": pantalla, "ancho": V.WIDTH, "alto": V.HEIGHT, "seed": self.seed}
+        self.f.write(MAGIC + json.dumps(cab).encode("utf-8") + b"\n")
+
+    def frame(self, eventos, ocupado):
+        datos = [d for d in map(_encode, eventos) if d is not None]
+        if not datos or self.f.closed:
+            return
+        t = max(0, pygame.time.get_ticks() - self.t0)
+        self.f.write(_FRAME.pack(t, 1 if ocupado else 0, len(datos)) + b"".join(datos))
+        self.f.flush()
+        self.frames += 1
+
+    def close(self):
+        if not self.f.closed:
+            self.f.close()
+
+
+def leer_sesion(path):
+    """Devuelve (cabecera, [(t_ms, ocupado, [eventos]), ...])."""
+    with open(path, "rb") as f:
+        buf = f.read()
+    if not buf.startswith(MAGIC):
+        raise ValueError(f"{path}: no es una grabación de sesión")
+    fin = buf.index(b"\n", len(MAGIC))
+    cab = json.loads(buf[len(MAGIC):fin])
+    frames = []
+    k = fin + 1
+    while k + _FRAME.size <= len(buf):
+        t, flags, n = _FRAME.unpack_from(buf, k)
+        k += _FRAME.size
+        eventos = []
+        try:
+            for _ in range(n):
+                e, k = _decode(buf, k)
+                eventos.append(e)
+        except (IndexError, struct.error):
+            break                                    # último frame cortado (sesión interrumpida)
+        frames.append((t, bool(flags & 1), eventos))
+    return cab, frames
+
+
+# ---------- Reproductor ----------
+class FinReproduccion(Exception):
+    """Se entregaron todos los frames y la pantalla volvió al reposo."""
+
+
+class _Fuente:
+    """Fuente de eventos para LoopPacer durante la reproducción; mide cada frame."""
+
+    def __init__(self, frames, max_espera=MAX_ESPERA):
+        self.frames     = frames
+        self.max_espera = max_espera
+        self.i          = 0
+        self.ticks      = 0
+        self.espera     = 0                  # frames vacíos seguidos (pantalla ocupada)
+        self.en_espera  = 0                  # total de frames vacíos entregados
+        self.cortado    = False
+        self.tiempos    = []                 # segundos entre llamadas = un frame de la pantalla
+        self._t         = None
+
+    def siguiente(self, ocupado):
+        now = time.perf_counter()
+        if self._t is not None:
+            self.tiempos.append(now - self._t)
+        self._t = now
+
+        pendiente = self.i < len(self.frames)
+        if ocupado and not (pendiente and self.frames[self.i][1]):
+            if self.espera < self.max_espera:
+                self.espera += 1
+                self.en_espera += 1
+                time.sleep(0)                # soltar el GIL al hilo del solve
+                return []
+            self.cortado = True
+        if not pendiente:
+            raise FinReproduccion()
+        t, _, eventos = self.frames[self.i]
+        self.i += 1
+        self.espera = 0
+        self.ticks = t
+        return list(eventos)
+
+    def reporte(self):
+        ms = sorted(t * 1000 for t in self.tiempos)
+        def pct(p):
+            return ms[min(len(ms) - 1, int(p * len(ms)))] if ms else 0.0
+        return {
+            "frames":           len(ms),
+            "frames_entrada":   self.i,
+            "frames_espera":    self.en_espera,
+            "duracion_grabada_s": (self.frames[-1][0] / 1000) if self.frames else 0.0,
+            "duracion_s":       sum(ms) / 1000,
+            "ms_media":         (sum(ms) / len(ms)) if ms else 0.0,
+            "ms_p50":           pct(0.50),
+            "ms_p95":           pct(0.95),
+            "ms_p99":           pct(0.99),
+            "ms_max":           ms[-1] if ms else 0.0,
+            "cortado":          self.cortado,
+        }
+
+
+def reproducir(path, pantalla=None, max_espera=MAX_ESPERA):
+    """
+    Reproduce la grabación headless lo más rápido posible.
+    pantalla: "menu" | "generator" | "solver" (por defecto, la de la cabecera).
+    Devuelve el reporte de tiempos por frame (ver _Fuente.reporte).
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import visualizador as V
+
+    cab, frames = leer_sesion(path)
+    pantallas = {"menu": V.main_loop, "generator": V.generator_screen, "solver": V.solver_screen}
+    correr = pantallas[pantalla or cab.get("pantalla", "menu")]
+
+    os.makedirs(V.ANIM_DIR, exist_ok=True)
+    pygame.init()
+    screen = pygame.display.set_mode((V.WIDTH, V.HEIGHT))
+
+    fuente = _Fuente(frames, max_espera)
+    step_delay = V.STEP_DELAY
+    V.LoopPacer.fuente, V.STEP_DELAY = fuente, 0
+    V.seed_generadores(cab.get("seed"))
+    try:
+        correr(screen)
+    except (FinReproduccion, SystemExit):           # fin de la grabación / QUIT grabado
+        pass
+    finally:
+        V.LoopPacer.fuente, V.STEP_DELAY = None, step_delay
+        V.seed_generadores(None)
+    return fuente.reporte()
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Reproduce una sesión grabada con TREASURE_RECORD.")
+    ap.add_argument("sesion")
+    ap.add_argument("--pantalla", choices=("menu", "generator", "solver"), default=None)
+    ap.add_argument("--json", default=None, help="guardar el reporte en este archivo")
+    args = ap.parse_args()
+
+    rep = reproducir(args.sesion, args.pantalla)
+    for k, v in rep.items():
+        print(f"{k:<20}{v:.3f}" if isinstance(v, float) else f"{k:<20}{v}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rep, f, indent=1)
+    sys.exit(1 if rep["cortado"] else 0)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+import time
+
+# ------------------------------------------------------------
+# Instrumentación opcional (solver + loop de UI)
+# ------------------------------------------------------------
+#   Todo es "opt-in": si no se pasa un objeto de stats / profiler,
+#   el código instrumentado ni siquiera se ejecuta.
+
+
+class SolverStats:
+    """
+    Contadores de una búsqueda.
+
+    nodes       → celdas visitadas (entradas válidas a la recursión)
+    backtracks  → celdas abandonadas sin encontrar el tesoro
+    memo_hits   → llamadas cortadas por la memorización
+    max_depth   → profundidad máxima de la pila de búsqueda
+    elapsed     → segundos que tardó la búsqueda
+
+    on_progress(stats) se llama cada `progress_every` nodos (si se da);
+    sirve para reportar avance o cortar la búsqueda lanzando una excepción.
+    """
+
+    def __init__(self, on_progress=None, progress_every=1000):
+        self.on_progress    = on_progress
+        self.progress_every = max(1, progress_every)
+        self.reset()
+
+    def reset(self):
+        self.nodes      = 0
+        self.backtracks = 0
+        self.memo_hits  = 0
+        self.max_depth  = 0
+        self.depth      = 0
+        self.elapsed    = 0.0
+        self._next_report = self.progress_every
+
+    def visit(self, depth):
+        """Registra una celda visitada a la profundidad dada."""
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.on_progress is not None and self.nodes >= self._next_report:
+            self._next_report += self.progress_every
+            self.on_progress(self)
+
+    def as_dict(self):
+        return {
+            "nodes":      self.nodes,
+            "backtracks": self.backtracks,
+            "memo_hits":  self.memo_hits,
+            "max_depth":  self.max_depth,
+            "elapsed":    self.elapsed,
+        }
+
+    def __repr__(self):
+        d = self.as_dict()
+        return "SolverStats(" + ", ".join(f"{k}={v}" for k, v in d.items()) + ")"
+
+
+class FrameProfiler:
+    """
+    Mide cuánto tarda cada fase de un frame del loop de pygame.
+
+    Uso dentro del loop:
+        prof.begin_frame()
+        ...eventos...           ; prof.mark("eventos")
+        ...animación...         ; prof.mark("animacion")
+        ...dibujo...            ; prof.mark("preview")
+        pygame.display.flip()   ; prof.mark("flip")
+        prof.end_frame(fps)
+
+    on_frame(dict) se llama al cerrar cada frame con los ms de cada fase.
+    Los promedios son exponenciales (suavizados) para mostrarlos en pantalla.
+    """
+
+    SMOOTH = 0.1
+
+    def __init__(self, on_frame=None):
+        self.on_frame = on_frame
+        self.frames   = 0
+        self.fps      = 0.0
+        self.avg_ms: dict[str, float] = {}
+        self._phase_ms: dict[str, float] = {}
+        self._t_mark  = time.perf_counter()
+
+    def begin_frame(self):
+        self._phase_ms = {}
+        self._t_mark = time.perf_counter()
+
+    def mark(self, phase):
+        """Cierra la fase `phase` (acumula si se marca dos veces en el frame)."""
+        now = time.perf_counter()
+        self._phase_ms[phase] = self._phase_ms.get(phase, 0.0) + (now - self._t_mark) * 1000.0
+        self._t_mark = now
+
+    def end_frame(self, fps=None):
+        self.frames += 1
+        if fps is not None:
+            self.fps = fps
+        a = self.SMOOTH
+        for phase, ms in self._phase_ms.items():
+            prev = self.avg_ms.get(phase)
+            self.avg_ms[phase] = ms if prev is None else prev + a * (ms - prev)
+        if self.on_frame is not None:
+            self.on_frame(dict(self._phase_ms))
+
+    def summary_lines(self):
+        """Líneas de texto listas para un overlay."""
+        lines = [f"FPS {self.fps:5.1f}"]
+        for phase, ms in self.avg_ms.items():
+            lines.append(f"{phase:<10}{ms:6.2f} ms")
+        return lines
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import os
+import re
+import subprocess
+import sys
+
+# ------------------------------------------------------------
+# Presupuesto de tiempo de import del núcleo (workers headless)
+# ------------------------------------------------------------
+#   Corre cada escenario en un intérprete limpio con `-X importtime`,
+#   suma el tiempo acumulado de los módulos del proyecto y verifica:
+#     - que no se cargue pygame
+#     - que el total no pase del presupuesto (ms)
+#   Sale con código 1 si algún escenario falla.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PRESUPUESTO_MS = 15.0
+
+ESCENARIOS = {
+    "import nucleo":  "import nucleo",
+    "solver":         "import nucleo; nucleo.search_treasure; nucleo.load_map",
+    "solver+trazas":  "import nucleo; nucleo.search_treasure; nucleo.load_steps_file; nucleo.SolverStats",
+}
+
+_LINEA = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _importtime(codigo):
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                       cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    filas = []
+    for line in p.stderr.splitlines():
+        m = _LINEA.match(line)
+        if m:
+            # (módulo, acumulado_us, es_de_primer_nivel)
+            filas.append((m.group(4), int(m.group(2)), len(m.group(3)) == 1))
+    return filas, p.stdout
+
+
+def medir(codigo, arranque=frozenset()):
+    """
+    Devuelve (ms_totales_import, pygame_cargado) para `codigo`.
+    `arranque` son los módulos que el intérprete ya carga solo (se descuentan).
+    """
+    chequeo = codigo + "; import sys; print('PYGAME' if 'pygame' in sys.modules else 'OK')"
+    filas, out = _importtime(chequeo)
+    # solo módulos de primer nivel: su acumulado ya incluye a los hijos
+    total_us = sum(us for mod, us, top in filas if top and mod not in arranque)
+    return total_us / 1000.0, out.strip().endswith("PYGAME")
+
+
+def main(presupuesto=PRESUPUESTO_MS, repeticiones=5):
+    ok = True
+    arranque = frozenset(mod for mod, _, _ in _importtime("pass")[0])
+    for nombre, codigo in ESCENARIOS.items():
+        tiempos = []
+        pygame = False
+        for _ in range(repeticiones):
+            ms, pg = medir(codigo, arranque)
+            tiempos.append(ms)
+            pygame = pygame or pg
+        ms = min(tiempos)                  # el mínimo filtra el ruido del sistema
+        estado = "OK"
+        if pygame:
+            estado, ok = "FALLA (carga pygame)", False
+        elif ms > presupuesto:
+            estado, ok = f"FALLA (> {presupuesto:.0f} ms)", False
+        print(f"{nombre:<16}{ms:8.2f} ms   {estado}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Mide el tiempo de import del núcleo sin pygame.")
+    ap.add_argument("--presupuesto", type=float, default=PRESUPUESTO_MS, help="ms por escenario")
+    ap.add_argument("-n", type=int, default=5, help="repeticiones (se toma el mínimo)")
+    args = ap.parse_args()
+    sys.exit(main(args.presupuesto, args.n))
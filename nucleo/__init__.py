@@ -0,0 +1,94 @@
+"""
+Núcleo sin pygame: mapas, grilla, solvers y formato de trazas.
+
+Todo se importa de forma perezosa: `import nucleo` no carga ningún
+módulo del proyecto ni crea carpetas; cada nombre se resuelve la
+primera vez que se usa. Pensado para workers batch y servicios
+(ver medir_importacion.py para el presupuesto de tiempo de import).
+"""
+from __future__ import annotations
+import importlib
+
+# nombre público -> módulo que lo define
+_EXPORTS = {
+    # Mapa: creación, edición e I/O
+    "Matrix":            "generador_mapa",
+    "new_matrix":        "generador_mapa",
+    "clone_matrix":      "generador_mapa",
+    "load_map":          "generador_mapa",
+    "load_map_info":     "generador_mapa",
+    "analyze_map":       "generador_mapa",
+    "MapInfo":           "generador_mapa",
+    "save_map":          "generador_mapa",
+    "list_maps":         "generador_mapa",
+    "MapIndex":          "generador_mapa",
+    "in_bounds":         "generador_mapa",
+    "set_cell":          "generador_mapa",
+    "paint_segment":     "generador_mapa",
+    "fill_rect":         "generador_mapa",
+    "outline_rect":      "generador_mapa",
+    "paint_line":        "generador_mapa",
+    "apply_edits":       "generador_mapa",
+    "random_map":        "generador_mapa",
+    "maze_backtracker":  "generador_mapa",
+    "maze_kruskal":      "generador_mapa",
+    "cave_map":          "generador_mapa",
+    "MAP_GENERATORS":    "generador_mapa",
+    "TERRAIN_COST":      "generador_mapa",
+    "add_terrain":       "generador_mapa",
+    "terrain_map":       "generador_mapa",
+    # Solvers
+    "WALL":              "buscador_tesoros",
+    "EMPTY":             "buscador_tesoros",
+    "TREASURE":          "buscador_tesoros",
+    "PATH_MARK":         "buscador_tesoros",
+    "search_treasure":   "buscador_tesoros",
+    "search_with_steps": "buscador_tesoros",
+    "escribir_error_no_solucion": "buscador_tesoros",
+    "SolverIncremental": "buscador_incremental",
+    "min_cost_path":     "buscador_costos",
+    "search_treasure_cost": "buscador_costos",
+    "is_weighted":       "buscador_costos",
+    "path_cost":         "buscador_costos",
+    "evaluar_inicios":   "evaluacion_paralela",
+    "AbstraccionHPA":    "buscador_jerarquico",
+    "load_or_build_hpa": "buscador_jerarquico",
+    "hpa_path_for":      "buscador_jerarquico",
+    "ConectividadIncremental": "conectividad",
+    "BusquedaReanudable": "buscador_reanudable",
+    "search_resumable":  "buscador_reanudable",
+    "checkpoint_path_for": "buscador_reanudable",
+    "drop_stale_checkpoint": "buscador_reanudable",
+    "prune_checkpoints": "buscador_reanudable",
+    # Trazas *_Solved.txt
+    "SOLVED_SUFFIX":     "trazas",
+    "list_solved_maps":  "trazas",
+    "save_steps_file":   "trazas",
+    "load_steps_file":   "trazas",
+    "load_trace":        "trazas",
+    "encode_steps_rle":  "trazas",
+    "TrazaRLE":          "trazas",
+    # Instrumentación y trabajos en segundo plano
+    "SolverStats":       "instrumentacion",
+    "FrameProfiler":     "instrumentacion",
+    "TrabajoSolver":     "trabajos_solver",
+    "tarea_resolver":    "trabajos_solver",
+    "tarea_pasos":       "trabajos_solver",
+    "tarea_costo":       "trabajos_solver",
+    "tarea_pasos_reanudable": "trabajos_solver",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    mod = _EXPORTS.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(mod), name)
+    globals()[name] = value                 # la próxima vez no pasa por aquí
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,370 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor
+
+from generador_mapa import analyze_map
+from buscador_reanudable import BusquedaReanudable
+
+# ------------------------------------------------------------
+# Servidor local de solves (sin pygame)
+# ------------------------------------------------------------
+#   Protocolo: una petición JSON por línea, por TCP o por socket Unix.
+#
+#   Petición:
+#     {"id": 1, "mapa": "..#.\n.T..", "inicio": [0, 0], "pasos": false}
+#     {"id": 2, "hash": "<sha1 devuelto antes>", "inicio": [3, 1]}
+#
+#   Respuesta (una línea):
+#     {"id": 1, "ok": true, "hash": "...", "found": true, "resultado": "..#.\n.*.."}
+#     {"id": 9, "ok": false, "error": "..."}
+#
+#   Con "pasos": true, antes de la respuesta final llegan eventos
+#     {"id": 1, "evento": "paso", "x": 0, "y": 1}
+#   mientras la búsqueda corre: el worker los manda en tandas de
+#   PASOS_TANDA por una cola (Manager().Queue con procesos) y el servidor
+#   la drena hacia el socket.
+#
+#   Cada mapa nuevo se valida una vez con analyze_map al registrarlo
+#   (rectangular, no vacío); el inicio se valida contra sus dimensiones.
+#   Un mapa o una petición inválida se contesta con ok: false.
+#
+#   Las peticiones concurrentes se juntan en lotes (hasta LOTE_MAX o
+#   VENTANA_MS). Las que no piden pasos se reparten entre los workers (un
+#   grupo por worker); las que piden pasos van cada una por su lado.
+#   Los mapas parseados se cachean por hash de contenido, tanto en el
+#   servidor (texto) como en cada worker (matriz). El texto de un mapa
+#   nuevo viaja con todos los grupos de su primer lote; después, si un
+#   worker no lo tiene, contesta "falta" y se reintenta esa parte con el
+#   texto. Los hashes de un lote quedan fijados en el servidor hasta que
+#   termina: no se desalojan.
+#   La búsqueda es iterativa (BusquedaReanudable): un mapa grande no puede
+#   desbordar la pila de un worker.
+
+HOST, PORT  = "127.0.0.1", 8765
+LOTE_MAX    = 64
+VENTANA_MS  = 2
+CACHE_MAX   = 256
+LINEA_MAX   = 256 * 1024 * 1024        # bytes por línea JSON (mapas grandes)
+PASOS_TANDA = 256                      # pasos por mensaje de la cola de eventos
+
+
+def map_hash(texto):
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def _filas(texto):
+    return [line for line in texto.split("\n") if line]
+
+
+def parse_map_text(texto):
+    return [list(line) for line in _filas(texto)]
+
+
+def _inicio(req):
+    """(x, y) de la petición; ValueError si no son dos enteros."""
+    ini = req.get("inicio")
+    if (not isinstance(ini, (list, tuple)) or len(ini) != 2
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in ini)):
+        raise ValueError('"inicio" tiene que ser [x, y] con enteros')
+    return ini[0], ini[1]
+
+
+# ---------- Lado worker ----------
+_W_CACHE: "OrderedDict[str, list]" = OrderedDict()
+
+
+def _mapa_worker(h, texto):
+    """Matriz cacheada de `h`; None si no está y no vino el texto."""
+    m = _W_CACHE.get(h)
+    if m is None:
+        if texto is None:
+            return None
+        m = parse_map_text(texto)
+        _W_CACHE[h] = m
+        if len(_W_CACHE) > CACHE_MAX:
+            _W_CACHE.popitem(last=False)
+    else:
+        _W_CACHE.move_to_end(h)
+    return m
+
+
+def _run_con_pasos(busqueda, cola):
+    """Corre la búsqueda mandando los pasos a `cola` en tandas de PASOS_TANDA."""
+    tanda = []
+    def paso(p):
+        tanda.append(p)
+        if len(tanda) >= PASOS_TANDA:
+            cola.put(tanda[:])
+            tanda.clear()
+    found = busqueda.run(on_step=paso)
+    if tanda:
+        cola.put(tanda)
+    return found
+
+
+def resolver_lote(textos, lote):
+    """
+    textos: {hash: texto} solo de los mapas que este worker podría no tener
+    lote:   [(h, x, y, cola), ...] → [(found, resultado) | error_str | None]
+    cola:   None, o donde se van mandando los pasos ([(x, y), ...]) mientras se busca.
+    None = el worker no tiene el mapa y no vino el texto (reintentar con él).
+    Se ejecuta en el worker; nunca modifica el mapa cacheado.
+    """
+    salida = []
+    for h, x, y, cola in lote:
+        try:
+            mapa = _mapa_worker(h, textos.get(h))
+            if mapa is None:
+                salida.append(None)
+                continue
+            if not (0 <= x < len(mapa) and 0 <= y < len(mapa[0])):
+                raise ValueError(f"inicio fuera del mapa: ({x},{y})")
+            # mismo recorrido y mismo resultado que search_treasure / search_with_steps
+            busqueda = BusquedaReanudable(mapa, x, y)
+            found = busqueda.run() if cola is None else _run_con_pasos(busqueda, cola)
+            res = busqueda.result()
+            salida.append((bool(found), "\n".join("".join(r) for r in res)))
+        except Exception as e:
+            salida.append(f"{type(e).__name__}: {e}")
+    return salida
+
+
+# ---------- Lado servidor ----------
+class ServidorSolver:
+    def __init__(self, executor=None, lote_max=LOTE_MAX, ventana_ms=VENTANA_MS, nuevo_executor=None,
+                 workers=None, nueva_cola=queue.Queue):
+        """
+        nuevo_executor(): crea un pool nuevo si el actual se rompe (worker muerto).
+        workers:          en cuántos grupos se reparte un lote (por defecto, CPUs).
+        nueva_cola():     cola para los pasos; con procesos tiene que cruzar
+                          procesos (multiprocessing.Manager().Queue).
+        """
+        self.executor   = executor
+        self.nuevo_executor = nuevo_executor
+        self.workers    = workers or os.cpu_count() or 1
+        self.nueva_cola = nueva_cola
+        self.lote_max   = lote_max
+        self.ventana    = ventana_ms / 1000.0
+        self.mapas: "OrderedDict[str, tuple]" = OrderedDict()  # hash -> (texto, rows, cols)
+        self._fijados: dict[str, int] = {}                     # hash -> peticiones en curso
+        self._enviados: set[str] = set()                       # hashes que ya viajaron a algún worker
+        self._cola: asyncio.Queue = None
+        self._tarea = None
+
+    # Cache de mapas por hash
+    def _registrar(self, texto):
+        """Hash del mapa; si es nuevo lo valida (una vez) y lo cachea. ValueError si es inválido."""
+        h = map_hash(texto)
+        if h in self.mapas:
+            self.mapas.move_to_end(h)
+        else:
+            info = analyze_map(_filas(texto))
+            if not info.valid:
+                raise ValueError(f"mapa inválido: {info.error()}")
+            self.mapas[h] = (texto, info.rows, info.cols)
+            self._recortar(h)
+        return h
+
+    def _recortar(self, nuevo=None):
+        """Desaloja los más viejos que no estén fijados hasta volver a CACHE_MAX."""
+        sobran = len(self.mapas) - CACHE_MAX
+        if sobran <= 0:
+            return
+        fuera = [h for h in self.mapas if h != nuevo and h not in self._fijados][:sobran]
+        for h in fuera:
+            del self.mapas[h]
+            self._enviados.discard(h)
+
+    async def start(self):
+        self._cola = asyncio.Queue()
+        self._tarea = asyncio.get_running_loop().create_task(self._despachar())
+
+    async def stop(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+
+    async def solve(self, h, x, y, cola=None):
+        """Encola una petición y espera su resultado (lo usa el handler); los pasos van a `cola`."""
+        # fijar antes del primer await: el hash no se desaloja hasta terminar
+        self._fijados[h] = self._fijados.get(h, 0) + 1
+        try:
+            fut = asyncio.get_running_loop().create_future()
+            await self._cola.put(((h, x, y, cola), fut))
+            return await fut
+        finally:
+            self._fijados[h] -= 1
+            if not self._fijados[h]:
+                del self._fijados[h]
+                self._recortar()
+
+    async def _despachar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._cola.get()
+            lote = [item]
+            limite = loop.time() + self.ventana
+            while len(lote) < self.lote_max:
+                falta = limite - loop.time()
+                if falta <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._cola.get(), falta))
+                except asyncio.TimeoutError:
+                    break
+            loop.create_task(self._correr_lote(lote))
+
+    async def _correr_lote(self, lote):
+        # sin pasos: repartidas en un grupo por worker; con pasos: una llamada por petición
+        sin_pasos = [item for item in lote if item[0][3] is None]
+        n = max(1, min(self.workers, len(sin_pasos)))
+        grupos = [sin_pasos[k::n] for k in range(n)] + [[item] for item in lote if item[0][3] is not None]
+        nuevos = {p[0] for p, _ in lote} - self._enviados      # ningún worker los tiene
+        self._enviados |= nuevos
+        await asyncio.gather(*(self._correr_grupo(g, nuevos) for g in grupos if g))
+
+    async def _correr_grupo(self, grupo, nuevos):
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        pedidos = [p for p, _ in grupo]
+        try:
+            textos = {p[0]: self.mapas[p[0]][0] for p in pedidos if p[0] in nuevos}
+            res = await loop.run_in_executor(executor, resolver_lote, textos, pedidos)
+            faltan = [k for k, r in enumerate(res) if r is None]
+            if faltan:
+                sub = [pedidos[k] for k in faltan]
+                textos = {p[0]: self.mapas[p[0]][0] for p in sub}   # fijados: siguen en el cache
+                for k, r in zip(faltan, await loop.run_in_executor(executor, resolver_lote, textos, sub)):
+                    res[k] = r
+        except Exception as e:
+            if isinstance(e, BrokenExecutor) and self.nuevo_executor is not None:
+                self._reemplazar_executor(executor)
+            res = [f"{type(e).__name__}: {e}"] * len(grupo)
+        for (_, fut), r in zip(grupo, res):
+            if not fut.done():
+                fut.set_result(r)
+
+    def _reemplazar_executor(self, roto):
+        """Un worker murió y el pool `roto` quedó inservible: se arma otro (caches vacíos)."""
+        if self.executor is not roto:
+            return                                  # otro grupo ya lo reemplazó
+        self.executor = self.nuevo_executor()
+        self._enviados.clear()
+        roto.shutdown(wait=False, cancel_futures=True)
+
+    async def _drenar(self, cola, rid, enviar):
+        """Reenvía al cliente las tandas de pasos de `cola` hasta leer None."""
+        loop = asyncio.get_running_loop()
+        while (tanda := await loop.run_in_executor(None, cola.get)) is not None:
+            await enviar(*({"id": rid, "evento": "paso", "x": x, "y": y} for x, y in tanda))
+
+    # Conexión de un cliente
+    async def handle(self, reader, writer):
+        pendientes = set()
+        lock = asyncio.Lock()
+
+        async def enviar(*objs):
+            async with lock:
+                writer.write("".join(json.dumps(o, separators=(",", ":")) + "\n" for o in objs).encode("utf-8"))
+                await writer.drain()
+
+        async def atender(req):
+            rid = req.get("id")
+            try:
+                if "mapa" in req:
+                    if not isinstance(req["mapa"], str):
+                        raise ValueError('"mapa" tiene que ser texto')
+                    h = self._registrar(req["mapa"])
+                else:
+                    h = req.get("hash")
+                    if not isinstance(h, str) or h not in self.mapas:
+                        raise KeyError("hash desconocido: reenviar el mapa")
+                x, y = _inicio(req)
+                _, rows, cols = self.mapas[h]
+                if not (0 <= x < rows and 0 <= y < cols):
+                    raise ValueError(f"inicio fuera del mapa ({rows}x{cols}): ({x},{y})")
+                cola = self.nueva_cola() if req.get("pasos") else None
+                drenaje = asyncio.ensure_future(self._drenar(cola, rid, enviar)) if cola is not None else None
+                try:
+                    r = await self.solve(h, x, y, cola)
+                finally:
+                    if drenaje is not None:
+                        cola.put(None)              # fin de los pasos (también si el worker murió)
+                        await drenaje
+                if isinstance(r, str):
+                    raise RuntimeError(r)
+                found, resultado = r
+                await enviar({"id": rid, "ok": True, "hash": h, "found": found, "resultado": resultado})
+            except Exception as e:
+                await enviar({"id": rid, "ok": False, "error": str(e)})
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                except ValueError:
+                    await enviar({"ok": False, "error": "JSON inválido"})
+                    continue
+                if not isinstance(req, dict):
+                    await enviar({"ok": False, "error": "la petición tiene que ser un objeto JSON"})
+                    continue
+                t = asyncio.ensure_future(atender(req))          # varias peticiones por conexión
+                pendientes.add(t)
+                t.add_done_callback(pendientes.discard)
+            if pendientes:
+                await asyncio.gather(*pendientes)
+        finally:
+            writer.close()
+
+
+async def serve(host=HOST, port=PORT, unix=None, workers=None, hilos=False):
+    import concurrent.futures as cf
+    workers = workers or os.cpu_count() or 1
+    manager = None
+    if hilos:
+        nuevo = lambda: cf.ThreadPoolExecutor(workers)
+        nueva_cola = queue.Queue
+    else:
+        import multiprocessing
+        nuevo = lambda: cf.ProcessPoolExecutor(workers)
+        manager = multiprocessing.Manager()             # sus colas cruzan al proceso worker
+        nueva_cola = manager.Queue
+    srv = ServidorSolver(nuevo(), nuevo_executor=nuevo, workers=workers, nueva_cola=nueva_cola)
+    await srv.start()
+    if unix:
+        server = await asyncio.start_unix_server(srv.handle, path=unix, limit=LINEA_MAX)
+        donde = unix
+    else:
+        server = await asyncio.start_server(srv.handle, host, port, limit=LINEA_MAX)
+        donde = f"{host}:{port}"
+    print(f"Servidor de solves escuchando en {donde}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await srv.stop()
+        srv.executor.shutdown(cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Servidor local de solves (JSON por línea).")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--unix", default=None, help="ruta de socket Unix (en vez de TCP)")
+    ap.add_argument("-j", "--workers", type=int, default=None)
+    ap.add_argument("--hilos", action="store_true", help="usar hilos en vez de procesos")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.hilos))
+    except KeyboardInterrupt:
+        pass
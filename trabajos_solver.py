@@ -0,0 +1,113 @@
+from __future__ import annotations
+import queue
+import threading
+
+from generador_mapa import clone_matrix
+from buscador_tesoros import search_treasure, search_with_steps
+from buscador_costos import search_treasure_cost
+from buscador_reanudable import search_resumable
+from instrumentacion import SolverStats
+
+# ------------------------------------------------------------
+# Solves en segundo plano (para no congelar el loop de pygame)
+# ------------------------------------------------------------
+#   El trabajo corre en un hilo; la UI consulta poll() en cada frame.
+#   La cancelación viaja por el callback de progreso de SolverStats:
+#   cada `progress_every` nodos el hilo revisa la bandera y, si está
+#   puesta, lanza Cancelado desde dentro del solver.
+
+
+class Cancelado(Exception):
+    """El usuario canceló el trabajo."""
+
+
+class TrabajoSolver:
+    """
+    Ejecuta funcion(*args, stats) en un hilo aparte.
+
+    poll() devuelve None mientras corre y, al terminar, una tupla
+    (estado, valor) con estado en "ok" | "cancelado" | "error".
+    `progreso` tiene los nodos visitados hasta ahora.
+    """
+
+    def __init__(self, funcion, *args, progress_every=200):
+        self.progreso  = 0
+        self.terminado = False
+        self._cancel   = threading.Event()
+        self._salida   = queue.Queue(maxsize=1)
+        self.stats     = SolverStats(on_progress=self._on_progress, progress_every=progress_every)
+        self._hilo     = threading.Thread(target=self._run, args=(funcion, args), daemon=True)
+        self._hilo.start()
+
+    def _on_progress(self, stats):
+        self.progreso = stats.nodes
+        if self._cancel.is_set():
+            raise Cancelado()
+
+    def _run(self, funcion, args):
+        try:
+            valor = funcion(*args, self.stats)
+            self._salida.put(("ok", valor))
+        except Cancelado:
+            self._salida.put(("cancelado", None))
+        except Exception as e:                 # se informa a la UI, no se pierde en el hilo
+            self._salida.put(("error", e))
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def corriendo(self):
+        return not self.terminado
+
+    def poll(self):
+        if self.terminado:
+            return None
+        try:
+            res = self._salida.get_nowait()
+        except queue.Empty:
+            self.progreso = self.stats.nodes
+            return None
+        self.terminado = True
+        self.progreso = self.stats.nodes
+        return res
+
+    def wait(self, timeout=None):
+        """Bloquea hasta terminar (útil en scripts); devuelve lo mismo que poll()."""
+        self._hilo.join(timeout)
+        return self.poll()
+
+
+# ---------- Trabajos típicos ----------
+
+def tarea_resolver(mapa, sx, sy, stats):
+    """Solve rápido: (found, result_map)."""
+    return search_treasure(mapa, sx, sy, stats)
+
+
+def tarea_costo(mapa, sx, sy, stats):
+    """Camino de costo mínimo (terreno ponderado): (found, result_map, costo)."""
+    return search_treasure_cost(mapa, sx, sy, stats=stats)
+
+
+def tarea_pasos(mapa, sx, sy, stats):
+    """Pasos para animar + solve final: (pasos, found, final_map)."""
+    # search_with_steps escribe '*' en el mapa que recibe: trabajar sobre una copia
+    pasos = []
+    for step in search_with_steps(clone_matrix(mapa), sx, sy, stats):
+        if step is True:
+            break
+        x, y, _ = step
+        pasos.append((x, y))
+    # sin stats: el overlay reporta solo la búsqueda por pasos (no el doble)
+    found, final_map = search_treasure(mapa, sx, sy)
+    return pasos, found, final_map
+
+
+def tarea_pasos_reanudable(mapa, sx, sy, checkpoint, stats):
+    """
+    Igual que tarea_pasos pero con checkpoints: si se cancela (o se cae)
+    el próximo intento sigue desde `checkpoint`. Mismo resultado.
+    """
+    found, final_map, pasos = search_resumable(mapa, sx, sy, checkpoint, stats)
+    return pasos, found, final_map
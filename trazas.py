@@ -0,0 +1,165 @@
+from __future__ import annotations
+import os
+
+# ------------------------------------------------------------
+# Formato de trazas *_Solved.txt (sin pygame)
+# ------------------------------------------------------------
+#   #STEPS
+#   x,y          ← una celda visitada por línea, en orden
+#   ...
+#   #MAP
+#   ..*#..       ← mapa final con el camino marcado
+#
+# Formato compacto (por defecto al guardar):
+#   #STEPS_RLE
+#   @x,y R3 D U2 ...   ← cada línea: celda absoluta + movimientos RLE
+#   @x,y L4 ...        ← nueva línea cuando el paso no es vecino (salto)
+#   #MAP
+#   ...
+#   U/D = fila -1/+1, L/R = columna -1/+1; sin número = 1 paso.
+
+SOLVED_SUFFIX = "_Solved.txt"
+
+# letra -> (dx, dy), con x = fila e y = columna como en todo el proyecto
+_MOVES = {"U": (-1, 0), "D": (1, 0), "L": (0, -1), "R": (0, 1)}
+_DIR_OF = {v: k for k, v in _MOVES.items()}
+
+
+def solved_name(base_name):
+    """'MAP01.txt' → 'MAP01_Solved.txt'"""
+    return os.path.splitext(base_name)[0] + SOLVED_SUFFIX
+
+def list_solved_maps(folder):
+    "para ver la lista de mapas resueltos"
+    if not os.path.isdir(folder):
+        return []
+    return [f for f in os.listdir(folder) if f.endswith(SOLVED_SUFFIX)]
+
+# ---------- RLE ----------
+def encode_steps_rle(steps):
+    """[(x,y), ...] → líneas '@x,y R3 D U2' (ver formato arriba)."""
+    lines = []
+    tokens = None
+    last = None                  # última celda escrita
+    run_dir, run_n = None, 0
+
+    def flush_run():
+        if run_n:
+            tokens.append(run_dir if run_n == 1 else f"{run_dir}{run_n}")
+
+    for x, y in steps:
+        d = None
+        if last is not None:
+            d = _DIR_OF.get((x - last[0], y - last[1]))
+        if d is None:                                   # primer paso o salto
+            if tokens is not None:
+                flush_run()
+                lines.append(" ".join(tokens))
+            tokens = [f"@{x},{y}"]
+            run_dir, run_n = None, 0
+        elif d == run_dir:
+            run_n += 1
+        else:
+            flush_run()
+            run_dir, run_n = d, 1
+        last = (x, y)
+    if tokens is not None:
+        flush_run()
+        lines.append(" ".join(tokens))
+    return lines
+
+
+class TrazaRLE:
+    """
+    Pasos codificados en RLE que se expanden recién al iterar.
+    len() es barato (se cuenta al parsear); iter() va generando (x, y).
+    """
+
+    def __init__(self, lines=()):
+        self._segs = []              # [(x, y, [(dx, dy, n), ...]), ...]
+        self._len = 0
+        for line in lines:
+            self.add_line(line)
+
+    def add_line(self, line):
+        tokens = line.split()
+        if not tokens:
+            return
+        if not tokens[0].startswith("@"):
+            raise ValueError(f"segmento RLE sin celda inicial: {line!r}")
+        x_str, y_str = tokens[0][1:].split(",")
+        runs = []
+        total = 1
+        for tok in tokens[1:]:
+            dx, dy = _MOVES[tok[0]]
+            n = int(tok[1:]) if len(tok) > 1 else 1
+            runs.append((dx, dy, n))
+            total += n
+        self._segs.append((int(x_str), int(y_str), runs))
+        self._len += total
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for x, y, runs in self._segs:
+            yield (x, y)
+            for dx, dy, n in runs:
+                for _ in range(n):
+                    x += dx; y += dy
+                    yield (x, y)
+
+
+# ---------- Archivos ----------
+def save_steps_file(base_name, steps, final_map, folder, compact=True):
+    """Guarda la traza; compact=True usa #STEPS_RLE (mucho más chico)."""
+    path = os.path.join(folder, solved_name(base_name))
+    os.makedirs(folder, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        if compact:
+            f.write("#STEPS_RLE\n")
+            for line in encode_steps_rle(steps):
+                f.write(line + "\n")
+        else:
+            f.write("#STEPS\n")
+            for (x, y) in steps:
+                f.write(f"{x},{y}\n")
+        f.write("#MAP\n")
+        for row in final_map:
+            f.write("".join(row) + "\n")
+    return path
+
+def load_trace(path):
+    """
+    Lee un *_Solved.txt en cualquiera de los dos formatos.
+    Devuelve (pasos, final_map); con #STEPS_RLE `pasos` es una TrazaRLE
+    que se expande de a poco al iterar (ideal para reproducir).
+    """
+    steps = []
+    final_map = []
+    with open(path, "r", encoding="utf-8") as f:
+        mode = None
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line == "#STEPS":
+                mode = "steps"; continue
+            if line == "#STEPS_RLE":
+                mode = "rle"; steps = TrazaRLE(); continue
+            if line == "#MAP":
+                mode = "map"; continue
+            if mode == "steps":
+                x_str, y_str = line.split(",")
+                steps.append((int(x_str), int(y_str)))
+            elif mode == "rle":
+                steps.add_line(line)
+            elif mode == "map":
+                final_map.append(list(line))
+    return steps, final_map
+
+def load_steps_file(path):
+    """Como load_trace pero siempre con la lista de pasos expandida."""
+    steps, final_map = load_trace(path)
+    return list(steps), final_map
@@ -1,16 +1,19 @@
 import sys
 import os
 import pygame
+import math
 import random
-import time
-
-# ---------- IMPORTAR LÓGICA ----------
-from generador_mapa import (
-    new_matrix, clone_matrix, load_map, save_map, list_maps,
-    set_cell, paint_segment, random_map,
-)
-from buscador_tesoros import (
-    search_treasure, search_with_steps, escribir_error_no_solucion
+from collections import OrderedDict
+
+# ---------- IMPORTAR LÓGICA (núcleo sin pygame) ----------
+from nucleo import (
+    new_matrix, clone_matrix, load_map_info, analyze_map, save_map, MapIndex,
+    set_cell, paint_segment, MAP_GENERATORS,
+    escribir_error_no_solucion,
+    SOLVED_SUFFIX, save_steps_file, load_trace,
+    FrameProfiler, ConectividadIncremental,
+    TrabajoSolver, tarea_resolver, tarea_pasos_reanudable, tarea_costo,
+    checkpoint_path_for, drop_stale_checkpoint, prune_checkpoints,
 )
 
 # ============================================================
@@ -24,6 +27,13 @@ STEP_DELAY   = 500
 
 FPS = 60
 
+PROFILE = os.environ.get("TREASURE_PROFILE", "") == "1"                                # overlay de rendimiento (F3 lo alterna)
+RECORD  = os.environ.get("TREASURE_RECORD", "")                                         # grabar la sesión en este archivo (grabacion_ui.py)
+
+IDLE_WAIT_MS = 1000                                                                     # sin animación: espera eventos hasta esto
+JOB_POLL_MS  = 50                                                                       # con un solve en curso: spinner/progreso
+BG_FPS       = 4                                                                        # ventana sin foco o minimizada
+
 # ============================================================
 # ---------- RUTAS CONST DE ARCHIVOS ----------
 # ============================================================
@@ -38,13 +48,9 @@ IMG_INTRO  = os.path.join(ASSETS_DIR, "images", "Logo_intro.png")   # img intro
 IMG_MENU   = os.path.join(ASSETS_DIR, "images", "Portada_menu.png") # img intro
 SND_INTRO  = os.path.join(ASSETS_DIR, "audio",  "8bits_Davy_Jones.wav")        # sng intro
 
-# crea la carpeta "MAPS" y evitga error 
+# Carpeta "MAPS" y subcarpeta "MAPS_Animate" (se crean en run_ui, no al importar)
 MAPS_DIR   = os.path.join(BASE_DIR, "MAPS")     
-os.makedirs(MAPS_DIR, exist_ok=True)
-
-# Crea la subcarpeta "MAPS_Animate" y evota error
 ANIM_DIR   = os.path.join(MAPS_DIR, "MAPS_Animate")
-os.makedirs(ANIM_DIR, exist_ok=True)
 
 
 # ============================================================
@@ -71,6 +77,26 @@ PALETTE = {
 #  ---------- WIDGETS BÁSICOS ----------
 # ============================================================
 
+# ---------- Cache de textos renderizados ----------
+#   font.render es de lo más caro del frame (listas largas de mapas).
+#   Las Surfaces se guardan por (texto, fuente, color) con desalojo LRU.
+TEXT_CACHE_MAX = 512
+_text_cache = OrderedDict()
+
+def render_text(font, text, color):
+    """Como font.render(text, True, color) pero cacheado (no modificar la Surface)."""
+    key = (text, font, tuple(color))
+    surf = _text_cache.get(key)
+    if surf is None:
+        surf = font.render(text, True, color)
+        _text_cache[key] = surf
+        if len(_text_cache) > TEXT_CACHE_MAX:
+            _text_cache.popitem(last=False)
+    else:
+        _text_cache.move_to_end(key)
+    return surf
+
+
 class Button:
     def __init__(self, rect, text, font, callback):
         self.rect = pygame.Rect(rect)
@@ -78,13 +104,16 @@ class Button:
         self.font = font
         self.callback = callback
         self.hover = False
+        self._txt_for  = None      # texto de la Surface cacheada
+        self._txt_surf = None
 
     def draw(self, screen):
         col = PALETTE["accent"] if self.hover else PALETTE["panel"]
         pygame.draw.rect(screen, col, self.rect, border_radius=6)
         pygame.draw.rect(screen, PALETTE["negro"], self.rect, 2, border_radius=6)
-        txt = self.font.render(self.text, True, PALETTE["text"])
-        screen.blit(txt, txt.get_rect(center=self.rect.center))
+        if self.text != self._txt_for:
+            self._txt_for, self._txt_surf = self.text, render_text(self.font, self.text, PALETTE["text"])
+        screen.blit(self._txt_surf, self._txt_surf.get_rect(center=self.rect.center))
 
     def handle_event(self, e):
         if e.type == pygame.MOUSEMOTION:
@@ -102,7 +131,7 @@ class InputBox:
         self.active = False
         self.color_inactive = PALETTE["gris_claro"]
         self.color_active   = PALETTE["accent"]
-        self.txt_surface    = font.render(text, True, PALETTE["text"])
+        self.txt_surface    = render_text(font, text, PALETTE["text"])
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -114,7 +143,7 @@ class InputBox:
                 self.text = self.text[:-1]
             else:
                 self.text += event.unicode
-            self.txt_surface = self.font.render(self.text, True, PALETTE["text"])
+            self.txt_surface = render_text(self.font, self.text, PALETTE["text"])
 
     def draw(self, screen):
         pygame.draw.rect(screen, self.color_active if self.active else self.color_inactive,
@@ -133,6 +162,8 @@ class OptionBox:
         self.options = options
         self.index = index
         self.hover = False
+        self._txt_for  = None      # opción de la Surface cacheada
+        self._txt_surf = None
 
     def current(self):
         return self.options[self.index]
@@ -141,8 +172,10 @@ class OptionBox:
         col = PALETTE["accent"] if self.hover else PALETTE["panel"]
         pygame.draw.rect(screen, col, self.rect, border_radius=4)
         pygame.draw.rect(screen, (0, 0, 0), self.rect, 2, border_radius=4)
-        txt = self.font.render(self.current(), True, PALETTE["text"])
-        screen.blit(txt, txt.get_rect(center=self.rect.center))
+        if self.current() != self._txt_for:
+            self._txt_for = self.current()
+            self._txt_surf = render_text(self.font, self._txt_for, PALETTE["text"])
+        screen.blit(self._txt_surf, self._txt_surf.get_rect(center=self.rect.center))
 
     def handle_event(self, e):
         if e.type == pygame.MOUSEMOTION:
@@ -151,31 +184,295 @@ class OptionBox:
             self.index = (self.index + 1) % len(self.options)
 
 
+class ListView:
+    """
+    Lista virtualizada de nombres (mapas): solo dibuja las filas visibles.
+      - rueda del mouse / flechas / RePág-AvPág para desplazarse
+      - click selecciona, doble click o Enter → handle_event devuelve "activar"
+      - con la lista activa (click adentro), escribir filtra por subcadena
+        (type-ahead); Backspace borra, Supr limpia el filtro
+    La selección se guarda por nombre, así sobrevive a refrescos y filtros.
+    """
+    ROW_H     = 24
+    DOUBLE_MS = 350
+
+    def __init__(self, rect, font, items=()):
+        self.rect     = pygame.Rect(rect)
+        self.font     = font
+        self.items    = list(items)
+        self.filtro   = ""
+        self.view     = self.items      # items que pasan el filtro
+        self.top      = 0               # primera fila visible (índice en view)
+        self.selected = None            # nombre seleccionado
+        self.active   = False
+        self.hover    = False
+        self._last_click = 0
+
+    @property
+    def visible_rows(self):
+        return max(1, (self.rect.h - 4) // self.ROW_H)
+
+    def set_items(self, items):
+        self.items = list(items)
+        self._apply_filter()
+
+    def _apply_filter(self):
+        f = self.filtro.lower()
+        self.view = [it for it in self.items if f in it.lower()] if f else self.items
+        self._clamp()
+
+    def _clamp(self):
+        self.top = max(0, min(self.top, len(self.view) - self.visible_rows))
+
+    def _ensure_visible(self, i):
+        if i < self.top:
+            self.top = i
+        elif i >= self.top + self.visible_rows:
+            self.top = i - self.visible_rows + 1
+        self._clamp()
+
+    def _move(self, delta):
+        if not self.view:
+            return
+        try:
+            i = self.view.index(self.selected) + delta
+        except ValueError:
+            i = 0
+        i = max(0, min(i, len(self.view) - 1))
+        self.selected = self.view[i]
+        self._ensure_visible(i)
+
+    def handle_event(self, e):
+        if e.type == pygame.MOUSEMOTION:
+            self.hover = self.rect.collidepoint(e.pos)
+        elif e.type == pygame.MOUSEWHEEL and self.hover:
+            self.top -= e.y * 3
+            self._clamp()
+        elif e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
+            self.active = self.rect.collidepoint(e.pos)
+            if not self.active:
+                return None
+            idx = self.top + (e.pos[1] - self.rect.y) // self.ROW_H
+            if 0 <= idx < len(self.view):
+                now = event_ticks()
+                doble = self.view[idx] == self.selected and (now - self._last_click) <= self.DOUBLE_MS
+                self.selected = self.view[idx]
+                self._last_click = now
+                if doble:
+                    return "activar"
+        elif e.type == pygame.KEYDOWN and self.active:
+            if e.key == pygame.K_RETURN:
+                return "activar" if self.selected in self.view else None
+            if   e.key == pygame.K_UP:        self._move(-1)
+            elif e.key == pygame.K_DOWN:      self._move(1)
+            elif e.key == pygame.K_PAGEUP:    self._move(-self.visible_rows)
+            elif e.key == pygame.K_PAGEDOWN:  self._move(self.visible_rows)
+            elif e.key == pygame.K_BACKSPACE:
+                self.filtro = self.filtro[:-1]; self._apply_filter()
+            elif e.key == pygame.K_DELETE:
+                self.filtro = ""; self._apply_filter()
+            elif e.unicode and e.unicode.isprintable():
+                self.filtro += e.unicode; self._apply_filter()
+        return None
+
+    def draw(self, screen):
+        pygame.draw.rect(screen, PALETTE["accent"] if self.active else (100, 100, 100), self.rect, 2)
+        x, y = self.rect.x + 6, self.rect.y + 4
+        fin = min(len(self.view), self.top + self.visible_rows)
+        for i in range(self.top, fin):
+            name = self.view[i]
+            col = PALETTE["accent"] if name == self.selected else PALETTE["text"]
+            screen.blit(render_text(self.font, name, col), (x, y + (i - self.top) * self.ROW_H))
+        # barra de scroll (solo si no entra todo)
+        n = len(self.view)
+        if n > self.visible_rows:
+            h = max(12, self.rect.h * self.visible_rows // n)
+            off = (self.rect.h - h) * self.top // (n - self.visible_rows)
+            pygame.draw.rect(screen, PALETTE["gris_claro"], (self.rect.right - 6, self.rect.y + off, 4, h))
+        # filtro activo, a la derecha sobre la lista
+        if self.filtro:
+            txt = render_text(self.font, f"filtro: {self.filtro}  ({n})", PALETTE["accent"])
+            screen.blit(txt, (self.rect.right - txt.get_width(), self.rect.y - txt.get_height() - 2))
+
+
+# Semillas del botón Random: normalmente cada mapa sale del RNG global;
+# al grabar o reproducir una sesión salen de un Random sembrado con la
+# semilla de la cabecera, así la reproducción genera los mismos mapas.
+_gen_rng = None
+
+def seed_generadores(seed):
+    """Siembra (o con None, suelta) la fuente de semillas del botón Random."""
+    global _gen_rng
+    _gen_rng = None if seed is None else random.Random(seed)
+
+
+class LoopPacer:
+    """
+    Ritmo de los loops de pantalla: en vez de girar a FPS, bloquea en
+    pygame.event.wait hasta que llegue un evento o venza `timeout_ms`
+    (próximo paso de animación, poll del solve...). Nunca supera FPS y,
+    con la ventana sin foco o minimizada, baja a BG_FPS.
+
+    Punto de enganche de grabacion_ui (compartido por todas las pantallas):
+      fuente    → si no es None, los eventos salen de fuente.siguiente(ocupado)
+                  en vez de pygame, y no se limita a FPS (reproducción)
+      grabador  → si no es None, recibe cada frame con grabador.frame(eventos, ocupado)
+    `ocupado` = la pantalla pidió un timeout menor a IDLE_WAIT_MS (anima o
+    espera un solve en segundo plano).
+    """
+    fuente   = None
+    grabador = None
+
+    def __init__(self, fps=FPS):
+        self.clock     = pygame.time.Clock()
+        self.fps       = fps
+        self.focus     = True
+        self.minimized = False
+
+    @property
+    def foreground(self):
+        return self.focus and not self.minimized
+
+    def wait(self, timeout_ms=IDLE_WAIT_MS):
+        """Devuelve la lista de eventos pendientes (puede ser vacía si venció el timeout)."""
+        ocupado = timeout_ms < IDLE_WAIT_MS
+        if LoopPacer.fuente is not None:
+            eventos = LoopPacer.fuente.siguiente(ocupado)
+        else:
+            fps = self.fps if self.foreground else BG_FPS
+            timeout_ms = max(int(timeout_ms), 1000 // fps, 1)     # wait(0) sería esperar para siempre
+            e = pygame.event.wait(timeout_ms)
+            eventos = [] if e.type == pygame.NOEVENT else [e]
+            eventos += pygame.event.get()
+        for e in eventos:
+            if   e.type == pygame.WINDOWFOCUSLOST:   self.focus = False
+            elif e.type == pygame.WINDOWFOCUSGAINED: self.focus = True
+            elif e.type == pygame.WINDOWMINIMIZED:   self.minimized = True
+            elif e.type == pygame.WINDOWRESTORED:    self.minimized = False
+        if LoopPacer.grabador is not None:
+            LoopPacer.grabador.frame(eventos, ocupado)
+        if LoopPacer.fuente is None:
+            self.clock.tick(fps)
+        return eventos
+
+    def get_fps(self):
+        return self.clock.get_fps()
+
+
+def event_ticks():
+    """ms "de los eventos": reloj real o, al reproducir, el de la grabación (doble click)."""
+    if LoopPacer.fuente is not None:
+        return LoopPacer.fuente.ticks
+    return pygame.time.get_ticks()
+
+
+def hover_state(widgets):
+    """Estado hover de los widgets: si cambia con MOUSEMOTION hay que redibujar."""
+    return tuple(w.hover for w in widgets)
+
+
 # ============================================================
 #  ----------DIBUJOS Y UTILIDADES DE UI----------
 # ============================================================
 
+CELL_COLORS = {
+    '.':        PALETTE["empty"],
+    '#':        PALETTE["wall"],
+    'T':        PALETTE["treasure"],
+    '*':        (0, 180, 255),             # camino
+    START_CHAR: PALETTE["START_COLOR"],    # inicio / tesoro final
+    ':':        (222, 196, 132),           # arena   (costo 2)
+    '~':        (38, 78, 150),             # agua    (costo 4)
+    '%':        (96, 118, 64),             # pantano (costo 8)
+}
+CELL_OTHER = (200, 200, 200)
+
+def _paint_cell(surface, ch, x, y, cell):
+    """Pinta una celda (relleno + borde de grilla) con esquina en (x, y) px."""
+    pygame.draw.rect(surface, CELL_COLORS.get(ch, CELL_OTHER), (x, y, cell, cell))
+    pygame.draw.rect(surface, PALETTE["grid"], (x, y, cell, cell), 1)
+
 def draw_map_preview(screen, mapa, top_left, cell=20):
-    """Dibuja el mapa prewiew"""
+    """Dibuja el mapa prewiew (celda por celda, sin cache)"""
     x0, y0 = top_left
     rows, cols = len(mapa), len(mapa[0])
     for i in range(rows):
         for j in range(cols):
-            ch = mapa[i][j]
-            if ch == '.':
-                color = PALETTE["empty"]
-            elif ch == '#':
-                color = PALETTE["wall"]
-            elif ch == 'T':
-                color = PALETTE["treasure"]
-            elif ch == '*':
-                color = (0, 180, 255)      # camino
-            elif ch == START_CHAR:
-                color = PALETTE["START_COLOR"]        # inicio / tesoro final
-            else:
-                color = (200, 200, 200)
-            pygame.draw.rect(screen, color, (x0 + j*cell, y0 + i*cell, cell, cell))
-            pygame.draw.rect(screen, PALETTE["grid"],  (x0 + j*cell, y0 + i*cell, cell, cell), 1)
+            _paint_cell(screen, mapa[i][j], x0 + j*cell, y0 + i*cell, cell)
+
+
+class PreviewCache:
+    """
+    Cache del preview en tiles de TILE x TILE celdas (una Surface por tile).
+      - Cada frame solo se re-blitean los tiles visibles → costo constante
+        aunque el mapa sea enorme.
+      - Un tile se pinta la primera vez que se ve; después solo se repinta
+        la celda editada (invalidate_cell) o el tile entero (invalidate_rect).
+      - Si cambia la matriz (otro objeto), sus dimensiones o el tamaño de
+        celda (zoom), se descartan todos los tiles.
+    Quien edite la matriz EN SITIO debe avisar con invalidate_*.
+    """
+    TILE = 64
+
+    def __init__(self, tile=TILE):
+        self.tile  = tile
+        self.mapa  = None
+        self.dims  = (0, 0)
+        self.cell  = 0
+        self.tiles = {}            # (ti, tj) -> Surface
+
+    def invalidate_all(self):
+        self.tiles.clear()
+
+    def invalidate_cell(self, x, y):
+        """Repinta solo la celda (x, y) en su tile (si el tile ya existe)."""
+        if self.mapa is None or not (0 <= x < self.dims[0] and 0 <= y < self.dims[1]):
+            return
+        surf = self.tiles.get((x // self.tile, y // self.tile))
+        if surf is not None:
+            c = self.cell
+            _paint_cell(surf, self.mapa[x][y], (y % self.tile) * c, (x % self.tile) * c, c)
+
+    def invalidate_rect(self, x1, y1, x2, y2):
+        """Descarta los tiles que tocan el rectángulo de celdas (inclusive)."""
+        T = self.tile
+        for ti in range(min(x1, x2) // T, max(x1, x2) // T + 1):
+            for tj in range(min(y1, y2) // T, max(y1, y2) // T + 1):
+                self.tiles.pop((ti, tj), None)
+
+    def _tile(self, ti, tj):
+        surf = self.tiles.get((ti, tj))
+        if surf is None:
+            T, c, mapa = self.tile, self.cell, self.mapa
+            x0, y0 = ti * T, tj * T
+            x1, y1 = min(x0 + T, self.dims[0]), min(y0 + T, self.dims[1])
+            surf = pygame.Surface(((y1 - y0) * c, (x1 - x0) * c))
+            for i in range(x0, x1):
+                row = mapa[i]
+                for j in range(y0, y1):
+                    _paint_cell(surf, row[j], (j - y0) * c, (i - x0) * c, c)
+            self.tiles[(ti, tj)] = surf
+        return surf
+
+    def draw(self, screen, mapa, top_left, cell=20, clip=None):
+        """Como draw_map_preview, pero reusando tiles; `clip` (Rect) limita lo visible."""
+        dims = (len(mapa), len(mapa[0]) if mapa else 0)
+        if mapa is not self.mapa or dims != self.dims or cell != self.cell:
+            self.mapa, self.dims, self.cell = mapa, dims, cell
+            self.tiles.clear()
+        if not mapa:
+            return
+        clip = screen.get_rect() if clip is None else clip.clip(screen.get_rect())
+        px0, py0 = top_left
+        span = self.tile * cell
+        # Rango de tiles visible (fila ti ↔ eje y de pantalla, col tj ↔ eje x)
+        ti0 = max(0, (clip.top  - py0) // span)
+        tj0 = max(0, (clip.left - px0) // span)
+        ti1 = min((dims[0] - 1) // self.tile, (clip.bottom - 1 - py0) // span)
+        tj1 = min((dims[1] - 1) // self.tile, (clip.right  - 1 - px0) // span)
+        for ti in range(ti0, ti1 + 1):
+            for tj in range(tj0, tj1 + 1):
+                screen.blit(self._tile(ti, tj), (px0 + tj * span, py0 + ti * span))
 
 
 def calc_preview_origin(rows, cols, cell, left, right, top, bottom):
@@ -188,6 +485,35 @@ def calc_preview_origin(rows, cols, cell, left, right, top, bottom):
     y = top  + max((avail_h - map_h) // 2, 0)
     return x, y
 
+def draw_stats_overlay(screen, font, prof, solver_stats=None):
+    """Overlay de rendimiento (FPS, ms por fase y contadores del solver)."""
+    lines = prof.summary_lines()
+    if solver_stats is not None:
+        lines += [
+            f"nodos     {solver_stats.nodes}",
+            f"backtrack {solver_stats.backtracks}",
+            f"memo hits {solver_stats.memo_hits}",
+            f"prof max  {solver_stats.max_depth}",
+            f"solve     {solver_stats.elapsed*1000:6.2f} ms",
+        ]
+    line_h = font.get_linesize()
+    # sin render_text: los números cambian cada frame y solo ensuciarían la cache
+    box = pygame.Surface((190, line_h * len(lines) + 10), pygame.SRCALPHA)
+    box.fill((0, 0, 0, 170))
+    for i, line in enumerate(lines):
+        box.blit(font.render(line, True, PALETTE["accent"]), (6, 5 + i*line_h))
+    screen.blit(box, (WIDTH - box.get_width() - 10, 10))
+
+def draw_spinner(screen, center, radius, ticks):
+    """Spinner simple: 8 puntos, el "activo" gira con el tiempo."""
+    activo = (ticks // 100) % 8
+    for k in range(8):
+        ang = k * math.pi / 4
+        px = center[0] + int(radius * math.cos(ang))
+        py = center[1] + int(radius * math.sin(ang))
+        col = PALETTE["accent"] if k == activo else PALETTE["gris_claro"]
+        pygame.draw.circle(screen, col, (px, py), 2 if k != activo else 3)
+
 def draw_centered(surface, screen):
     rect = surface.get_rect(center=screen.get_rect().center)
     screen.blit(surface, rect)
@@ -218,47 +544,6 @@ def fade_in(surface, screen, duration_ms=2000):
             return True
         clock.tick(FPS)
 
-# ============================================================
-#  ---------- ARCHIVOS *_Solved.txt ----------
-# ============================================================
-
-def list_solved_maps(folder = ANIM_DIR):
-    "para ver la lista de mapas resueltos"
-    return [f for f in os.listdir(folder) if f.endswith("_Solved.txt")]
-
-def save_steps_file(base_name, steps, final_map, folder= ANIM_DIR):
-    name = os.path.splitext(base_name)[0] + "_Solved.txt"
-    path = os.path.join(folder, name)
-    
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("#STEPS\n")
-        for (x, y) in steps:
-            f.write(f"{x},{y}\n")
-        f.write("#MAP\n")
-        for row in final_map:
-            f.write("".join(row) + "\n")
-    return path
-
-def load_steps_file(path):
-    steps = []
-    final_map = []
-    with open(path, "r", encoding="utf-8") as f:
-        mode = None
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            if line == "#STEPS":
-                mode = "steps"; continue
-            if line == "#MAP":
-                mode = "map"; continue
-            if mode == "steps":
-                x_str, y_str = line.split(",")
-                steps.append((int(x_str), int(y_str)))
-            elif mode == "map":
-                final_map.append(list(line))
-    return steps, final_map
-
 # ============================================================
 #  ---------- LAYOUT CONFIG – COORDINATES ----------
 # ============================================================
@@ -339,34 +624,38 @@ def menu_screen(screen):
     except Exception:
         bg = pygame.Surface(screen.get_size()); bg.fill(PALETTE["bg"])
 
-    clock = pygame.time.Clock()
+    pacer = LoopPacer()
+    dirty = True               # el menú es estático: se dibuja una vez y al volver a la ventana
     while True:
-        for e in pygame.event.get():
+        for e in pacer.wait(IDLE_WAIT_MS):
             if e.type == pygame.QUIT: pygame.quit(); sys.exit()
             if e.type == pygame.KEYDOWN:
                 if e.key == pygame.K_1: return 1
                 if e.key == pygame.K_2: return 2
                 if e.key == pygame.K_3: return 3
+            if e.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWFOCUSGAINED):
+                dirty = True
+        if not dirty:
+            continue
 
         screen.fill(PALETTE["bg"])
         draw_centered(bg, screen)
 
-        title_surf = font_title.render("TREASURE MAP", True, PALETTE["dorado"])
+        title_surf = render_text(font_title, "TREASURE MAP", PALETTE["dorado"])
         screen.blit(title_surf, (WIDTH//2 - title_surf.get_width()//2, 40))
 
         x = WIDTH//2.5 - 260
         y = HEIGHT//2 - 20
         for i, txt in enumerate(opts):
-            surf = font_opt.render(txt, True, (255,255,255))
+            surf = render_text(font_opt, txt, (255,255,255))
             screen.blit(surf, (x, y + i*50))
 
         pygame.display.flip()
-        clock.tick(FPS)
+        dirty = False
 
 
 def generator_screen(screen):
     """GUI Map Generator (UI)"""
-    clock      = pygame.time.Clock()
     font_title = pygame.font.SysFont("consolas", 22)
     font_txt   = pygame.font.SysFont("consolas", 18)
 
@@ -391,19 +680,32 @@ def generator_screen(screen):
     # OBJ 
     inp_y    = InputBox((LAYOUT["col"]["inp1"], PY + LAYOUT["row"]["obj"] + 10, 50, 28), font_txt, "")
     inp_x    = InputBox((LAYOUT["col"]["inp2"], PY + LAYOUT["row"]["obj"] + 10, 50, 28), font_txt, "")
-    opt_obj  = OptionBox((LAYOUT["col"]["opt"],  PY + LAYOUT["row"]["obj"] + 10, 50, 28), font_txt, ["#", "T"], 0)
+    opt_obj  = OptionBox((LAYOUT["col"]["opt"],  PY + LAYOUT["row"]["obj"] + 10, 50, 28), font_txt, ["#", "T", ":", "~", "%", START_CHAR], 0)
     
     # rango
     inp_xy1 = InputBox((LAYOUT["col"]["inp1"] + 70, PY + LAYOUT["row"]["range"] + 10, 70, 28), font_txt, "")
     inp_xy2 = InputBox((LAYOUT["col"]["inp1"] + 70, PY + LAYOUT["row"]["range"] + 50, 70, 28), font_txt, "")
     
+    # tipo de generador para el botón Random (etiqueta -> MAP_GENERATORS)
+    GEN_OPCIONES = {"Ruido": "ruido", "DFS": "backtracker", "Kruskal": "kruskal", "Cueva": "cueva",
+                    "Terreno": "terreno"}
+    opt_gen  = OptionBox((LAYOUT["col"]["lbl"] + 180, PY + LAYOUT["row"]["range"] + 50, 90, 28), font_txt,
+                         list(GEN_OPCIONES), 0)
+
     # name
     inp_name = InputBox((LAYOUT["col"]["lbl"] + 100, PY + LAYOUT["row"]["name"] - 5, 160, 28), font_txt, "")
 
     # Lista mapas
-    maps_list = list_maps(MAPS_DIR)
-    selected_map_idx = -1
-    list_rect = pygame.Rect(LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["list"] + 15, PW - 40, 150)
+    maps_index = MapIndex(MAPS_DIR)             # se re-lista solo si cambia el mtime de la carpeta
+    lista_mapas = ListView((LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["list"] + 15, PW - 40, 150),
+                           font_txt, maps_index.files)
+
+    preview = PreviewCache()       # las ediciones en sitio avisan con invalidate_*
+
+    # "¿hay tesoro alcanzable desde el inicio?" en vivo: las ediciones se
+    # avisan con notify_*, reemplazar el mapa entero con reset
+    inicio = (0, 0)                # no se escribe en el mapa (START_CHAR en opt_obj lo mueve)
+    conect = ConectividadIncremental(mapa)
 
     def parse_coord(texto):
         """
@@ -416,8 +718,11 @@ def generator_screen(screen):
         return int(partes[0]), int(partes[1])
     
     def refresh_list():
-        nonlocal maps_list
-        maps_list = list_maps(MAPS_DIR)
+        """True si la lista de mapas cambió (stat de la carpeta, sin listdir si no cambió)."""
+        if maps_index.refresh():
+            lista_mapas.set_items(maps_index.files)
+            return True
+        return False
     # Callbacks
     def apply_size():
         nonlocal rows, cols, mapa
@@ -427,16 +732,24 @@ def generator_screen(screen):
             if MIN_SIZE <= r <= MAX_SIZE and MIN_SIZE <= c <= MAX_SIZE:
                 rows, cols = r, c
                 mapa = new_matrix(rows, cols, '.')
+                conect.reset(mapa)
             else:
                 print(f"Tamaño invalido. Debe ser entre {MIN_SIZE} y {MAX_SIZE}")
         except ValueError:
             pass
 
     def add_single():
+        nonlocal inicio
         try:
             x = int(inp_x.get_value()); y = int(inp_y.get_value())
             ch = opt_obj.current()
+            if ch == START_CHAR:
+                if 0 <= x < rows and 0 <= y < cols:
+                    inicio = (x, y)
+                return
             set_cell(mapa, x, y, ch)
+            preview.invalidate_cell(x, y)
+            conect.notify_cell(x, y)
         except ValueError:
             pass
 
@@ -445,18 +758,23 @@ def generator_screen(screen):
             x1, y1 = parse_coord(inp_xy1.get_value())
             x2, y2 = parse_coord(inp_xy2.get_value())
             paint_segment(mapa, y1, x1, y2, x2, "#")  # OJO: y=fila, x=col
+            preview.invalidate_rect(y1, x1, y2, x2)
+            conect.notify_rect(y1, x1, y2, x2)
         except Exception as e:
             print(f"Error: {e}")
 
     def random_gen():
         nonlocal mapa, rows, cols
-        mapa = random_map(rows, cols, 0.15, True)
+        seed = _gen_rng.randrange(1 << 30) if _gen_rng is not None else None
+        mapa = MAP_GENERATORS[GEN_OPCIONES[opt_gen.current()]](rows, cols, seed=seed)
+        conect.reset(mapa)
 
     def save_current():
         name = inp_name.get_value() or "MAPS"
         path = os.path.join(MAPS_DIR, f"{name}.txt")
         save_map(path, mapa)
-        refresh_list()
+        maps_index.added(os.path.basename(path))
+        lista_mapas.set_items(maps_index.files)
         return path
 
     def ok_and_back():
@@ -468,11 +786,16 @@ def generator_screen(screen):
         return "back"
 
     def load_selected():
-        nonlocal mapa, rows, cols, selected_map_idx
-        if 0 <= selected_map_idx < len(maps_list):
-            path = os.path.join(MAPS_DIR, maps_list[selected_map_idx])
-            mapa = load_map(path)
-            rows, cols = len(mapa), len(mapa[0])
+        nonlocal mapa, rows, cols
+        if lista_mapas.selected is not None:
+            path = os.path.join(MAPS_DIR, lista_mapas.selected)
+            nuevo, info = load_map_info(path)
+            if not info.valid:
+                print(f"Mapa inválido ({lista_mapas.selected}): {info.error()}")
+                return
+            mapa = nuevo
+            rows, cols = info.rows, info.cols
+            conect.reset(mapa)
 
     # Botones
     btns = []
@@ -489,12 +812,16 @@ def generator_screen(screen):
     add_btn(LAYOUT["col"]["lbl"],       PY + LAYOUT["row"]["buttons"],    "Volver menú", go_back)
     add_btn(LAYOUT["col"]["lbl"] + 150, PY + LAYOUT["row"]["buttons"],    "OK/Enter",    ok_and_back)
 
-    last_click = 0
-    DOUBLE_MS  = 350
+    pacer   = LoopPacer()
+    dirty   = True             # redibujar solo cuando algo cambió
+    hovers  = btns + [opt_obj, opt_gen]
+    hov_ant = hover_state(hovers)
 
-    # Loop
+    # Loop (event-driven: nada se anima en esta pantalla)
     while True:
-        for e in pygame.event.get():
+        for e in pacer.wait(IDLE_WAIT_MS):
+            if e.type != pygame.MOUSEMOTION:
+                dirty = True
             if e.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
@@ -506,6 +833,7 @@ def generator_screen(screen):
 
             # Options
             opt_obj.handle_event(e)
+            opt_gen.handle_event(e)
            
             # Botones
             for b in btns:
@@ -513,59 +841,56 @@ def generator_screen(screen):
                 if ret == "back":
                     return
 
-            # Lista
-            if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
-                if list_rect.collidepoint(e.pos):
-                    rel_y = e.pos[1] - list_rect.y
-                    idx = rel_y // 24
-                    if 0 <= idx < len(maps_list):
-                        now = pygame.time.get_ticks()
-                        if idx == selected_map_idx and (now - last_click) <= DOUBLE_MS:
-                            load_selected()
-                        else:
-                            selected_map_idx = idx
-                        last_click = now
+            # Lista (doble click / Enter carga)
+            if lista_mapas.handle_event(e) == "activar":
+                load_selected()
+
+        if refresh_list():             # archivos agregados/borrados desde afuera
+            dirty = True
+        hov = hover_state(hovers)
+        if hov != hov_ant:
+            hov_ant, dirty = hov, True
+        if not dirty:
+            continue
+        dirty = False
 
         # Dibujo panel_izq
         screen.fill(PALETTE["bg"])
         pygame.draw.rect(screen, PALETTE["panel"], (PX, PY, PW, PH), border_radius=12)
         # Título centrado
-        title = font_title.render("MAP GENERATOR", True, PALETTE["text"])
+        title = render_text(font_title, "MAP GENERATOR", PALETTE["text"])
         screen.blit(title, title.get_rect(center=(PX + PW//2, PY + 30)))
 
         # Tamaño
-        screen.blit(font_txt.render("15 <= TAM <= 25:", True, PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["size"] - 10))
-        screen.blit(font_txt.render("X=", True, PALETTE["text"]), (LAYOUT["col"]["lbl"],      PY + LAYOUT["row"]["size"] + 15))
-        screen.blit(font_txt.render("Y=", True, PALETTE["text"]), (LAYOUT["col"]["lbl"] + 90, PY + LAYOUT["row"]["size"] + 15))
+        screen.blit(render_text(font_txt, "15 <= TAM <= 25:", PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["size"] - 10))
+        screen.blit(render_text(font_txt, "X=", PALETTE["text"]), (LAYOUT["col"]["lbl"],      PY + LAYOUT["row"]["size"] + 15))
+        screen.blit(render_text(font_txt, "Y=", PALETTE["text"]), (LAYOUT["col"]["lbl"] + 90, PY + LAYOUT["row"]["size"] + 15))
         inp_rows.draw(screen); inp_cols.draw(screen)
 
         # Obj
-        screen.blit(font_txt.render("Ingresar obj", True, PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["obj"]- 10))
-        screen.blit(font_txt.render("X=", True, PALETTE["text"]), (LAYOUT["col"]["lbl"],      PY + LAYOUT["row"]["obj"] + 15))
-        screen.blit(font_txt.render("Y=", True, PALETTE["text"]), (LAYOUT["col"]["lbl"] + 90, PY + LAYOUT["row"]["obj"] + 15))
+        screen.blit(render_text(font_txt, "Ingresar obj", PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["obj"]- 10))
+        screen.blit(render_text(font_txt, "X=", PALETTE["text"]), (LAYOUT["col"]["lbl"],      PY + LAYOUT["row"]["obj"] + 15))
+        screen.blit(render_text(font_txt, "Y=", PALETTE["text"]), (LAYOUT["col"]["lbl"] + 90, PY + LAYOUT["row"]["obj"] + 15))
         inp_x.draw(screen); inp_y.draw(screen); opt_obj.draw(screen)
+        opt_gen.draw(screen)
 
         # Rango
-        screen.blit(font_txt.render("Obstáculo rango", True, PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["range"]-10))
-        screen.blit(font_txt.render("X= (x,y):", True, PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["range"] + 15))
+        screen.blit(render_text(font_txt, "Obstáculo rango", PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["range"]-10))
+        screen.blit(render_text(font_txt, "X= (x,y):", PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["range"] + 15))
         inp_xy1.draw(screen)
 
-        screen.blit(font_txt.render("Y= (x,y):", True, PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["range"] + 55))
+        screen.blit(render_text(font_txt, "Y= (x,y):", PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["range"] + 55))
         inp_xy2.draw(screen)
 
 
         # Name
-        screen.blit(font_txt.render("Map name:", True, PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["name"]))
+        screen.blit(render_text(font_txt, "Map name:", PALETTE["text"]), (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["name"]))
         inp_name.draw(screen)
 
         # Lista
-        screen.blit(font_txt.render("CARGAR MAPA", True, PALETTE["text"]),
+        screen.blit(render_text(font_txt, "CARGAR MAPA", PALETTE["text"]),
                     (LAYOUT["col"]["lbl"], PY + LAYOUT["row"]["list"] - 25))
-        pygame.draw.rect(screen, (100,100,100), list_rect, 2)
-        for i, fname in enumerate(maps_list):
-            col = PALETTE["accent"] if i == selected_map_idx else PALETTE["text"]
-            txt = font_txt.render(fname, True, col)
-            screen.blit(txt, (list_rect.x + 6, list_rect.y + i*24 + 4))
+        lista_mapas.draw(screen)
 
         # Botones
         for b in btns:
@@ -573,10 +898,23 @@ def generator_screen(screen):
 
         # Preview
         px, py = calc_preview_origin(rows, cols, CELL, prev_left, prev_right, prev_top, prev_bot)
-        draw_map_preview(screen, mapa, (px, py), CELL)
+        preview.draw(screen, mapa, (px, py), CELL)
+
+        # Inicio + estado de alcance (union-find: no se re-resuelve por edición)
+        if not (inicio[0] < rows and inicio[1] < cols):
+            inicio = (0, 0)
+        ix, iy = inicio
+        pygame.draw.rect(screen, PALETTE["START_COLOR"], (px + iy*CELL, py + ix*CELL, CELL, CELL), 3)
+        if mapa[ix][iy] == "#":
+            estado, color = f"Inicio {inicio}: sobre un muro", PALETTE["HILITE_COLOR"]
+        elif conect.alcanzable(ix, iy):
+            estado = f"Inicio {inicio}: tesoro alcanzable ({conect.tesoros_alcanzables(ix, iy)})"
+            color = PALETTE["accent"]
+        else:
+            estado, color = f"Inicio {inicio}: sin tesoro alcanzable", PALETTE["HILITE_COLOR"]
+        screen.blit(render_text(font_txt, estado, color), (prev_left, prev_bot + 8))
 
         pygame.display.flip()
-        clock.tick(FPS)
 
 
 def solver_screen(screen):
@@ -584,20 +922,29 @@ def solver_screen(screen):
 
     #  OBJETOS BÁSICOS DE PYGAME
 
-    clock    = pygame.time.Clock()                 # controla FPS y tiempos
     font_tit = pygame.font.SysFont("consolas", 22) # fuente títulos
     font_txt = pygame.font.SysFont("consolas", 18) # fuente texto normal
+    font_dbg = pygame.font.SysFont("consolas", 14) # fuente overlay de rendimiento
 
+    prof         = FrameProfiler() if PROFILE else None   # None → sin costo
+    solver_stats = None                                    # contadores del último solve
+
+    # ------------------ Solve en segundo plano -------------------------
+    trabajo      = None        # TrabajoSolver en curso (None si no hay)
+    trabajo_tipo = None        # "resolver" | "costo" | "animate"
+    trabajo_base = "MAPS"      # nombre base para el *_Solved.txt
+    trabajo_inicio = (0, 0)    # inicio con el que se lanzó (el usuario puede cambiarlo mientras corre)
+    trabajo_previo = None      # último "animate" cancelado: puede seguir escribiendo su checkpoint
+    error_solver = None        # último error de un trabajo (se muestra en la línea de estado)
 
-    #  ESTADO DE LA PANTALLA “RESOLVER MAPA”
 
-    maps_list   = list_maps(MAPS_DIR)              # .txt crudos en /MAPS
-    solved_list = list_solved_maps(MAPS_DIR)       # *_Solved.txt en /MAPS
+    #  ESTADO DE LA PANTALLA “RESOLVER MAPA”
 
-    selected_map_idx    = -1  # índice del mapa crudo seleccionado
-    selected_solved_idx = -1  # índice del mapa resuelto seleccionado
+    maps_index   = MapIndex(MAPS_DIR)                  # .txt crudos en /MAPS
+    solved_index = MapIndex(ANIM_DIR, SOLVED_SUFFIX)   # *_Solved.txt en /MAPS/MAPS_Animate
 
     mapa_original = None       # copia sin modificar, cargada de disco
+    info_mapa     = None       # MapInfo de mapa_original (dimensiones, tesoros...)
     mapa_mostrado = None       # lo que se dibuja cada frame (puede cambiar)
     rows = cols = 0            # dimensiones del mapa cargado
 
@@ -606,6 +953,8 @@ def solver_screen(screen):
 
     result_map = None          # matriz final con ‘*’ si ya se resolvió
     found = None               # True/False si se halló tesoro, None sin intentar
+    ponderado  = False         # el mapa tiene terreno con costo (arena, agua...)
+    costo_total = None         # costo del camino si se resolvió con costos
 
     # ------------------ Animación EN VIVO (generator paso a paso) -----
     step_gen        = None     # generator devuelto por search_with_steps()
@@ -614,10 +963,13 @@ def solver_screen(screen):
     current_pos     = None     # (x,y) celda actual, para pintar borde rojo
 
     # ------------------ Animación DESDE ARCHIVO -----------------------
-    file_steps      = []       # lista [(x1,y1), (x2,y2), …] cargada de *_Solved.txt
-    file_anim_index = 0        # posición actual dentro de file_steps
+    file_steps      = []       # pasos [(x1,y1), …] de *_Solved.txt (TrazaRLE: se expande al iterar)
+    file_iter       = None     # iterador sobre file_steps (un paso por tick)
+    anim_base       = None     # mapa que se va pintando paso a paso
     animating_file  = False    # bandera: reproduciendo archivo grabado
 
+    preview = PreviewCache()   # tiles del preview (anim_base se edita en sitio → invalidate_cell)
+
 
     #  PARAMETROS DE LAYOUT — coordenadas útiles
 
@@ -633,8 +985,8 @@ def solver_screen(screen):
 
 
     # ----- Widgets -----
-    list_rect_maps   = pygame.Rect(LAYOUT["col"]["lbl"], PY + 80,  PW - 40, 150)
-    list_rect_solved = pygame.Rect(LAYOUT["col"]["lbl"], PY + 390, PW - 40, 150)
+    lista_mapas    = ListView((LAYOUT["col"]["lbl"], PY + 80,  PW - 40, 150), font_txt, maps_index.files)
+    lista_resueltos = ListView((LAYOUT["col"]["lbl"], PY + 390, PW - 40, 150), font_txt, solved_index.files)
 
     inp_start_x = InputBox((LAYOUT["col"]["inp1"], PY + 260, 50, 28), font_txt, "0")
     inp_start_y = InputBox((LAYOUT["col"]["inp2"], PY + 260, 50, 28), font_txt, "0")
@@ -644,19 +996,35 @@ def solver_screen(screen):
         buttons.append(Button((x, y, w, 32), txt, font_txt, cb))
 
     def refresh_lists():
-        nonlocal maps_list, solved_list
-        maps_list   = list_maps(MAPS_DIR)
-        solved_list = list_solved_maps(ANIM_DIR)
+        """True si alguna lista cambió (solo stat de las carpetas si no cambiaron)."""
+        cambio = False
+        if maps_index.refresh():
+            lista_mapas.set_items(maps_index.files); cambio = True
+        if solved_index.refresh():
+            lista_resueltos.set_items(solved_index.files); cambio = True
+        return cambio
 
     def load_selected_map():
-        nonlocal mapa_original, mapa_mostrado, rows, cols, result_map, found
+        nonlocal mapa_original, info_mapa, mapa_mostrado, rows, cols, result_map, found
+        nonlocal ponderado, costo_total, error_solver
         nonlocal step_gen, animating_live, current_pos, start_fijado, animating_file
-        if 0 <= selected_map_idx < len(maps_list):
-            path = os.path.join(MAPS_DIR, maps_list[selected_map_idx])
-            mapa_original = load_map(path)
-            rows, cols = len(mapa_original), len(mapa_original[0])
+        if lista_mapas.selected is not None:
+            path = os.path.join(MAPS_DIR, lista_mapas.selected)
+            nuevo, info = load_map_info(path)
+            if not info.valid:
+                print(f"Mapa inválido ({lista_mapas.selected}): {info.error()}")
+                return
+            cancelar_trabajo()
+            esperar_checkpoint()
+            # los checkpoints de otros mapas se conservan (se reanudan al volver);
+            # el de este se descarta solo si el mapa cambió desde que se guardó
+            prune_checkpoints(ANIM_DIR)
+            drop_stale_checkpoint(checkpoint_path_for(lista_mapas.selected, ANIM_DIR), nuevo)
+            mapa_original, info_mapa = nuevo, info
+            ponderado = info.weighted
+            rows, cols = info.rows, info.cols
             mapa_mostrado = clone_matrix(mapa_original)
-            result_map = None; found = None
+            result_map = None; found = None; costo_total = None; error_solver = None
             step_gen = None; animating_live = False; animating_file = False
             current_pos = None
             start_fijado = False
@@ -677,66 +1045,127 @@ def solver_screen(screen):
         start_fijado = True
 
     def resolver_rapido():
+        """Lanza el solve en segundo plano; el resultado llega en aplicar_trabajo()."""
+        nonlocal trabajo, trabajo_tipo, trabajo_inicio, error_solver, solver_stats
         nonlocal result_map, found, mapa_mostrado
-        nonlocal step_gen, animating_live, current_pos, animating_file
+        nonlocal animating_file, current_pos
         if mapa_original is None: return
         if not start_fijado: fijar_inicio()
-        sx, sy = start_x, start_y
-        found, result_map = search_treasure(mapa_original, sx, sy)
-        result_map[sx][sy] = START_CHAR
-        mapa_mostrado = result_map
-        # apagar animaciones
-        step_gen = None; animating_live = False; animating_file = False
-        current_pos = None
+        cancelar_trabajo()
+        if info_mapa.treasures == 0:
+            # sin tesoros no hace falta buscar (ya lo sabemos por el análisis)
+            found, result_map = False, clone_matrix(mapa_original)
+            result_map[start_x][start_y] = START_CHAR
+            mapa_mostrado = result_map
+            animating_file = False; current_pos = None
+            return
+        if ponderado:
+            # con terreno el backtracking no sirve: camino de costo mínimo
+            trabajo = TrabajoSolver(tarea_costo, mapa_original, start_x, start_y)
+            trabajo_tipo = "costo"
+        else:
+            trabajo = TrabajoSolver(tarea_resolver, mapa_original, start_x, start_y)
+            trabajo_tipo = "resolver"
+        trabajo_inicio, error_solver = (start_x, start_y), None
+        solver_stats = trabajo.stats
 
     def generar_animate_file():
-        """Ejecuta solver con pasos y guarda *_Solved.txt"""
-        nonlocal result_map, found
+        """Ejecuta solver con pasos (en segundo plano) y guarda *_Solved.txt"""
+        nonlocal trabajo, trabajo_tipo, trabajo_base, trabajo_inicio, error_solver, solver_stats
         if mapa_original is None: return
         if not start_fijado: fijar_inicio()
-        sx, sy = start_x, start_y
-
-        pasos = []
-        for step in search_with_steps(mapa_original, sx, sy):
-            if step is True:
-                break
-            x, y, partial = step
-            pasos.append((x, y))
-
-        ok, final_map = search_treasure(mapa_original, sx, sy)
-        final_map[sx][sy] = START_CHAR
-        found = ok
-        result_map = final_map
-
-        base = maps_list[selected_map_idx] if 0 <= selected_map_idx < len(maps_list) else "MAPS"
-        save_steps_file(base, pasos, final_map, folder=ANIM_DIR)
-        refresh_lists()
+        cancelar_trabajo()
+        esperar_checkpoint()           # el cancelado y el nuevo usarían el mismo .ckpt
+        trabajo_base = lista_mapas.selected or "MAPS"
+        # con checkpoint en MAPS_Animate: cancelar no pierde lo explorado
+        ckpt = checkpoint_path_for(trabajo_base, ANIM_DIR)
+        trabajo = TrabajoSolver(tarea_pasos_reanudable, mapa_original, start_x, start_y, ckpt)
+        solver_stats = trabajo.stats
+        trabajo_tipo = "animate"
+        trabajo_inicio, error_solver = (start_x, start_y), None
+
+    def cancelar_trabajo():
+        nonlocal trabajo, trabajo_previo
+        if trabajo is not None:
+            trabajo.cancel()
+            if trabajo_tipo == "animate":
+                trabajo_previo = trabajo
+            trabajo = None
+
+    def esperar_checkpoint():
+        """Espera a que el "animate" cancelado termine de escribir su último checkpoint."""
+        nonlocal trabajo_previo
+        if trabajo_previo is not None:
+            trabajo_previo.wait()
+            trabajo_previo = None
+
+    def aplicar_trabajo(estado, valor, inicio):
+        """Publica en la UI el resultado de un trabajo terminado (lanzado desde `inicio`)."""
+        nonlocal result_map, found, mapa_mostrado, costo_total, error_solver
+        nonlocal step_gen, animating_live, current_pos, animating_file
+        if estado == "error":
+            error_solver = f"Error en el solver: {valor}"
+            return
+        if estado != "ok":
+            return
+        sx, sy = inicio
+        if trabajo_tipo in ("resolver", "costo"):
+            if trabajo_tipo == "costo":
+                found, result_map, costo_total = valor
+            else:
+                found, result_map = valor
+                costo_total = None
+            result_map[sx][sy] = START_CHAR
+            mapa_mostrado = result_map
+            # apagar animaciones
+            step_gen = None; animating_live = False; animating_file = False
+            current_pos = None
+        else:
+            pasos, ok, final_map = valor
+            final_map[sx][sy] = START_CHAR
+            found = ok
+            result_map = final_map
+            path = save_steps_file(trabajo_base, pasos, final_map, folder=ANIM_DIR)
+            solved_index.added(os.path.basename(path))
+            lista_resueltos.set_items(solved_index.files)
 
     def animar_desde_archivo():
-        nonlocal file_steps, file_anim_index, animating_file
+        nonlocal file_steps, file_iter, anim_base, animating_file
         nonlocal mapa_mostrado, result_map, found, rows, cols
         nonlocal animating_live, current_pos, start_fijado
 
-        if 0 <= selected_solved_idx < len(solved_list):
-            path = os.path.join(ANIM_DIR, solved_list[selected_solved_idx])
-            steps, final_map = load_steps_file(path)
+        if lista_resueltos.selected is not None:
+            path = os.path.join(ANIM_DIR, lista_resueltos.selected)
+            steps, final_map = load_trace(path)
+            info_final = analyze_map(final_map)
+            if not info_final.valid:
+                print(f"Archivo inválido ({lista_resueltos.selected}): {info_final.error()}")
+                return
 
             file_steps = steps
-            file_anim_index = 0
+            file_iter = iter(steps)
             animating_file = True
             animating_live = False
             current_pos = None
 
             
-            rows, cols = len(final_map), len(final_map[0])
+            rows, cols = info_final.rows, info_final.cols
             mapa_mostrado = clone_matrix(final_map)
             result_map = final_map
-            found = any("*" in "".join(row) for row in final_map)
+            found = info_final.path > 0
 
             # Repinta la @ si ya se había fijado
             if start_fijado and 0 <= start_x < rows and 0 <= start_y < cols:
                 mapa_mostrado[start_x][start_y] = START_CHAR
 
+            # Base de la animación: mapa original si coincide, si no el final sin '*'
+            if mapa_original and info_mapa.rows == rows and info_mapa.cols == cols:
+                anim_base = clone_matrix(mapa_original)
+            else:
+                anim_base = [['.' if ch == '*' else ch for ch in row] for row in final_map]
+            if start_fijado and 0 <= start_x < rows and 0 <= start_y < cols:
+                anim_base[start_x][start_y] = START_CHAR
+
                 
     def save_error():
         if found is False:
@@ -752,52 +1181,67 @@ def solver_screen(screen):
     add_btn(LAYOUT["col"]["lbl"],       PY + 620, 120, "Volver",          go_back)
     add_btn(LAYOUT["col"]["lbl"]+125,   PY + 620, 150, "Ver Recorrido", animar_desde_archivo) 
 
-    DOUBLE = 350
-    last_click_maps   = 0
-    last_click_solved = 0
+    # Solo visible mientras hay un trabajo corriendo
+    btn_cancel = Button((LAYOUT["col"]["lbl"], PY + 565, 120, 32), "Cancelar", font_txt, cancelar_trabajo)
 
     refresh_lists()
 
+    pacer   = LoopPacer()
+    dirty   = True             # redibujar solo cuando algo cambió
+    hov_ant = hover_state(buttons + [btn_cancel])
+
     # -------- Loop --------
     while True:
-        for e in pygame.event.get():
+        # Dormir hasta un evento, el próximo paso de animación o el próximo poll del solve
+        timeout = IDLE_WAIT_MS
+        if animating_live or animating_file:
+            timeout = last_step_time + STEP_DELAY - pygame.time.get_ticks()
+        if trabajo is not None:
+            timeout = min(timeout, JOB_POLL_MS)
+        eventos = pacer.wait(timeout)
+
+        if prof: prof.begin_frame()
+        for e in eventos:
+            if e.type != pygame.MOUSEMOTION:
+                dirty = True
             if e.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
+                cancelar_trabajo()
                 return
+            if e.type == pygame.KEYDOWN and e.key == pygame.K_F3:
+                prof = None if prof else FrameProfiler()
 
             inp_start_x.handle_event(e)
             inp_start_y.handle_event(e)
 
+            if trabajo is not None:
+                btn_cancel.handle_event(e)
+
             for b in buttons:
                 ret = b.handle_event(e)
                 if ret == "back":
+                    cancelar_trabajo()
                     return
 
-            # listas
-            if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
-                # disponibles
-                if list_rect_maps.collidepoint(e.pos):
-                    rel_y = e.pos[1] - list_rect_maps.y
-                    idx   = rel_y // 24
-                    if 0 <= idx < len(maps_list):
-                        now = pygame.time.get_ticks()
-                        if idx == selected_map_idx and (now - last_click_maps) <= DOUBLE:
-                            load_selected_map()
-                        else:
-                            selected_map_idx = idx
-                        last_click_maps = now
-                # resueltos
-                if list_rect_solved.collidepoint(e.pos):
-                    rel_y = e.pos[1] - list_rect_solved.y
-                    idx   = rel_y // 24
-                    if 0 <= idx < len(solved_list):
-                        now = pygame.time.get_ticks()
-                        if idx == selected_solved_idx and (now - last_click_solved) <= DOUBLE:
-                            animar_desde_archivo()
-                        else:
-                            selected_solved_idx = idx
-                        last_click_solved = now
+            # listas (doble click / Enter activa)
+            if lista_mapas.handle_event(e) == "activar":
+                load_selected_map()
+            if lista_resueltos.handle_event(e) == "activar":
+                animar_desde_archivo()
+
+        if refresh_lists():            # archivos agregados/borrados desde afuera
+            dirty = True
+
+        if prof: prof.mark("eventos")
+
+        # --- Solve en segundo plano ---
+        if trabajo is not None:
+            dirty = True                   # spinner y contador de nodos
+            res = trabajo.poll()
+            if res is not None:
+                aplicar_trabajo(*res, trabajo_inicio)
+                trabajo = None
 
         # --- Animación en vivo ---
         if animating_live and step_gen is not None:
@@ -813,70 +1257,58 @@ def solver_screen(screen):
                     mapa_mostrado[start_x][start_y] = START_CHAR
                     current_pos = (x, y)
                     last_step_time = now
+                    dirty = True
                 except StopIteration:
                     animating_live = False
                     step_gen = None
 
 
         # --- Animación desde archivo ---
-        if animating_file and file_steps:
+        if animating_file:
             now = pygame.time.get_ticks()
             if now - last_step_time >= STEP_DELAY:
-                if file_anim_index < len(file_steps):
-                    # Base: mapa original si existe, si no el final (al que le quitamos * temporalmente)
-                    if mapa_original:
-                        base_map = clone_matrix(mapa_original)
-                    else:
-                        base_map = clone_matrix(result_map)
-                        # limpiar '*' del final para reconstruir
-                        for i in range(rows):
-                            for j in range(cols):
-                                if base_map[i][j] == '*':
-                                    base_map[i][j] = '.'
-
-                    # Pintar todos los pasos hasta el actual
-                    for k in range(file_anim_index + 1):
-                        px, py = file_steps[k]
-                        if base_map[px][py] == '.':
-                            base_map[px][py] = '*'
-
-                    # Reponer el inicio
-                    if start_fijado and 0 <= start_x < rows and 0 <= start_y < cols:
-                        base_map[start_x][start_y] = START_CHAR
-
-                    mapa_mostrado = base_map
-                    current_pos   = file_steps[file_anim_index]
-
-                    file_anim_index += 1
-                    last_step_time  = now
+                paso = next(file_iter, None)
+                if paso is not None:
+                    # Solo se pinta el paso nuevo: los anteriores ya quedaron en anim_base
+                    px, py = paso
+                    if 0 <= px < rows and 0 <= py < cols and anim_base[px][py] == '.':
+                        anim_base[px][py] = '*'
+                        preview.invalidate_cell(px, py)
+                    mapa_mostrado = anim_base
+                    current_pos   = paso
+                    last_step_time = now
                 else:
                     animating_file = False
                     current_pos    = None
+                dirty = True
 
+        if prof: prof.mark("animacion")
 
+        hov = hover_state(buttons + [btn_cancel])
+        if hov != hov_ant:
+            hov_ant, dirty = hov, True
+        if not dirty:
+            continue
+        dirty = False
 
         # Dibujo
         screen.fill(PALETTE["bg"])
         pygame.draw.rect(screen, PALETTE["panel"], (PX, PY, PW, PH), border_radius=12)
 
         # Título
-        title = font_tit.render("RESOLVER MAPA", True, PALETTE["text"])
+        title = render_text(font_tit, "RESOLVER MAPA", PALETTE["text"])
         screen.blit(title, title.get_rect(center=(PX + PW//2, PY + 30)))
 
         # Lista mapas disponibles
-        screen.blit(font_txt.render("Mapas disponibles:", True, PALETTE["text"]),
+        screen.blit(render_text(font_txt, "Mapas disponibles:", PALETTE["text"]),
                     (LAYOUT["col"]["lbl"], PY + 60))
-        pygame.draw.rect(screen, (100,100,100), list_rect_maps, 2)
-        for i, fname in enumerate(maps_list):
-            col = PALETTE["accent"] if i == selected_map_idx else PALETTE["text"]
-            txt = font_txt.render(fname, True, col)
-            screen.blit(txt, (list_rect_maps.x + 6, list_rect_maps.y + i*24 + 4))
+        lista_mapas.draw(screen)
 
         # Coords inicio
-        screen.blit(font_txt.render("Coordenadas de inicio", True, PALETTE["text"]),
+        screen.blit(render_text(font_txt, "Coordenadas de inicio", PALETTE["text"]),
                     (LAYOUT["col"]["lbl"], PY + 235))
-        screen.blit(font_txt.render("X:", True, PALETTE["text"]), (LAYOUT["col"]["lbl"],      PY + 265))
-        screen.blit(font_txt.render("Y:", True, PALETTE["text"]), (LAYOUT["col"]["lbl"] + 90, PY + 265))
+        screen.blit(render_text(font_txt, "X:", PALETTE["text"]), (LAYOUT["col"]["lbl"],      PY + 265))
+        screen.blit(render_text(font_txt, "Y:", PALETTE["text"]), (LAYOUT["col"]["lbl"] + 90, PY + 265))
         inp_start_x.draw(screen); inp_start_y.draw(screen)
 
         # Botones
@@ -884,18 +1316,25 @@ def solver_screen(screen):
             b.draw(screen)
 
         # Lista mapas resueltos
-        screen.blit(font_txt.render("Mapas Resueltos:", True, PALETTE["text"]),
+        screen.blit(render_text(font_txt, "Mapas Resueltos:", PALETTE["text"]),
                     (LAYOUT["col"]["lbl"], PY + 360))
-        pygame.draw.rect(screen, (100,100,100), list_rect_solved, 2)
-        for i, fname in enumerate(solved_list):
-            col = PALETTE["accent"] if i == selected_solved_idx else PALETTE["text"]
-            txt = font_txt.render(fname, True, col)
-            screen.blit(txt, (list_rect_solved.x + 6, list_rect_solved.y + i*24 + 4))
+        lista_resueltos.draw(screen)
+
+        # Trabajo en curso: spinner + progreso + cancelar
+        if trabajo is not None:
+            btn_cancel.draw(screen)
+            draw_spinner(screen, (LAYOUT["col"]["lbl"] + 145, PY + 581), 9, pygame.time.get_ticks())
+            # el contador cambia en cada frame: sin cache para no desalojar las etiquetas
+            screen.blit(font_txt.render(f"{trabajo.progreso} nodos", True, PALETTE["text"]),
+                        (LAYOUT["col"]["lbl"] + 165, PY + 571))
+
+        if prof: prof.mark("panel")
 
         # Preview
         if mapa_mostrado:
             px, py = calc_preview_origin(rows, cols, CELL, prev_left, prev_right, prev_top, prev_bot)
-            draw_map_preview(screen, mapa_mostrado, (px, py), CELL)
+            preview.draw(screen, mapa_mostrado, (px, py), CELL)
+            if prof: prof.mark("preview")
 
             # celda actual (anim)
             if current_pos is not None and (animating_live or animating_file):
@@ -903,14 +1342,23 @@ def solver_screen(screen):
                 pygame.draw.rect(screen, PALETTE["HILITE_COLOR"], (px + cy*CELL, py + cx*CELL, CELL, CELL), 3)
 
             label = "Mapa" if (result_map is None and not animating_file and not animating_live) else "Resultado"
-            screen.blit(font_txt.render(label, True, PALETTE["text"]), (px, py - 20))
+            screen.blit(render_text(font_txt, label, PALETTE["text"]), (px, py - 20))
 
-            if found is not None and result_map is not None and not animating_live and not animating_file:
+            if error_solver is not None:
+                screen.blit(render_text(font_txt, error_solver, PALETTE["HILITE_COLOR"]), (px, py + 10 + CELL*rows))
+            elif found is not None and result_map is not None and not animating_live and not animating_file:
                 msg = "Tesoro encontrado!" if found else "Sin solución"
-                screen.blit(font_txt.render(msg, True, PALETTE["text"]), (px, py + 10 + CELL*rows))
+                if found and costo_total is not None:
+                    msg += f" (costo {costo_total})"
+                screen.blit(render_text(font_txt, msg, PALETTE["text"]), (px, py + 10 + CELL*rows))
+
+        if prof:
+            draw_stats_overlay(screen, font_dbg, prof, solver_stats)
+            prof.mark("overlay")
 
         pygame.display.flip()
-        clock.tick(FPS)
+        if prof: prof.mark("flip")
+        if prof: prof.end_frame(pacer.get_fps())
 
 
 # ============================================================
@@ -918,6 +1366,9 @@ def solver_screen(screen):
 # ============================================================
 
 def run_ui():
+    # crea "MAPS" y "MAPS_Animate" y evita error
+    os.makedirs(ANIM_DIR, exist_ok=True)
+
     pygame.init()
     pygame.mixer.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -925,6 +1376,20 @@ def run_ui():
 
     intro_screen(screen)
 
+    if RECORD:
+        from grabacion_ui import Grabador
+        LoopPacer.grabador = Grabador(RECORD, "menu")
+
+    main_loop(screen)
+
+    if LoopPacer.grabador is not None:
+        LoopPacer.grabador.close()
+    pygame.quit()
+    sys.exit()
+
+
+def main_loop(screen):
+    """Menú → pantallas, hasta elegir Salir (también lo usa el reproductor)."""
     while True:
         op = menu_screen(screen)        
         if op == 1:
@@ -939,7 +1404,3 @@ def run_ui():
         else:
             print("Opción inválida — vuelve a intentarlo.")
             continue
-            
-
-    pygame.quit()
-    sys.exit()